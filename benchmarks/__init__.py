@@ -0,0 +1,80 @@
+"""Micro-benchmarks for dbapix.
+
+Each module can be run directly, e.g.::
+
+    python -m benchmarks.row_factories
+
+or all (or some) of them together, saving or comparing against a baseline::
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks fetch rows --compare baseline.json
+
+``--compare`` without a path uses ``benchmarks/baseline.json``, which is
+committed with the code.
+
+Each module has a ``run()`` returning a list of ``(name, seconds)`` pairs.
+
+"""
+
+from __future__ import print_function
+
+import timeit
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time ``func``, returning the best seconds-per-call over ``repeat`` runs."""
+
+    timer = timeit.Timer(func)
+
+    # Scale up the number of calls until a run takes long enough to trust.
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed))
+
+    return min(timer.repeat(repeat, number)) / number
+
+
+def report(results, baseline=None):
+    """Print ``(name, seconds)`` pairs as a table, relative to the first (or ``baseline``)."""
+
+    if not results:
+        return
+
+    if baseline is None:
+        baseline = results[0][1]
+
+    width = max(len(name) for name, _ in results)
+    for name, seconds in results:
+        print('{:{}s}  {:10.3f} us  {:6.2f}x'.format(name, width, seconds * 1e6, seconds / baseline))
+
+
+def compare(results, baseline, threshold=0.1):
+    """Print ``(name, seconds)`` pairs against a ``{name: seconds}`` baseline.
+
+    :return: The names which are more than ``threshold`` (a fraction) slower.
+
+    """
+
+    if not results:
+        return []
+
+    slower = []
+    width = max(len(name) for name, _ in results)
+    for name, seconds in results:
+        before = baseline.get(name)
+        if before is None:
+            print('{:{}s}  {:10.3f} us  (new)'.format(name, width, seconds * 1e6))
+            continue
+        change = seconds / before - 1
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            slower.append(name)
+        elif change < -threshold:
+            flag = '  faster'
+        print('{:{}s}  {:10.3f} us  {:10.3f} us  {:+7.1%}{}'.format(name, width, seconds * 1e6, before * 1e6, change, flag))
+
+    return slower
@@ -0,0 +1,115 @@
+"""Run the benchmarks, optionally saving or comparing against a baseline.
+
+Exits with status 1 if anything is slower than the baseline by more than the
+threshold, so it can be used as a (noisy) check.
+
+``--compare`` on its own uses the committed :data:`BASELINE`. Timings only
+compare on the same machine, so for real use save your own first (or
+refresh the committed one when it is out of date)::
+
+    python -m benchmarks --save benchmarks/baseline.json
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+
+from . import compare, report
+
+
+#: The baseline saved with the code.
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+#: Benchmark modules, in the order they are run.
+MODULES = (
+    'binding',
+    'execute',
+    'fetch',
+    'rows',
+    'row_factories',
+    'pool',
+    'sqlite_profiles',
+    'psycopg2_batch',
+    'import_time',
+)
+
+
+def run_module(name):
+
+    mod = importlib.import_module('{}.{}'.format(__package__, name))
+    results = mod.run()
+
+    # Some return several tables; they are flattened.
+    if isinstance(results, tuple):
+        results = [x for table in results for x in table]
+
+    return results
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('modules', nargs='*', metavar='module',
+        help="benchmarks to run; defaults to all of: {}".format(', '.join(MODULES)))
+    parser.add_argument('-s', '--save', metavar='PATH', help="save the results as a baseline")
+    parser.add_argument('-c', '--compare', metavar='PATH', nargs='?', const=BASELINE,
+        help="compare with a saved baseline (default: benchmarks/baseline.json)")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+        help="fraction slower than the baseline to flag (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    for name in args.modules:
+        if name not in MODULES:
+            parser.error("unknown benchmark {!r}".format(name))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            saved = json.load(fh)
+        baseline = saved['results']
+        if saved.get('platform') != platform.platform():
+            print('Note: the baseline is from {} (Python {}); expect differences.'.format(
+                saved.get('platform'), saved.get('python')))
+            print()
+
+    all_results = {}
+    slower = []
+
+    for name in args.modules or MODULES:
+
+        print('{}:'.format(name))
+        results = run_module(name)
+        all_results[name] = dict(results)
+
+        if args.compare:
+            slower.extend('{}: {}'.format(name, x) for x in compare(results, baseline.get(name, {}), args.threshold))
+        else:
+            report(results)
+        print()
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump(dict(
+                python=platform.python_version(),
+                platform=platform.platform(),
+                results=all_results,
+            ), fh, indent=2, sort_keys=True)
+        print('Saved to {}.'.format(args.save))
+
+    if slower:
+        print('{} slower than the baseline:'.format(len(slower)))
+        for name in slower:
+            print('    {}'.format(name))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Cost of binding queries: parsing, pulling params from the stack, and rendering."""
+
+from __future__ import print_function
+
+from dbapix import create_engine
+from dbapix.params import Params
+from dbapix.query import bind
+
+from . import measure, report
+
+
+QUERY = 'SELECT * FROM foo WHERE a = {} AND b = {} AND c = {}'
+
+# Something for from_stack to copy.
+GLOBAL_VALUE = 3
+
+
+def format_only():
+    QUERY.format(1, 2, 3)
+
+
+def parse_params():
+    bind(QUERY, (1, 2, 3))
+
+
+def parse_stack():
+    a = 1
+    b = 2
+    bind('SELECT * FROM foo WHERE a = {a} AND b = {b} AND c = {GLOBAL_VALUE}')
+
+
+def parse_expressions():
+    obj = dict(a=1, b=2)
+    bind('SELECT * FROM foo WHERE a = {obj["a"]} AND b = {obj["b"]}')
+
+
+def parse_formats():
+    table = 'foo'
+    values = (1, 2, 3)
+    bind('SELECT * FROM {table:i} WHERE a IN ({values:v})')
+
+
+def render(bound, engine):
+    bound(engine)
+
+
+def from_stack():
+    a = b = c = d = e = 1
+    Params.from_stack()
+
+
+def run():
+
+    engine = create_engine('sqlite', ':memory:')
+    bound = bind(QUERY, (1, 2, 3))
+    formatted = bind('SELECT * FROM {table:i} WHERE a = {value}', dict(table='foo', value=1))
+
+    return [
+        ('str.format', measure(format_only)),
+        ('parse with params', measure(parse_params)),
+        ('parse from stack', measure(parse_stack)),
+        ('parse expressions', measure(parse_expressions)),
+        ('parse :i and :v', measure(parse_formats)),
+        ('render', measure(lambda: render(bound, engine))),
+        ('render with :i', measure(lambda: render(formatted, engine))),
+        ('Params.from_stack', measure(from_stack)),
+    ]
+
+
+if __name__ == '__main__':
+    report(run())
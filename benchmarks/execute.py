@@ -0,0 +1,75 @@
+"""Overhead of Cursor.execute over the raw driver's execute.
+
+Runs against SQLite, and a local Postgres if one can be connected to (see
+:mod:`benchmarks.psycopg2_batch`).
+
+"""
+
+from __future__ import print_function
+
+import functools
+import sys
+
+from dbapix import create_engine
+
+from . import measure, report
+from .psycopg2_batch import create_pg_engine
+
+
+def raw_execute(cur, query):
+    cur.execute(query, (1, 2))
+
+
+def execute(cur):
+    cur.execute('SELECT {}, {}', (1, 2))
+
+
+def execute_stack(cur):
+    a = 1
+    b = 2
+    cur.execute('SELECT {a}, {b}')
+
+
+def execute_new_cursor(con):
+    con.execute('SELECT {}, {}', (1, 2))
+
+
+def bench(name, engine, raw_query):
+
+    con = engine.get_connection(autocommit=True)
+    raw = con.wrapped.cursor()
+    cur = con.cursor()
+
+    results = [
+        ('{} raw driver'.format(name), measure(functools.partial(raw_execute, raw, raw_query))),
+        ('{} execute'.format(name), measure(functools.partial(execute, cur))),
+        ('{} execute from stack'.format(name), measure(functools.partial(execute_stack, cur))),
+        ('{} con.execute'.format(name), measure(functools.partial(execute_new_cursor, con))),
+    ]
+
+    # The cost of tracing, when something is listening.
+    engine.add_hook(lambda event: None)
+    results.append(('{} execute with a hook'.format(name), measure(functools.partial(execute, cur))))
+
+    engine.put_connection(con)
+    return results
+
+
+def run():
+
+    results = bench('sqlite', create_engine('sqlite', ':memory:'), 'SELECT ?, ?')
+
+    try:
+        engine = create_pg_engine()
+        engine.put_connection(engine.get_connection())
+    except Exception as e:
+        print('Skipping Postgres: {}'.format(e), file=sys.stderr)
+    else:
+        results.extend(bench('postgres', engine, 'SELECT %s, %s'))
+        engine.close()
+
+    return results
+
+
+if __name__ == '__main__':
+    report(run())
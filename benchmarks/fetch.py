@@ -0,0 +1,83 @@
+"""Cost of each way of fetching rows from SQLite, against the raw driver."""
+
+from __future__ import print_function
+
+import functools
+
+from dbapix import create_engine
+
+from . import measure, report
+
+
+ROWS = 1000
+
+
+def setup():
+    engine = create_engine('sqlite', ':memory:')
+    con = engine.get_connection()
+    con.execute('''CREATE TABLE bench (id INTEGER PRIMARY KEY, a INTEGER, b TEXT, c REAL)''')
+    con.wrapped.executemany('''INSERT INTO bench (a, b, c) VALUES (?, ?, ?)''', [
+        (i, str(i), i / 2.0) for i in range(ROWS)
+    ])
+    return con
+
+
+def raw_fetchone(con):
+    cur = con.wrapped.cursor()
+    cur.execute('''SELECT * FROM bench''')
+    while cur.fetchone() is not None:
+        pass
+
+
+def fetchone(con):
+    cur = con.execute('''SELECT * FROM bench''')
+    while cur.fetchone() is not None:
+        pass
+
+
+def raw_fetchmany(con, size=100):
+    cur = con.wrapped.cursor()
+    cur.execute('''SELECT * FROM bench''')
+    while cur.fetchmany(size):
+        pass
+
+
+def fetchmany(con, size=100):
+    cur = con.execute('''SELECT * FROM bench''')
+    while cur.fetchmany(size):
+        pass
+
+
+def raw_fetchall(con):
+    cur = con.wrapped.cursor()
+    cur.execute('''SELECT * FROM bench''')
+    cur.fetchall()
+
+
+def fetchall(con):
+    con.execute('''SELECT * FROM bench''').fetchall()
+
+
+def iterate(con):
+    for row in con.execute('''SELECT * FROM bench'''):
+        pass
+
+
+def run():
+
+    con = setup()
+
+    return [
+        ('raw fetchall', measure(functools.partial(raw_fetchall, con))),
+        ('fetchall', measure(functools.partial(fetchall, con))),
+        ('raw fetchmany(100)', measure(functools.partial(raw_fetchmany, con))),
+        ('fetchmany(100)', measure(functools.partial(fetchmany, con))),
+        ('raw fetchone', measure(functools.partial(raw_fetchone, con))),
+        ('fetchone', measure(functools.partial(fetchone, con))),
+        ('iterate', measure(functools.partial(iterate, con))),
+    ]
+
+
+if __name__ == '__main__':
+    print('Fetching {} rows:'.format(ROWS))
+    report(run())
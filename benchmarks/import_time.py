@@ -0,0 +1,97 @@
+"""Time to import dbapix, and to load each driver, in a fresh interpreter.
+
+Measured with ``python -X importtime`` (Python 3.7+), so only the imports
+themselves are counted, not interpreter startup. Pass module names to see
+where the time goes, e.g.::
+
+    python -m benchmarks.import_time psycopg2
+
+"""
+
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+from . import report
+
+
+DRIVERS = ('psycopg2', 'sqlite3', 'pymysql', 'mysqldb', 'snowflake')
+
+REPEAT = 5
+
+_marker = '--dbapix-import-time--'
+
+
+def import_times(statement):
+    """Run a statement in a new interpreter, returning ``[(module, self_us, cumulative_us, depth)]``
+    for everything it imported.
+
+    :raises ImportError: If the statement fails.
+
+    """
+
+    # The marker separates our imports from the interpreter's own.
+    code = 'import os; os.write(2, {!r}.encode() + b"\\n"); {}'.format(_marker, statement)
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    _, err = proc.communicate()
+    err = err.decode('utf8', 'replace')
+    if proc.returncode:
+        raise ImportError(err.strip().splitlines()[-1])
+
+    times = []
+    for line in err.split(_marker, 1)[-1].splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue # The header.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), int(self_us), int(cumulative), depth))
+
+    return times
+
+
+def total_time(statement):
+    """Best total seconds of imports caused by a statement over :data:`REPEAT` runs."""
+    return min(
+        sum(c for _, _, c, depth in import_times(statement) if depth == 0)
+        for _ in range(REPEAT)
+    ) / 1e6
+
+
+def run():
+
+    results = [('import dbapix', total_time('import dbapix'))]
+
+    for driver in DRIVERS:
+        try:
+            seconds = total_time('import dbapix; dbapix.get_engine_class({!r})'.format(driver))
+        except ImportError:
+            continue
+        results.append((driver, seconds))
+
+    return results
+
+
+def breakdown(driver, limit=15):
+    """Print the modules with the most self time when loading a driver."""
+    times = import_times('import dbapix; dbapix.get_engine_class({!r})'.format(driver))
+    times.sort(key=lambda x: -x[1])
+    for name, self_us, cumulative, _ in times[:limit]:
+        print('{:40s}  {:8d} us  {:8d} us'.format(name, self_us, cumulative))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:]:
+        for driver in sys.argv[1:]:
+            print('Slowest imports for {} (self, cumulative):'.format(driver))
+            breakdown(driver)
+            print()
+    else:
+        print('Import time, relative to `import dbapix`:')
+        report(run())
@@ -0,0 +1,50 @@
+"""Cost of checking connections out of the pool and returning them."""
+
+from __future__ import print_function
+
+import functools
+import sys
+
+from dbapix import create_engine
+
+from . import measure, report
+from .psycopg2_batch import create_pg_engine
+
+
+def checkout(engine, **kwargs):
+    engine.put_connection(engine.get_connection(**kwargs))
+
+
+def connect(engine):
+    with engine.connect():
+        pass
+
+
+def bench(name, engine):
+    # Warm the pool.
+    checkout(engine)
+    return [
+        ('{} get/put_connection'.format(name), measure(functools.partial(checkout, engine))),
+        ('{} autocommit=True'.format(name), measure(functools.partial(checkout, engine, autocommit=True))),
+        ('{} with connect()'.format(name), measure(functools.partial(connect, engine))),
+    ]
+
+
+def run():
+
+    results = bench('sqlite', create_engine('sqlite', ':memory:'))
+
+    try:
+        engine = create_pg_engine()
+        checkout(engine)
+    except Exception as e:
+        print('Skipping Postgres: {}'.format(e), file=sys.stderr)
+    else:
+        results.extend(bench('postgres', engine))
+        engine.close()
+
+    return results
+
+
+if __name__ == '__main__':
+    report(run())
@@ -0,0 +1,91 @@
+"""Bulk writes to a local Postgres, with and without psycopg2.extras.
+
+Connection kwargs are taken from ``DBAPIX_TEST_PSYCOPG2_*`` environment
+variables, as in the tests.
+
+"""
+
+from __future__ import print_function
+
+import functools
+import os
+import sys
+
+from dbapix import create_engine
+
+from . import measure, report
+
+
+ROWS = 2000
+
+
+def create_pg_engine():
+    kwargs = {}
+    for k, v in os.environ.items():
+        if k.startswith('DBAPIX_TEST_PSYCOPG2_'):
+            kwargs[k[len('DBAPIX_TEST_PSYCOPG2_'):].lower()] = v
+    kwargs.setdefault('host', 'localhost')
+    kwargs.setdefault('database', 'dbapix')
+    return create_engine('psycopg2', kwargs)
+
+
+def setup(engine):
+    con = engine.get_connection(autocommit=True)
+    con.execute('''DROP TABLE IF EXISTS bench_batch''')
+    con.execute('''CREATE TABLE bench_batch (id SERIAL PRIMARY KEY, a INTEGER, b TEXT)''')
+    return con
+
+
+def truncate(func):
+    def _truncate(con, *args):
+        con.execute('''TRUNCATE bench_batch''')
+        func(con, *args)
+    return _truncate
+
+
+@truncate
+def raw_executemany(con, rows):
+    cur = con.wrapped.cursor()
+    cur.executemany('''INSERT INTO bench_batch (a, b) VALUES (%s, %s)''', [(r['a'], r['b']) for r in rows])
+
+
+@truncate
+def executemany(con, rows, page_size):
+    con.executemany('''INSERT INTO bench_batch (a, b) VALUES ({}, {})''', [(r['a'], r['b']) for r in rows], page_size=page_size)
+
+
+@truncate
+def insert_many(con, rows, page_size, returning=None):
+    con.insert_many('bench_batch', rows, returning=returning, page_size=page_size)
+
+
+def update_many(con, rows, page_size):
+    con.update_many('bench_batch', [dict(id=i + 1, a=-i) for i in range(len(rows))], key='id', page_size=page_size)
+
+
+def run():
+
+    engine = create_pg_engine()
+    try:
+        con = setup(engine)
+    except Exception as e:
+        print('Could not connect to Postgres: {}'.format(e), file=sys.stderr)
+        return []
+
+    rows = [dict(a=i, b=str(i)) for i in range(ROWS)]
+
+    results = [('raw executemany', measure(functools.partial(raw_executemany, con, rows), repeat=3))]
+    for page_size in (100, 1000):
+        results.extend([
+            ('executemany page_size={}'.format(page_size), measure(functools.partial(executemany, con, rows, page_size), repeat=3)),
+            ('insert_many page_size={}'.format(page_size), measure(functools.partial(insert_many, con, rows, page_size), repeat=3)),
+            ('insert_many returning page_size={}'.format(page_size), measure(functools.partial(insert_many, con, rows, page_size, 'id'), repeat=3)),
+            ('update_many page_size={}'.format(page_size), measure(functools.partial(update_many, con, rows, page_size), repeat=3)),
+        ])
+
+    return results
+
+
+if __name__ == '__main__':
+    print('Writing {} rows:'.format(ROWS))
+    report(run())
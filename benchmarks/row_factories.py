@@ -0,0 +1,49 @@
+"""Cost of each row factory when fetching from SQLite."""
+
+from __future__ import print_function
+
+import functools
+
+from dbapix import create_engine
+
+from . import measure, report
+
+
+ROWS = 10000
+
+
+def setup():
+    engine = create_engine('sqlite3', ':memory:')
+    con = engine.get_connection()
+    con.execute('''CREATE TABLE bench (id INTEGER PRIMARY KEY, a INTEGER, b TEXT, c REAL)''')
+    con.wrapped.executemany('''INSERT INTO bench (a, b, c) VALUES (?, ?, ?)''', [
+        (i, str(i), i / 2.0) for i in range(ROWS)
+    ])
+    return con
+
+
+def fetch_raw(con):
+    cur = con.wrapped.cursor()
+    cur.execute('''SELECT * FROM bench''')
+    cur.fetchall()
+
+
+def fetch(con, factory):
+    cur = con.execute('''SELECT * FROM bench''', row_factory=factory)
+    cur.fetchall()
+
+
+def run():
+
+    con = setup()
+
+    results = [('raw driver', measure(functools.partial(fetch_raw, con)))]
+    for factory in ('tuple', 'row', 'dict', 'namedtuple'):
+        results.append((factory, measure(functools.partial(fetch, con, factory))))
+
+    return results
+
+
+if __name__ == '__main__':
+    print('fetchall() of {} rows:'.format(ROWS))
+    report(run())
@@ -0,0 +1,91 @@
+"""Cost of building and reading Row objects, and of converting results to DataFrames."""
+
+from __future__ import print_function
+
+import functools
+import sys
+
+from dbapix import create_engine
+from dbapix.row import ColumnarRowList, Row
+
+from . import measure, report
+
+
+ROWS = 1000
+
+
+def setup():
+    engine = create_engine('sqlite', ':memory:')
+    con = engine.get_connection()
+    con.execute('''CREATE TABLE bench (id INTEGER PRIMARY KEY, a INTEGER, b TEXT, c REAL)''')
+    con.wrapped.executemany('''INSERT INTO bench (a, b, c) VALUES (?, ?, ?)''', [
+        (i, str(i), i / 2.0) for i in range(ROWS)
+    ])
+    return engine, con
+
+
+def construct(cur, raw_rows):
+    for raw in raw_rows:
+        Row(raw, cur)
+
+
+def tuple_index(raw_rows):
+    for raw in raw_rows:
+        raw[2]
+
+
+def row_index(rows):
+    for row in rows:
+        row[2]
+
+
+def row_key(rows):
+    for row in rows:
+        row['b']
+
+
+def row_get(rows):
+    for row in rows:
+        row.get('b')
+
+
+def as_dataframe(rows):
+    rows.as_dataframe()
+
+
+def run():
+
+    engine, con = setup()
+
+    cur = con.execute('''SELECT * FROM bench''')
+    raw_rows = cur.wrapped.fetchall()
+    rows = [Row(raw, cur) for raw in raw_rows]
+
+    results = [
+        ('tuple[i]', measure(functools.partial(tuple_index, raw_rows))),
+        ('Row(raw, cur)', measure(functools.partial(construct, cur, raw_rows))),
+        ('Row[i]', measure(functools.partial(row_index, rows))),
+        ('Row[key]', measure(functools.partial(row_key, rows))),
+        ('Row.get(key)', measure(functools.partial(row_get, rows))),
+    ]
+
+    try:
+        import pandas
+    except ImportError:
+        print('Skipping as_dataframe: pandas is not installed.', file=sys.stderr)
+        return results
+
+    row_list = con.execute('''SELECT * FROM bench''').fetchall()
+    results.append(('RowList.as_dataframe', measure(functools.partial(as_dataframe, row_list))))
+
+    cur = con.execute('''SELECT * FROM bench''')
+    cur.row_list_class = ColumnarRowList
+    row_list = cur.fetchall()
+    results.append(('ColumnarRowList.as_dataframe', measure(functools.partial(as_dataframe, row_list))))
+
+    return results
+
+
+if __name__ == '__main__':
+    print('Per {} rows:'.format(ROWS))
+    report(run())
@@ -0,0 +1,85 @@
+"""Insert and read throughput of each SQLite profile."""
+
+from __future__ import print_function
+
+import functools
+import os
+import shutil
+import tempfile
+
+from dbapix import create_engine
+from dbapix.drivers.sqlite3 import profiles
+
+from . import measure, report
+
+
+ROWS = 1000
+
+
+def insert(engine, many):
+    con = engine.get_connection()
+    try:
+        if many:
+            with con.begin():
+                con.insert_many('bench', [dict(a=i, b=str(i)) for i in range(ROWS)])
+        else:
+            # One transaction per row, which is where synchronous/journal_mode matter.
+            for i in range(ROWS):
+                with con.begin():
+                    con.insert('bench', dict(a=i, b=str(i)))
+    finally:
+        engine.put_connection(con)
+
+
+def read(engine):
+    con = engine.get_connection()
+    try:
+        con.execute('''SELECT * FROM bench''', row_factory='tuple').fetchall()
+    finally:
+        engine.put_connection(con)
+
+
+def run():
+
+    tmp = tempfile.mkdtemp()
+    inserts = []
+    reads = []
+
+    try:
+
+        # The default goes first, as the baseline.
+        for name in sorted(profiles, key=lambda n: (n != 'default', n)):
+
+            # Inserts go into a fresh table; reads come from one of a fixed size.
+            for kind in ('insert', 'read'):
+                setup = create_engine('sqlite', os.path.join(tmp, '{}-{}.db'.format(kind, name)))
+                con = setup.get_connection()
+                con.execute('''CREATE TABLE bench (id INTEGER PRIMARY KEY, a INTEGER, b TEXT)''')
+                con.commit()
+                if kind == 'read':
+                    insert(setup, True)
+                setup.close()
+
+            if name != 'read-only':
+                engine = create_engine('sqlite', os.path.join(tmp, 'insert-{}.db'.format(name)), profile=name)
+                inserts.append(('{} per-row commits'.format(name), measure(functools.partial(insert, engine, False), repeat=3)))
+                inserts.append(('{} insert_many'.format(name), measure(functools.partial(insert, engine, True), repeat=3)))
+                engine.close()
+
+            engine = create_engine('sqlite', os.path.join(tmp, 'read-{}.db'.format(name)), profile=name)
+            reads.append((name, measure(functools.partial(read, engine), repeat=3)))
+            engine.close()
+
+    finally:
+        shutil.rmtree(tmp)
+
+    return inserts, reads
+
+
+if __name__ == '__main__':
+    inserts, reads = run()
+    print('Inserting {} rows:'.format(ROWS))
+    report(inserts)
+    print()
+    print('Reading a table:')
+    report(reads)
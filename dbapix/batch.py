@@ -0,0 +1,172 @@
+import six
+
+from .cache import find_written_tables
+from .params import Params
+from .query import bind
+
+
+class BatchError(Exception):
+
+    """A statement in a :class:`Batch` failed.
+
+    .. attribute:: index
+
+        The position of the failed statement in the batch, or ``None`` if it
+        could not be determined.
+
+    .. attribute:: query
+    .. attribute:: params
+
+        The failed statement, as it was sent to the driver.
+
+    .. attribute:: error
+
+        The exception raised by the driver.
+
+    """
+
+    def __init__(self, index, query, params, error):
+        super(BatchError, self).__init__('Statement {} of batch failed: {}'.format(index, error))
+        self.index = index
+        self.query = query
+        self.params = params
+        self.error = error
+
+
+class Batch(object):
+
+    """Statements collected to be sent to the database together.
+
+    Created by :meth:`.Connection.batch`; statements are bound (including
+    pulling parameters from the calling scope) as they are added, and sent
+    when the context exits without error::
+
+        with con.batch() as batch:
+            for obj in objects:
+                batch.update('foo', dict(value=obj.value), 'id = {obj.id}')
+
+        print(batch.rowcounts)
+
+    How they are sent depends on the driver:
+
+    - Postgres joins them into one string, sent in a single round trip. They
+      succeed or fail together. Only the rowcount of the last statement is
+      known.
+    - MySQL does the same (with per-statement rowcounts) if the engine
+      was created with ``client_flag=CLIENT.MULTI_STATEMENTS``; otherwise they
+      are sent one at a time. Statements before a failed one are not undone.
+    - SQLite runs them one at a time within a single transaction, so they
+      succeed or fail together.
+
+    """
+
+    def __init__(self, con):
+        self._con = con
+        self._engine = con._engine
+        self._tables = set()
+
+        #: The ``(query, params)`` waiting to be sent, as they will be passed to the driver.
+        self.statements = []
+
+        #: The number of rows affected by each statement once sent; ``None``
+        #: for statements where the driver can't tell.
+        self.rowcounts = None
+
+    def __len__(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.send()
+
+    def execute(self, query, params=None, _stack_depth=0):
+        """Add a query to the batch.
+
+        .. seealso:: :meth:`.Cursor.execute` for parameters.
+
+        """
+        query, params = bind(query, params, _stack_depth + 1)(self._engine)
+        self.statements.append((query, self._engine.types.encode_params(params)))
+
+    def insert(self, table_name, data):
+        """Add an ``INSERT`` to the batch.
+
+        .. seealso:: :meth:`.Cursor.insert`; ``returning`` is not supported.
+
+        """
+        names = sorted(data)
+        query = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            self._engine.quote_identifier(table_name),
+            ', '.join(self._engine.quote_identifier(n) for n in names),
+            ', '.join('{}' for _ in names),
+        )
+        self.execute(query, [data[n] for n in names])
+        self._tables.add(table_name)
+
+    def update(self, table_name, data, where, where_params=(), _stack_depth=0):
+        """Add an ``UPDATE`` to the batch.
+
+        .. seealso:: :meth:`.Cursor.update` for parameters.
+
+        """
+
+        params = Params() if where_params else Params.from_stack(_stack_depth + 1)
+
+        to_set = []
+        for key, value in sorted(data.items()):
+            to_set.append('{} = {{}}'.format(self._engine.quote_identifier(key)))
+            params.append(value)
+
+        params.update_or_extend(where_params)
+
+        query = 'UPDATE {} SET {} WHERE {}'.format(
+            self._engine.quote_identifier(table_name),
+            ', '.join(to_set),
+            where,
+        )
+        self.execute(query, params)
+        self._tables.add(table_name)
+
+    def send(self):
+        """Send the statements now (instead of when the context exits).
+
+        :return: :attr:`rowcounts`
+        :raises BatchError: If any statement fails.
+
+        """
+
+        statements = self.statements
+        self.statements = []
+
+        if statements:
+            self.rowcounts = self._con._execute_batch(statements)
+        else:
+            self.rowcounts = []
+
+        if self._engine.result_cache is not None:
+            for query, _ in statements:
+                self._tables.update(find_written_tables(query))
+            self._con._wrote(self._tables)
+        self._tables.clear()
+
+        return self.rowcounts
+
+
+def execute_serially(cur, statements):
+    """Execute statements one at a time on a raw cursor, returning their rowcounts.
+
+    :raises BatchError: If any statement fails.
+
+    """
+
+    rowcounts = []
+    for i, (query, params) in enumerate(statements):
+        try:
+            cur.execute(query, params)
+        except Exception as e:
+            six.raise_from(BatchError(i, query, params, e), e)
+        rowcounts.append(cur.rowcount)
+    return rowcounts
@@ -0,0 +1,207 @@
+import collections
+import re
+import sys
+import threading
+import time
+
+
+_table_re = re.compile(r'''\b(?:FROM|JOIN)\s+([`"\[]?[\w$.]+[`"\]]?)''', re.IGNORECASE)
+_written_table_re = re.compile(r'''\b(?:
+    INSERT\s+(?:OR\s+\w+\s+)?INTO | REPLACE\s+INTO | UPDATE | DELETE\s+FROM |
+    TRUNCATE(?:\s+TABLE)? | (?:DROP|ALTER)\s+TABLE(?:\s+IF\s+EXISTS)?
+)\s+([`"\[]?[\w$.]+[`"\]]?)''', re.IGNORECASE | re.VERBOSE)
+
+
+def _normalize_table(name):
+    return name.strip('`"[]').lower()
+
+
+def find_tables(query):
+    """Guess at the tables a query reads from, via its ``FROM`` and ``JOIN`` clauses.
+
+    >>> sorted(find_tables('SELECT * FROM foo JOIN "Bar" ON foo.id = "Bar".foo_id'))
+    ['bar', 'foo']
+
+    """
+    return set(_normalize_table(x) for x in _table_re.findall(query))
+
+
+def find_written_tables(query):
+    """Guess at the tables a query writes to.
+
+    >>> sorted(find_written_tables('UPDATE foo SET x = 1; DELETE FROM "Bar"'))
+    ['bar', 'foo']
+
+    """
+    return set(_normalize_table(x) for x in _written_table_re.findall(query))
+
+
+def _estimate_size(rows):
+    getsizeof = sys.getsizeof
+    size = getsizeof(rows)
+    for row in rows:
+        size += getsizeof(row)
+        for value in row:
+            size += getsizeof(value)
+    return size
+
+
+_Entry = collections.namedtuple('_Entry', 'description rows tables expires size')
+
+
+class CachedResult(object):
+
+    """Stands in for a driver's cursor to serve results from a :class:`ResultCache`."""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self.rowcount = len(rows)
+        self._rows = rows
+        self._pos = 0
+
+    def fetchone(self):
+        if self._pos < len(self._rows):
+            self._pos += 1
+            return self._rows[self._pos - 1]
+
+    def fetchmany(self, size):
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+
+class ResultCache(object):
+
+    """An LRU cache of query results, bounded by their (estimated) size in bytes.
+
+    It is opt-in by assigning one to :attr:`.Engine.result_cache`::
+
+        engine.result_cache = ResultCache(max_bytes=64 * 1024 * 1024, ttl=30)
+
+    after which :meth:`.Cursor.select` reads through it by default, and
+    :meth:`.Cursor.execute` (and friends) do when given ``cache=True`` or a
+    ``cache=<ttl in seconds>``. Results are keyed by the rendered SQL and its
+    parameters, and are served back through the cursor as usual.
+
+    Entries are tagged with the tables that the query reads from, and are
+    dropped when a write to one of them (via the helpers, or a query which
+    :func:`find_written_tables` recognizes) is committed, or when
+    :meth:`invalidate` is called directly. Writes by other means (including
+    other processes) are only picked up when the TTL expires.
+
+    The cache is only used by connections in autocommit mode, since otherwise
+    results may include uncommitted writes (or miss the transaction's own).
+
+    :param int max_bytes: Upper limit on the estimated size of all entries.
+    :param float ttl: Default seconds that entries are valid for.
+
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=60):
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = collections.OrderedDict()
+        self._keys_by_table = collections.defaultdict(set)
+        self._lock = threading.Lock()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params):
+        try:
+            key = (query, tuple(params or ()))
+            hash(key)
+        except TypeError: # Unhashable params, e.g. lists for arrays.
+            key = (query, repr(params))
+        return key
+
+    def get(self, key):
+        """Get a live entry, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return
+            self.hits += 1
+            # Move it to the most-recently-used end.
+            self._entries[key] = self._entries.pop(key)
+            return entry
+
+    def put(self, key, description, rows, tables=(), ttl=None):
+        """Store a result set; it is silently skipped if larger than :attr:`max_bytes`."""
+
+        rows = tuple(rows)
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        tables = set(_normalize_table(t) for t in tables)
+        entry = _Entry(tuple(description or ()), rows, tables, time.time() + ttl, size)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += size
+            for table in tables:
+                self._keys_by_table[table].add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        for table in entry.tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def invalidate(self, *tables):
+        """Drop all entries which read from any of the given tables."""
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.get(_normalize_table(table), ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self._size = 0
+
+    def stats(self):
+        """Get a dict of the cache's metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=(self.hits / float(lookups)) if lookups else 0.0,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                invalidations=self.invalidations,
+                entries=len(self._entries),
+                bytes=self._size,
+            )
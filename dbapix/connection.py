@@ -1,7 +1,11 @@
 import abc
+import time
 
 import six
 
+from .batch import Batch, execute_serially
+from .hooks import call_hooks
+from .retry import RetryPolicy
 
 @six.add_metaclass(abc.ABCMeta)
 class Connection(object):
@@ -21,6 +25,10 @@ class Connection(object):
 
         # For tracking state around `begin()`.
         self._autocommit = None
+        self._in_transaction = False
+
+        # Tables written to since the last commit, to invalidate in the result cache.
+        self._written_tables = set()
     
     # The next 3 are here mostly for the docs.
     
@@ -41,15 +49,30 @@ class Connection(object):
         """
         self.wrapped.close()
     
-    def reset_session(self, autocommit=False):
+    def reset_session(self, autocommit=False, readonly=None):
         """Reset the connection to an initial clean state.
 
+        :param bool autocommit:
+        :param bool readonly: Make the session read-only, for drivers which
+            support it (e.g. Postgres and SQLite); ignored by the rest.
+
         This is automatically called when connections are retreived from an engine,
         and is designed so that every connection feels like a new one, even
         though they are reused.
 
+        Only settings which differ from the connection's current state are
+        changed; skipped changes are counted by :attr:`.Engine.avoided_session_changes`.
+
         """
-        self.autocommit = autocommit
+        self._set_autocommit(autocommit)
+
+    def _set_autocommit(self, value):
+        # Reading autocommit is client-side for all drivers, but setting it
+        # may cost a round trip.
+        if self.autocommit == value:
+            self._engine.avoided_session_changes += 1
+        else:
+            self.autocommit = value
 
     def _should_put_close(self):
         pass
@@ -57,13 +80,19 @@ class Connection(object):
     def _get_nonidle_status(self):
         pass
 
+    def _has_uncommitted_work(self):
+        # Drivers which can ask the database do better; otherwise, the writes we have seen.
+        return bool(self._written_tables or self._get_nonidle_status())
+
     def __getattr__(self, key):
         """Attributes that are not provided by dbapix are passed through to the wrapped connection."""
         return getattr(self.wrapped, key)
 
-    def cursor(self):
+    def cursor(self, row_factory=None):
         """Get a :class:`.Cursor` for this connection.
 
+        :param row_factory: How to wrap rows; see :ref:`row_factories`.
+
         .. testcode::
 
             cur = con.cursor()
@@ -72,7 +101,9 @@ class Connection(object):
 
         """
         raw_cur = self.wrapped.cursor()
-        return self._engine.cursor_class(self._engine, raw_cur)
+        cur = self._engine.cursor_class(self._engine, raw_cur, row_factory)
+        cur._connection = self
+        return cur
 
     @abc.abstractmethod
     def _can_disable_autocommit(self):
@@ -126,6 +157,8 @@ class Connection(object):
 
     def _begin(self):
 
+        self._in_transaction = True
+
         # Optimize to use the included methods if we can. We will drop back
         # into autocommit mode later.
         if self.autocommit and self._can_disable_autocommit():
@@ -137,25 +170,72 @@ class Connection(object):
             self.execute('BEGIN')
 
     def _end(self):
+        self._in_transaction = False
         if self._autocommit is not None:
-            self.autocommit = self._autocommit
+            self._set_autocommit(self._autocommit)
             self._autocommit = None
 
     def commit(self):
         """Commit changes made since the transaction started."""
         if self.autocommit:
             raise RuntimeError("Connection is in autocommit mode.")
-        self.wrapped.commit()
+        self._traced('commit', self.wrapped.commit)
         self._end()
+        if self._written_tables:
+            self._invalidate_cache(self._written_tables)
+            self._written_tables.clear()
 
     def rollback(self):
         """Rollback changes made since the transaction started."""
         if self.autocommit:
             raise RuntimeError("Connection is in autocommit mode.")
-        self.wrapped.rollback()
+        self._traced('rollback', self.wrapped.rollback)
         self._end()
+        self._written_tables.clear()
 
-    def execute(self, query, params=None):
+    def _wrote(self, tables):
+        # Others only see writes once they are committed.
+        if self.autocommit:
+            self._invalidate_cache(tables)
+        else:
+            self._written_tables.update(tables)
+
+    def _invalidate_cache(self, tables):
+        result_cache = self._engine.result_cache
+        if result_cache is not None:
+            result_cache.invalidate(*tables)
+
+    def run_transaction(self, func, retry=None):
+        """Call ``func(self)`` within a transaction, retrying it on transient errors.
+
+        Since this connection can't be replaced, errors which break it are not retried.
+
+        Retrying rolls back, which would also throw away anything done on the
+        connection before this was called; without autocommit that is still
+        in the (implicit) transaction. So that is refused with a
+        :exc:`RuntimeError`, as is calling this within :meth:`begin`;
+        :meth:`commit` or :meth:`rollback` first.
+
+        .. seealso:: :meth:`.Engine.run_transaction`
+
+        """
+        policy = retry or self._engine.retry_policy or RetryPolicy()
+        return policy.run(self._engine, func, con=self)
+
+    def _traced(self, name, func):
+        hooks = self._engine._hooks
+        if not hooks:
+            func()
+            return
+        start = time.time()
+        try:
+            func()
+        except Exception as e:
+            call_hooks(hooks, name, self._engine, start, connection=self, error=e)
+            raise
+        call_hooks(hooks, name, self._engine, start, connection=self)
+
+    def execute(self, query, params=None, row_factory=None, cache=None, timeout=None):
         """Create a cursor, and execute a query on it in one step.
 
         :return: The created :class:`.Cursor`.
@@ -165,7 +245,7 @@ class Connection(object):
         """
         # No cursor context here since it needs to be read.
         cur = self.cursor()
-        cur.execute(query, params, 1)
+        cur.execute(query, params, 1, row_factory, cache, timeout)
         return cur
 
     def select(self, *args, **kwargs):
@@ -199,6 +279,59 @@ class Connection(object):
             return cur.update(*args, **kwargs)
 
 
+    def executemany(self, query, seq_of_params, page_size=None):
+        """Create a cursor, and execute a query on it for each set of params.
+
+        .. seealso:: :meth:`.Cursor.executemany` for parameters.
+
+        """
+        with self.cursor() as cur:
+            cur.executemany(query, seq_of_params, 1, page_size)
+
+    def insert_many(self, *args, **kwargs):
+        """Pythonic wrapper for bulk inserting.
+
+        .. seealso:: :meth:`.Cursor.insert_many` for parameters and examples.
+
+        """
+        with self.cursor() as cur:
+            return cur.insert_many(*args, **kwargs)
+
+    def update_many(self, *args, **kwargs):
+        """Pythonic wrapper for bulk updating.
+
+        .. seealso:: :meth:`.Cursor.update_many` for parameters and examples.
+
+        """
+        with self.cursor() as cur:
+            cur.update_many(*args, **kwargs)
+
+    def batch(self):
+        """Collect statements to send to the database together.
+
+        :return: A :class:`.Batch`, which sends its statements when used as
+            a context manager and the context exits.
+
+        .. testcode::
+
+            with con.batch() as batch:
+                batch.insert('foo', dict(value=1))
+                batch.execute('UPDATE foo SET value = value + 1')
+
+            assert batch.rowcounts[0] == 1
+
+        """
+        return Batch(self)
+
+    def _execute_batch(self, statements):
+        # Drivers without anything better send them one at a time.
+        cur = self.wrapped.cursor()
+        try:
+            return execute_serially(cur, statements)
+        finally:
+            cur.close()
+
+
 class TransactionContext(object):
 
     def __init__(self, con):
@@ -1,10 +1,15 @@
 import abc
+import time
 
 import six
 
+from .cache import CachedResult, find_tables, find_written_tables
+from .hooks import call_hooks
 from .params import Params
 from .query import bind, SQL
-from .row import RowList
+from .row import ColumnarRowList, build_row_maker
+from .types import decode_row, decode_rows
+from .watchdog import QueryTimeout, watchdog
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -17,14 +22,34 @@ class Cursor(object):
 
     """
 
-    def __init__(self, engine, raw):
+    def __init__(self, engine, raw, row_factory=None):
         self._engine = engine
         self.wrapped = raw
+        # The Connection which made this, if any.
+        self._connection = None
+        self.row_factory = row_factory
+        # Where results are fetched from; the wrapped cursor unless they came
+        # from the engine's result cache.
+        self._source = raw
+        self.row_list_class = engine.row_list_class
+        self._wrap_row = None
+        self._make_row = None
+        self._decoders = ()
+        # The unbound query of the last traced execute, for fetch events.
+        self._template = None
 
     def __getattr__(self, key):
         """Attributes that are not provided by dbapix are passed through to the wrapped cursor."""
         return getattr(self.wrapped, key)
 
+    @property
+    def description(self):
+        return self._source.description
+
+    @property
+    def rowcount(self):
+        return self._source.rowcount
+
     def __enter__(self):
         return self
 
@@ -37,9 +62,15 @@ class Cursor(object):
         :return: A :class:`.Row`, or ``None`` when no more data is available.
 
         """
-        raw = self.wrapped.fetchone()
-        if raw is not None:
-            return self._engine.row_class(raw, self)
+        if self._engine._hooks:
+            return self._traced_fetch(self._fetchone)
+        return self._fetchone()
+
+    def _fetchone(self):
+        raw = self._source.fetchone()
+        if raw is not None and self._make_row is not None:
+            return self._make_row(raw)
+        return raw
 
     def fetchmany(self, size=None):
         """Fetch the next set of rows of a query result set.
@@ -50,13 +81,12 @@ class Cursor(object):
         """
         if size is None:
             size = self.arraysize
-        rows = RowList(self)
-        while len(rows) < size:
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
-        return rows
+        if self._engine._hooks:
+            return self._traced_fetch(self._fetchmany, size)
+        return self._build_row_list(self._source.fetchmany(size))
+
+    def _fetchmany(self, size):
+        return self._build_row_list(self._source.fetchmany(size))
 
     def fetchall(self):
         """Fetch all (remaining) rows of a query result set.
@@ -64,20 +94,69 @@ class Cursor(object):
         :return: A :class:`.RowList` of zero or more :class:`.Row`.
 
         """
-        rows = RowList(self)
-        while True:
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
-        return rows
+        if self._engine._hooks:
+            return self._traced_fetch(self._fetchall)
+        return self._build_row_list(self._source.fetchall())
+
+    def _fetchall(self):
+        return self._build_row_list(self._source.fetchall())
+
+    def _build_row_list(self, raw_rows):
+        return self.row_list_class._from_cursor(self, raw_rows)
+
+    def _traced_fetch(self, func, *args):
+        hooks = self._engine._hooks
+        start = time.time()
+        try:
+            res = func(*args)
+        except Exception as e:
+            call_hooks(hooks, 'fetch', self._engine, start, cursor=self, error=e,
+                template=self._template)
+            raise
+        rows = (0 if res is None else 1) if func == self._fetchone else len(res)
+        call_hooks(hooks, 'fetch', self._engine, start, cursor=self, rows=rows,
+            template=self._template)
+        return res
 
     def __iter__(self):
+        if self._engine._hooks:
+            return self._traced_iter()
+        return self._iter()
+
+    def _iter(self):
+        fetchone = self._source.fetchone
+        make_row = self._make_row
         while True:
-            row = self.fetchone()
-            if row is None:
+            raw = fetchone()
+            if raw is None:
                 return
-            yield row
+            yield raw if make_row is None else make_row(raw)
+
+    def _traced_iter(self):
+        # One event for the whole iteration, timing only the fetching.
+        hooks = self._engine._hooks
+        rows = 0
+        elapsed = 0
+        start = time.time()
+        fetchone = self._fetchone
+        error = None
+        try:
+            while True:
+                t = time.time()
+                try:
+                    row = fetchone()
+                except Exception as e:
+                    error = e
+                    raise
+                finally:
+                    elapsed += time.time() - t
+                if row is None:
+                    return
+                rows += 1
+                yield row
+        finally:
+            call_hooks(hooks, 'fetch', self._engine, start, elapsed,
+                cursor=self, rows=rows, error=error, template=self._template)
 
     def __next__(self):
         row = self.fetchone()
@@ -87,13 +166,22 @@ class Cursor(object):
 
     next = __next__
 
-    def execute(self, query, params=None, _stack_depth=0):
+    def execute(self, query, params=None, _stack_depth=0, row_factory=None, cache=None, timeout=None):
         """Execute a query.
 
         :param str query: The SQL to execute.
         :param params: A ``tuple``, ``dict``, or ``None``.
         :param int _stack_depth: How many steps up the callchain to pull f-string-style
             parameters from.
+        :param row_factory: How to wrap the rows of this result set; overrides
+            :attr:`Cursor.row_factory`. See :ref:`row_factories`.
+        :param cache: ``True`` or a TTL in seconds to read through the engine's
+            :class:`.ResultCache` (if it has one).
+        :param float timeout: Seconds to let the query run before cancelling
+            it; defaults to the engine's :attr:`~.Engine.statement_timeout`.
+        :raises QueryTimeout: If the timeout was hit. The transaction (if
+            any) has been rolled back.
+        :raises ValueError: If given a timeout, but the driver can't cancel queries.
         
         .. testcode::
 
@@ -104,8 +192,96 @@ class Cursor(object):
 
         """
         bound = bind(query, params, _stack_depth + 1)
-        query, params = bound(self._engine)
-        res = self.wrapped.execute(query, params)
+        sql, params = bound(self._engine)
+        params = self._engine.types.encode_params(params)
+
+        hooks = self._engine._hooks
+        if not hooks:
+            self._execute(sql, params, row_factory, cache, timeout)
+            return self
+
+        self._template = query
+        start = time.time()
+        try:
+            cached = self._execute(sql, params, row_factory, cache, timeout)
+        except Exception as e:
+            call_hooks(hooks, 'execute', self._engine, start, cursor=self, error=e,
+                template=query, sql=sql, param_count=len(params or ()), executions=1)
+            raise
+        call_hooks(hooks, 'execute', self._engine, start, cursor=self, cached=cached,
+            template=query, sql=sql, param_count=len(params or ()), executions=1,
+            rowcount=self.rowcount)
+
+        return self
+
+    def _execute(self, query, params, row_factory, cache, timeout=None):
+
+        # Returns if the results came from the cache.
+
+        engine_cache = self._engine.result_cache
+        result_cache = engine_cache if cache else None
+        if result_cache is not None and self._connection is not None and (
+            self._connection._in_transaction or not self._connection.autocommit
+        ):
+            # Results may not be committed (or may differ from what others see).
+            result_cache = None
+        if result_cache is not None:
+            key = result_cache.make_key(query, params)
+            entry = result_cache.get(key)
+            if entry is not None:
+                self._source = CachedResult(entry.description, entry.rows)
+                self._prepare_results(row_factory)
+                return True
+
+        self._source = self.wrapped
+
+        if timeout is None:
+            timeout = self._engine.statement_timeout
+        if timeout is None:
+            self.wrapped.execute(query, params)
+        else:
+            self._execute_with_timeout(query, params, timeout)
+
+        if engine_cache is not None:
+            written = find_written_tables(query)
+            if written:
+                self._invalidate_cache(*written)
+
+        if result_cache is not None:
+            rows = self.wrapped.fetchall()
+            result_cache.put(key, self.wrapped.description, rows, find_tables(query),
+                ttl=None if cache is True else cache)
+            self._source = CachedResult(self.wrapped.description, rows)
+
+        self._prepare_results(row_factory)
+
+        return False
+
+    def _execute_with_timeout(self, query, params, timeout):
+
+        cancel = self._engine._get_canceller(self.wrapped)
+        if cancel is None:
+            raise ValueError("{} does not support query timeouts.".format(type(self._engine).__module__))
+
+        alarm = watchdog.schedule(timeout, cancel)
+        try:
+            self.wrapped.execute(query, params)
+        except Exception as e:
+            alarm.cancel()
+            if not alarm.fired:
+                raise
+            self._raise_timeout(timeout, e)
+        alarm.cancel()
+
+    def _raise_timeout(self, timeout, e):
+        # Leave the connection clean; the transaction is dead anyways.
+        try:
+            self.wrapped.connection.rollback()
+        except Exception:
+            pass
+        six.raise_from(QueryTimeout(timeout, e), e)
+
+    def _prepare_results(self, row_factory=None):
 
         self._field_names = []
         self._field_indexes = {}
@@ -113,7 +289,19 @@ class Cursor(object):
             self._field_names.append(field[0])
             self._field_indexes[field[0]] = i
 
-        return self
+        factory = row_factory or self.row_factory or self._engine.row_factory
+        make_row = self._wrap_row = build_row_maker(factory, self)
+
+        # Fold decoding into the per-row function so every fetch path gets it.
+        decoders = self._decoders = self._engine.types.compile_decoders(self.description)
+        if decoders:
+            if make_row is None:
+                make_row = lambda raw: decode_row(raw, decoders)
+            else:
+                wrap = make_row
+                make_row = lambda raw: wrap(decode_row(raw, decoders))
+
+        self._make_row = make_row
 
     def insert(self, table_name, data, returning=None):
 
@@ -138,9 +326,10 @@ class Cursor(object):
 
         query = ' '.join(parts)
         self.execute(query, params)
+        self._invalidate_cache(table_name)
 
         if returning:
-            return next(self)[0]
+            return self._source.fetchone()[0]
 
     def update(self, table_name, data, where, where_params=(), _stack_depth=0):
 
@@ -166,10 +355,165 @@ class Cursor(object):
         query = ' '.join(parts)
 
         self.execute(query, params)
+        self._invalidate_cache(table_name)
+
+        return self
+
+    def executemany(self, query, seq_of_params, _stack_depth=0, page_size=None):
+        """Execute a query once for each set of parameters.
+
+        :param str query: The SQL to execute.
+        :param seq_of_params: An iterable of ``tuple`` or ``dict`` params, as
+            would be passed to :meth:`execute`.
+        :param int page_size: For drivers which batch (e.g. Postgres), how many
+            sets of params to send per round trip.
+
+        The query is bound to each set of params, which must all render to the
+        same SQL. Drivers may send many sets in a single round trip.
+
+        Any rows the query returns (e.g. via ``RETURNING``) are dropped; use
+        :meth:`insert_many` with ``returning``, or :meth:`execute` per set.
+
+        .. testcode::
+
+            cur.executemany('INSERT INTO foo (value) VALUES ({})', [(1, ), (2, )])
+
+        """
+
+        sql = None
+        all_params = []
+        for params in seq_of_params:
+            bound_sql, params = bind(query, params, _stack_depth + 1)(self._engine)
+            if sql is None:
+                sql = bound_sql
+            elif bound_sql != sql:
+                raise ValueError("Params render to different queries in executemany.")
+            all_params.append(self._engine.types.encode_params(params))
+
+        self._source = self.wrapped
+        if not all_params:
+            return self
+
+        hooks = self._engine._hooks
+        if not hooks:
+            self._executemany(sql, all_params, page_size)
+            self._invalidate_written(sql)
+            return self
+
+        self._template = query
+        start = time.time()
+        try:
+            self._executemany(sql, all_params, page_size)
+        except Exception as e:
+            call_hooks(hooks, 'execute', self._engine, start, cursor=self, error=e,
+                template=query, sql=sql, param_count=len(all_params[0] or ()), executions=len(all_params))
+            raise
+        call_hooks(hooks, 'execute', self._engine, start, cursor=self,
+            template=query, sql=sql, param_count=len(all_params[0] or ()), executions=len(all_params),
+            rowcount=self.rowcount)
+        self._invalidate_written(sql)
 
         return self
 
-    def select(self, table_name, fields, where=None, where_params=(), _stack_depth=0):
+    def _executemany(self, query, all_params, page_size=None):
+        self.wrapped.executemany(query, all_params)
+
+    def _build_insert(self, table_name, names, returning=None):
+        parts = [
+            'INSERT INTO',
+            self._engine.quote_identifier(table_name),
+            '(%s)' % ', '.join(self._engine.quote_identifier(n) for n in names),
+            'VALUES (%s)' % ', '.join('{}' for _ in names),
+        ]
+        if returning:
+            parts.append('RETURNING {}'.format(self._engine.quote_identifier(returning)))
+        return ' '.join(parts)
+
+    def insert_many(self, table_name, rows, returning=None, page_size=None):
+        """Insert many rows at once.
+
+        :param str table_name: The table to insert into.
+        :param rows: A sequence of ``dict``, which must all have the same keys.
+        :param str returning: A column to return from each inserted row.
+        :param int page_size: See :meth:`executemany`.
+        :return: A list of the ``returning`` column if requested.
+
+        Postgres sends many rows per statement via ``psycopg2.extras.execute_values``,
+        including when ``returning``.
+
+        """
+
+        rows = list(rows)
+        if not rows:
+            return [] if returning else None
+
+        names = sorted(rows[0])
+        query = self._build_insert(table_name, names, returning)
+
+        if returning:
+            # Not all drivers can return from executemany.
+            out = []
+            for row in rows:
+                self.execute(query, [row[n] for n in names])
+                out.append(self._source.fetchone()[0])
+        else:
+            self.executemany(query, ([row[n] for n in names] for row in rows), page_size=page_size)
+
+        self._invalidate_cache(table_name)
+
+        if returning:
+            return out
+
+    def update_many(self, table_name, rows, key, page_size=None):
+        """Update many rows at once, each identified by its key column(s).
+
+        :param str table_name: The table to update.
+        :param rows: A sequence of ``dict``, which must all have the same keys.
+        :param key: The name, or list of names, of the column(s) which identify
+            each row; the rest of the columns are set.
+        :param int page_size: See :meth:`executemany`.
+
+        Like :meth:`executemany`, this does not return any rows.
+
+        .. testcode::
+
+            cur.update_many('foo', [dict(bar=1, baz=2), dict(bar=3, baz=4)], key='bar')
+
+        """
+
+        rows = list(rows)
+        if not rows:
+            return self
+
+        keys = [key] if isinstance(key, six.string_types) else list(key)
+        names = sorted(n for n in rows[0] if n not in keys)
+
+        query = 'UPDATE {} SET {} WHERE {}'.format(
+            self._engine.quote_identifier(table_name),
+            ', '.join('{} = {{}}'.format(self._engine.quote_identifier(n)) for n in names),
+            ' AND '.join('{} = {{}}'.format(self._engine.quote_identifier(n)) for n in keys),
+        )
+
+        self.executemany(query, ([row[n] for n in names + keys] for row in rows), page_size=page_size)
+        self._invalidate_cache(table_name)
+
+        return self
+
+    def _invalidate_written(self, query):
+        if self._engine.result_cache is not None:
+            written = find_written_tables(query)
+            if written:
+                self._invalidate_cache(*written)
+
+    def _invalidate_cache(self, *tables):
+        if self._engine.result_cache is None:
+            return
+        if self._connection is not None:
+            self._connection._wrote(tables)
+        else:
+            self._engine.result_cache.invalidate(*tables)
+
+    def select(self, table_name, fields, where=None, where_params=(), _stack_depth=0, cache=True):
 
         # TODO: How to escape this but allow the selectable to contain a
         # join, and for the fields to contain dots?
@@ -185,7 +529,7 @@ class Cursor(object):
             parts.append(where)
 
         query = ' '.join(parts)
-        self.execute(query, where_params, _stack_depth + 1)
+        self.execute(query, where_params, _stack_depth + 1, cache=cache)
 
         return self
 
@@ -200,9 +544,11 @@ class Cursor(object):
 
         """
 
-        # Gotta be careful to give it an actual list.
+        # Straight from columns, without building any rows.
         if rows is None:
-            rows = self.fetchall()
+            return ColumnarRowList._from_cursor(self, self._source.fetchall()).as_dataframe(**kwargs)
+        if isinstance(rows, ColumnarRowList):
+            return rows.as_dataframe(**kwargs)
 
         # Pandas strictly requires specific types... or to be very generic.
         # We really don't know the performance impact of this.
@@ -213,4 +559,133 @@ class Cursor(object):
 
         import pandas
         return pandas.DataFrame.from_records(iter(rows), **kwargs)
-    
+
+    def iter_arrow_batches(self, batch_size=10000, schema=None):
+        """Fetch all (remaining) rows as a stream of ``pyarrow.RecordBatch``.
+
+        Rows are pulled from the wrapped cursor ``batch_size`` at a time and
+        converted directly into columns; no :class:`.Row` objects are built.
+
+        :param int batch_size: Upper limit of rows in each batch.
+        :param schema: A ``pyarrow.Schema`` to use instead of the one derived
+            from :attr:`description`.
+        :return: A generator of ``pyarrow.RecordBatch``.
+
+        Column types are mapped from the ``type_code`` in :attr:`description`
+        where the driver provides one. Any others are inferred from the first
+        batch and then held for all that follow, so a column that is entirely
+        ``NULL`` in the first batch may need an explicit ``schema``.
+
+        """
+
+        import pyarrow
+
+        if schema is None:
+            names = [f[0] for f in self.description]
+            types = [self._engine._get_arrow_type(f[1]) for f in self.description]
+        else:
+            names = schema.names
+            types = schema.types
+
+        while True:
+
+            raw = self._source.fetchmany(batch_size)
+            if not raw:
+                break
+            if self._decoders:
+                raw = decode_rows(raw, self._decoders)
+
+            columns = zip(*raw)
+            arrays = [pyarrow.array(col, type=type_) for col, type_ in zip(columns, types)]
+
+            if schema is None:
+                schema = pyarrow.schema([pyarrow.field(n, a.type) for n, a in zip(names, arrays)])
+                types = schema.types
+
+            yield pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _get_arrow_schema(self):
+        import pyarrow
+        return pyarrow.schema([
+            pyarrow.field(f[0], self._engine._get_arrow_type(f[1]) or pyarrow.null())
+            for f in self.description
+        ])
+
+    def to_arrow(self, batch_size=10000, schema=None):
+        """Fetch all (remaining) rows as a ``pyarrow.Table``.
+
+        .. seealso:: :meth:`iter_arrow_batches` for parameters.
+
+        :return: ``pyarrow.Table``
+
+        """
+
+        import pyarrow
+
+        batches = list(self.iter_arrow_batches(batch_size, schema))
+        if batches:
+            return pyarrow.Table.from_batches(batches)
+        return pyarrow.Table.from_batches([], schema=schema or self._get_arrow_schema())
+
+    def write_parquet(self, path, row_group_size=None, batch_size=10000, schema=None, **kwargs):
+        """Stream all (remaining) rows into a Parquet file.
+
+        :param path: Path or file-like object to write to.
+        :param int row_group_size: Rows per Parquet row group; defaults to one
+            row group per fetched batch.
+        :param int batch_size: Rows to fetch from the database at a time.
+        :param schema: See :meth:`iter_arrow_batches`.
+        :param \\**kwargs: Passed to ``pyarrow.parquet.ParquetWriter``
+            (e.g. ``compression``).
+        :return: The number of rows written.
+
+        Only one row group's worth of data is held in memory at a time.
+
+        """
+
+        import pyarrow
+        import pyarrow.parquet
+
+        writer = None
+        pending = []
+        pending_rows = 0
+        total = 0
+
+        try:
+
+            for batch in self.iter_arrow_batches(batch_size, schema):
+
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(path, batch.schema, **kwargs)
+
+                total += batch.num_rows
+
+                if row_group_size is None:
+                    writer.write_table(pyarrow.Table.from_batches([batch]))
+                    continue
+
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows < row_group_size:
+                    continue
+
+                # Write out whole row groups, and hold onto the remainder.
+                table = pyarrow.Table.from_batches(pending)
+                full = pending_rows - pending_rows % row_group_size
+                writer.write_table(table.slice(0, full), row_group_size=row_group_size)
+                rest = table.slice(full)
+                pending = rest.to_batches()
+                pending_rows = rest.num_rows
+
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, schema or self._get_arrow_schema(), **kwargs)
+
+            if pending_rows:
+                writer.write_table(pyarrow.Table.from_batches(pending), row_group_size=row_group_size)
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return total
+
@@ -0,0 +1,115 @@
+"""Shared between the MySQL drivers."""
+
+from __future__ import absolute_import
+
+import threading
+
+import six
+
+from dbapix.batch import BatchError
+from dbapix.retry import CONNECTION, TRANSACTION
+
+
+# CLIENT.MULTI_STATEMENTS in both drivers.
+MULTI_STATEMENTS = 1 << 16
+
+# ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT.
+_transaction_errors = (1213, 1205)
+
+# CR_SERVER_GONE_ERROR, CR_SERVER_LOST, and CR_SERVER_LOST_EXTENDED.
+_connection_errors = (2006, 2013, 2055)
+
+
+def _text(sql):
+    if isinstance(sql, six.binary_type):
+        return sql.decode('utf8', 'replace')
+    return sql
+
+
+class EngineMixin(object):
+
+    """Error classification, query cancellation, and Arrow types shared by the MySQL engines."""
+
+    # Keyed by MySQL field type (the same in both drivers). BIGINT is left to
+    # be inferred since it may be unsigned, and strings since they may be binary.
+    _arrow_types = {
+        1: ('int64', ), # TINY
+        2: ('int64', ), # SHORT
+        3: ('int64', ), # LONG
+        4: ('float64', ), # FLOAT
+        5: ('float64', ), # DOUBLE
+        7: ('timestamp', 'us'), # TIMESTAMP
+        9: ('int64', ), # INT24
+        10: ('date32', ), # DATE
+        12: ('timestamp', 'us'), # DATETIME
+    }
+
+    def _get_canceller(self, raw_cur):
+
+        # The connection is busy with the query, so it is killed from another.
+        thread_id = raw_cur.connection.thread_id()
+
+        def kill(query):
+            try:
+                con = self._connect(None)
+                try:
+                    cur = con.cursor()
+                    # The query may have finished (and the next started) while
+                    # we connected, so only kill it if it is still what timed out.
+                    cur.execute('SELECT INFO FROM information_schema.PROCESSLIST WHERE ID = {:d}'.format(thread_id))
+                    row = cur.fetchone()
+                    if row and (query is None or _text(row[0]) == query):
+                        cur.execute('KILL QUERY {:d}'.format(thread_id))
+                finally:
+                    con.close()
+            except Exception:
+                self._log.exception("Could not cancel MySQL query on connection {}.".format(thread_id))
+
+        def cancel():
+            # Both drivers keep the SQL they last sent here.
+            query = _text(getattr(raw_cur, '_executed', None))
+            # Connecting is slow, and would hold up the watchdog's other alarms.
+            thread = threading.Thread(target=kill, args=(query, ), name='dbapix-mysql-kill')
+            thread.daemon = True
+            thread.start()
+
+        return cancel
+
+    def _classify_error(self, e):
+        if not isinstance(e, self._error_class) or not e.args:
+            return
+        code = e.args[0]
+        if code in _transaction_errors:
+            return TRANSACTION
+        if code in _connection_errors:
+            return CONNECTION
+
+
+class BatchMixin(object):
+
+    """Sends batches as one multi-statement string, if the connection allows it."""
+
+    def _execute_batch(self, statements):
+
+        if not self._engine.connect_kwargs.get('client_flag', 0) & MULTI_STATEMENTS:
+            return super(BatchMixin, self)._execute_batch(statements)
+
+        cur = self.wrapped.cursor()
+        rowcounts = []
+        try:
+            sql = b';\n'.join(self._mogrify(cur, query, params) for query, params in statements)
+            # Each statement has its own result, and an error stops the rest.
+            cur.execute(sql)
+            rowcounts.append(cur.rowcount)
+            while cur.nextset():
+                rowcounts.append(cur.rowcount)
+        except self._engine._error_class as e:
+            i = len(rowcounts)
+            if i >= len(statements):
+                raise
+            query, params = statements[i]
+            six.raise_from(BatchError(i, query, params, e), e)
+        finally:
+            cur.close()
+
+        return rowcounts
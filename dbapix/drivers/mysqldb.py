@@ -1,13 +1,16 @@
 from __future__ import absolute_import
 
 import MySQLdb
+import six
 
 from dbapix.connection import Connection as _Connection
 from dbapix.cursor import Cursor as _Cursor
 from dbapix.engine import SocketEngine as _Engine
 
+from ._mysql import BatchMixin, EngineMixin
 
-class Connection(_Connection):
+
+class Connection(BatchMixin, _Connection):
 
     def __init__(self, *args, **kwargs):
         super(Connection, self).__init__(*args, **kwargs)
@@ -38,8 +41,17 @@ class Connection(_Connection):
         # It is a method in the superclass.
         self.wrapped.autocommit(value)
 
+    def _mogrify(self, cur, query, params):
+        # The same as MySQLdb's own Cursor.execute does.
+        db = self.wrapped
+        if isinstance(query, six.text_type):
+            query = query.encode(db.encoding)
+        if params:
+            query = query % tuple(db.literal(p) for p in params)
+        return query
+
 
-class Engine(_Engine):
+class Engine(EngineMixin, _Engine):
 
     paramstyle = 'format'
     placeholder = '%s'
@@ -47,7 +59,9 @@ class Engine(_Engine):
     connection_class = Connection
 
     default_port = 3306
-    
+
+    _error_class = MySQLdb.Error
+
     def _connect(self, timeout):
         return MySQLdb.Connect(
             **self.connect_kwargs
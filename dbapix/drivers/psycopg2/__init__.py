@@ -2,19 +2,29 @@ from __future__ import absolute_import
 
 import psycopg2 as pg
 import psycopg2.extensions as pgx
-import psycopg2.extras
 import six
 
+from dbapix.batch import BatchError
 from dbapix.connection import Connection as _Connection
 from dbapix.cursor import Cursor as _Cursor
 from dbapix.engine import SocketEngine as _Engine
-from dbapix.query import SQL
+from dbapix.query import SQL, bind
+from dbapix.retry import CONNECTION, TRANSACTION
 
+from . import export as _export
+from .multiplex import gather as _gather
 
 
-# This is setting up global state, but it is with our own class,
-# so it shouldn't affect anyone else.
-pgx.register_adapter(SQL, pgx.AsIs)
+_adapters_registered = False
+
+def _register_adapters():
+    # This is setting up global state, but it is with our own class,
+    # so it shouldn't affect anyone else. Deferred until the first engine
+    # so that merely importing us has no side effects.
+    global _adapters_registered
+    if not _adapters_registered:
+        pgx.register_adapter(SQL, pgx.AsIs)
+        _adapters_registered = True
 
 
 _status_names = {
@@ -28,6 +38,41 @@ _status_names = {
 
 class Connection(_Connection):
 
+    def reset_session(self, autocommit=False, isolation_level=None, readonly=None, deferrable=None):
+        """Reset the connection to an initial clean state.
+
+        :param bool autocommit:
+        :param isolation_level: A name (e.g. ``"SERIALIZABLE"``) or one of the
+            ``psycopg2.extensions.ISOLATION_LEVEL_*`` constants; ``None`` for
+            the server's default.
+        :param bool readonly: ``None`` for the server's default.
+        :param bool deferrable: ``None`` for the server's default.
+
+        The requested state is compared to psycopg2's (client-side) view of
+        the session, and ``set_session`` is only called if they differ.
+
+        .. seealso:: :meth:`dbapix.connection.Connection.reset_session`
+
+        """
+
+        if isinstance(isolation_level, six.string_types):
+            name = isolation_level.upper().replace(' ', '_')
+            isolation_level = None if name == 'DEFAULT' else getattr(pgx, 'ISOLATION_LEVEL_' + name)
+
+        con = self.wrapped
+        if (con.isolation_level, con.readonly, con.deferrable) != (isolation_level, readonly, deferrable):
+            # None means "no change" to set_session, so we swap in 'DEFAULT'.
+            default = lambda x: 'DEFAULT' if x is None else x
+            con.set_session(
+                isolation_level=default(isolation_level),
+                readonly=default(readonly),
+                deferrable=default(deferrable),
+            )
+        else:
+            self._engine.avoided_session_changes += 1
+
+        self._set_autocommit(autocommit)
+
     def _can_disable_autocommit(self):
         return self.wrapped.get_transaction_status() == pgx.TRANSACTION_STATUS_IDLE
 
@@ -39,35 +84,355 @@ class Connection(_Connection):
         if status != pgx.TRANSACTION_STATUS_IDLE:
             return _status_names.get(status, status)
 
+    def _execute_batch(self, statements):
+
+        cur = self.wrapped.cursor()
+        try:
+
+            # One string, so one round trip. Everything will be rolled back on
+            # an error, since in autocommit Postgres runs it as one
+            # transaction, and otherwise we have the savepoint.
+            sql = b';\n'.join(cur.mogrify(query, params) for query, params in statements)
+            if self.autocommit:
+                begin, end, undo = 'BEGIN', 'COMMIT', 'ROLLBACK'
+            else:
+                begin, end, undo = 'SAVEPOINT _dbapix_batch', 'RELEASE _dbapix_batch', 'ROLLBACK TO _dbapix_batch'
+                cur.execute(begin)
+
+            try:
+                cur.execute(sql)
+            except pg.Error as e:
+                if not self.autocommit:
+                    cur.execute(undo)
+                self._find_batch_error(cur, statements, begin, end, undo, e)
+
+            # Only the last statement's status comes back.
+            rowcounts = [None] * (len(statements) - 1) + [cur.rowcount]
+
+            if not self.autocommit:
+                cur.execute(end)
+
+            return rowcounts
+
+        finally:
+            cur.close()
+
+    def _find_batch_error(self, cur, statements, begin, end, undo, error):
+
+        # Replay them one at a time to find which one failed, and then
+        # undo all of them.
+        if self.autocommit:
+            cur.execute(begin)
+
+        failed = None
+        for i, (query, params) in enumerate(statements):
+            try:
+                cur.execute(query, params)
+            except pg.Error as e:
+                failed = BatchError(i, query, params, e)
+                break
+
+        cur.execute(undo)
+        if not self.autocommit:
+            cur.execute(end)
+
+        if failed is None:
+            # It didn't fail the second time around.
+            failed = BatchError(None, None, None, error)
+        six.raise_from(failed, failed.error)
+
+    def copy_to(self, *args, **kwargs):
+        """Create a cursor, and ``COPY`` the results of a query to a file.
+
+        .. seealso:: :meth:`Cursor.copy_to` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1
+        with self.cursor() as cur:
+            return cur.copy_to(*args, **kwargs)
+
+    def iter_copy(self, *args, **kwargs):
+        """Create a cursor, and stream the results of a query via ``COPY``.
+
+        .. seealso:: :meth:`Cursor.iter_copy` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1
+        return self.cursor().iter_copy(*args, **kwargs)
+
+    def iter_copy_rows(self, *args, **kwargs):
+        """Create a cursor, and stream the rows of a query via ``COPY``.
+
+        .. seealso:: :meth:`Cursor.iter_copy_rows` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1
+        return self.cursor().iter_copy_rows(*args, **kwargs)
+
+    def copy_rows(self, *args, **kwargs):
+        """Create a cursor, and fetch the rows of a query via ``COPY``.
+
+        .. seealso:: :meth:`Cursor.copy_rows` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1
+        with self.cursor() as cur:
+            return cur.copy_rows(*args, **kwargs)
+
+
+class Cursor(_Cursor):
+
+    """A Postgres cursor, which can also export results via ``COPY``.
+
+    ``COPY (query) TO STDOUT`` sends results as one stream instead of row by
+    row, which is much faster for large exports. The query is bound as in
+    :meth:`~.Cursor.execute`, and the params are inlined into it::
+
+        with open('foo.csv', 'wb') as fh:
+            con.copy_to(fh, 'SELECT * FROM foo WHERE bar = {bar}', header=True)
+
+        for chunk in con.iter_copy('SELECT * FROM foo', format='binary'):
+            upload(chunk)
+
+        df = cur.as_dataframe(con.copy_rows('SELECT * FROM foo'))
+
+    """
+
+    def _build_copy_query(self, query, params, _stack_depth):
+        sql, params = bind(query, params, _stack_depth + 1)(self._engine)
+        params = self._engine.types.encode_params(params)
+        if params:
+            sql = self.wrapped.mogrify(sql, params)
+            if not isinstance(sql, six.text_type):
+                sql = sql.decode(pgx.encodings[self.wrapped.connection.encoding])
+        return sql
+
+    def copy_to(self, file, query, params=None, format='csv', header=False, chunk_size=65536, _stack_depth=0):
+        """Write the results of a query to a file via ``COPY ... TO STDOUT``.
+
+        :param file: A file-like object to write to; opened in binary mode
+            unless it is a text file.
+        :param str query: The ``SELECT`` to export.
+        :param params: A ``tuple``, ``dict``, or ``None``.
+        :param str format: One of ``"csv"``, ``"text"``, or ``"binary"``.
+        :param bool header: Should the output start with the column names?
+        :param int chunk_size: Bytes to read at a time.
+        :return: The number of rows written.
+
+        """
+        query = self._build_copy_query(query, params, _stack_depth + 1)
+        self._source = self.wrapped
+        self.wrapped.copy_expert(_export.build_copy(query, format, header), file, size=chunk_size)
+        return self.wrapped.rowcount
+
+    def iter_copy(self, query, params=None, format='csv', header=False, chunk_size=65536, _stack_depth=0):
+        """Stream the results of a query via ``COPY ... TO STDOUT``.
+
+        :param int chunk_size: Bytes in each chunk (apart from the last).
+        :return: A generator of ``bytes``.
+
+        Only a few chunks are held in memory at a time. If the generator is
+        closed before it is finished, the query is cancelled, which aborts
+        any transaction it is part of.
+
+        .. seealso:: :meth:`copy_to` for the other parameters.
+
+        """
+        query = self._build_copy_query(query, params, _stack_depth + 1)
+        self._source = self.wrapped
+        return _export.iter_copy(self.wrapped, _export.build_copy(query, format, header), chunk_size)
+
+    def _iter_copy_raw(self, query, params, row_factory, chunk_size, _stack_depth):
+
+        query = self._build_copy_query(query, params, _stack_depth + 1)
+
+        # Find the columns and their types as a fetch would see them.
+        self._source = self.wrapped
+        self.wrapped.execute('SELECT * FROM ({}) AS _dbapix_copy LIMIT 0'.format(query))
+        self._prepare_results(row_factory)
+        casters = _export.get_casters(self.description)
+
+        encoding = pgx.encodings[self.wrapped.connection.encoding]
+        chunks = _export.iter_copy(self.wrapped, _export.build_copy(query, 'text'), chunk_size)
+        return _export.cast_rows(self.wrapped, _export.iter_text_rows(chunks, encoding), casters)
+
+    def iter_copy_rows(self, query, params=None, row_factory=None, chunk_size=65536, _stack_depth=0):
+        """Stream the rows of a query via ``COPY ... TO STDOUT``.
+
+        Rows are parsed out of the text format, and values converted by
+        psycopg2's typecasters, so they are the same as :meth:`~.Cursor.fetchone`
+        would return. Only a few chunks are held in memory at a time, but the
+        parsing is done in Python, so this is slower than a plain fetch; it is
+        :meth:`copy_to` and :meth:`iter_copy` which are much faster.
+
+        :param row_factory: See :meth:`~.Cursor.execute`.
+        :return: A generator of rows.
+
+        .. seealso:: :meth:`iter_copy` for the other parameters.
+
+        """
+        raw = self._iter_copy_raw(query, params, row_factory, chunk_size, _stack_depth + 1)
+        make_row = self._make_row
+        if make_row is None:
+            return raw
+        return (make_row(r) for r in raw)
+
+    def copy_rows(self, query, params=None, row_factory=None, chunk_size=65536, _stack_depth=0):
+        """Fetch all rows of a query via ``COPY ... TO STDOUT``.
+
+        :return: A :class:`.RowList` (or the engine's :attr:`~.Engine.row_list_class`).
+
+        .. seealso:: :meth:`iter_copy_rows` for parameters.
+
+        """
+        raw = self._iter_copy_raw(query, params, row_factory, chunk_size, _stack_depth + 1)
+        return self._build_row_list(list(raw))
+
+    def _executemany(self, query, all_params, page_size=None):
+        # Deferred, as it is slow to import (e.g. it pulls in ssl).
+        import psycopg2.extras
+        psycopg2.extras.execute_batch(self.wrapped, query, all_params,
+            page_size=page_size or self._engine.page_size,
+        )
+
+    def insert_many(self, table_name, rows, returning=None, page_size=None):
+
+        rows = list(rows)
+        if not rows:
+            return [] if returning else None
+
+        # Percents need escaping since '%s' is the one placeholder that
+        # execute_values expects.
+        quote = lambda name: self._engine.quote_identifier(name).replace('%', '%%')
+
+        names = sorted(rows[0])
+        query = 'INSERT INTO {} ({}) VALUES %s'.format(
+            quote(table_name),
+            ', '.join(quote(n) for n in names),
+        )
+        if returning:
+            query += ' RETURNING ' + quote(returning)
+
+        encode = self._engine.types.encode_params
+        self._source = self.wrapped
+        import psycopg2.extras
+        res = psycopg2.extras.execute_values(self.wrapped, query,
+            [encode([row[n] for n in names]) for row in rows],
+            page_size=page_size or self._engine.page_size,
+            fetch=bool(returning),
+        )
+
+        self._invalidate_cache(table_name)
+
+        if returning:
+            return [r[0] for r in res]
+
 
 class Engine(_Engine):
 
     connection_class = Connection
+    cursor_class = Cursor
     
     paramstyle = 'format'
     placeholder = '%s'
 
     default_port = 5432
 
-    def reset_session(self, autocommit=False):
-        self.wrapped.set_session(
-            isolation_level='DEFAULT',
-            readonly=False,
-            deferrable=False,
-            autocommit=autocommit
-        )
+    #: How many sets of params are sent per round trip by
+    #: :meth:`~.Cursor.executemany`, :meth:`~.Cursor.insert_many`, and
+    #: :meth:`~.Cursor.update_many`, via ``psycopg2.extras``.
+    page_size = 100
+
+    # Keyed by type OID.
+    _arrow_types = {
+        16: ('bool_', ),
+        17: ('binary', ),
+        20: ('int64', ),
+        21: ('int16', ),
+        23: ('int32', ),
+        25: ('string', ),
+        700: ('float32', ),
+        701: ('float64', ),
+        1042: ('string', ),
+        1043: ('string', ),
+        1082: ('date32', ),
+        1083: ('time64', 'us'),
+        1114: ('timestamp', 'us'),
+        1184: ('timestamp', 'us', 'UTC'),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super(Engine, self).__init__(*args, **kwargs)
+        _register_adapters()
+        # Idle asynchronous connections for gather(); they can't be used
+        # like the normal ones, so they are kept apart.
+        self._async_pool = []
+
+    def close(self):
+        super(Engine, self).close()
+        while self._async_pool:
+            self._async_pool.pop().close()
 
     def _connect(self, timeout):
         return pg.connect(
             **self.connect_kwargs
         )
 
+    def gather(self, queries, max_connections=4, row_factory=None, return_exceptions=False, _stack_depth=0):
+        """Run many queries concurrently from this thread, and return all of their results.
+
+        The queries are spread over up to ``max_connections`` asynchronous
+        connections, which are kept (apart from the normal pool) for reuse::
+
+            counts = engine.gather([
+                'SELECT count(*) FROM foo',
+                ('SELECT count(*) FROM bar WHERE baz = {}', [123]),
+            ])
+
+        Asynchronous connections are always in autocommit mode, so each query
+        runs in its own transaction.
+
+        .. seealso:: :func:`dbapix.drivers.psycopg2.multiplex.gather` for parameters.
+
+        """
+        return _gather(self, queries, max_connections, row_factory, return_exceptions, _stack_depth + 1)
+
+    def _get_async_connection(self):
+        # It is fine for these to still be connecting; gather() polls them.
+        while self._async_pool:
+            con = self._async_pool.pop()
+            if not con.closed:
+                return con
+        self._prep_tunnel()
+        return pg.connect(async_=1, **self.connect_kwargs)
+
+    def _put_async_connection(self, con):
+        if con.closed:
+            return
+        if con.get_transaction_status() != pgx.TRANSACTION_STATUS_IDLE:
+            con.close()
+            return
+        self._async_pool.append(con)
+
     def _connect_exc_is_timeout(self, e):
         return (
             isinstance(e, pg.OperationalError) and
             any(x in e.args[0] for x in ('could not connect', 'starting up', 'shutting down'))
         )
 
+    def _get_canceller(self, raw_cur):
+        return raw_cur.connection.cancel
+
+    def _classify_error(self, e):
+        if not isinstance(e, pg.Error):
+            return
+        # serialization_failure and deadlock_detected.
+        if e.pgcode in ('40001', '40P01'):
+            return TRANSACTION
+        # Errors without a code didn't come from the server, e.g. it went away.
+        if e.pgcode is None and isinstance(e, (pg.OperationalError, pg.InterfaceError)):
+            return CONNECTION
+
 
 
 
@@ -0,0 +1,277 @@
+"""Receiving Postgres ``NOTIFY`` events.
+
+"""
+
+from __future__ import absolute_import
+
+import collections
+import errno
+import json
+import logging
+import os
+import select
+import threading
+
+import psycopg2 as pg
+import psycopg2.extensions as pgx
+import six
+
+
+log = logging.getLogger(__name__)
+
+
+#: A received notification. ``payload`` has been decoded by the listener's serializer.
+Event = collections.namedtuple('Event', 'channel payload pid')
+
+
+_serializers = {
+    'json': json,
+}
+
+
+class EventListener(object):
+
+    """Listens for ``NOTIFY`` events on a dedicated connection, and passes them to handlers.
+
+    :param engine: The :class:`~dbapix.drivers.psycopg2.Engine` to connect with.
+    :param serializer: ``None`` for text payloads, ``"json"``, or anything
+        with ``loads`` and ``dumps`` functions.
+    :param int max_workers: How many threads to call handlers on.
+    :param int batch_size: Most events to hand to a worker at once.
+    :param float reconnect_delay: Seconds to wait before reconnecting after
+        the connection is lost.
+
+    One thread waits on the connection's socket (so is idle until something
+    arrives), drains all waiting notifications, and passes them in batches
+    to a pool of workers. Within a batch, handlers are called in the order
+    events arrived, but batches may run at the same time::
+
+        listener = EventListener(engine, serializer='json')
+
+        @listener.on('jobs')
+        def handle(event):
+            print(event.channel, event.payload)
+
+        listener.start()
+        listener.notify('jobs', {'id': 123})
+
+    If the connection is lost, it is reopened and every channel is listened
+    to again. Events sent while disconnected are lost. Other errors (e.g. a
+    failed ``LISTEN``) are logged, kept in :attr:`error`, and retried on a
+    new connection after ``reconnect_delay``.
+
+    """
+
+    def __init__(self, engine, serializer=None, max_workers=4, batch_size=100, reconnect_delay=1.0):
+
+        self.engine = engine
+        if isinstance(serializer, six.string_types):
+            serializer = _serializers[serializer]
+        self.serializer = serializer
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.reconnect_delay = reconnect_delay
+
+        self._handlers = {}
+        self._lock = threading.Lock()
+
+        self._thread = None
+        self._executor = None
+        self._stopping = False
+        self._wake_r = self._wake_w = None
+
+        self._con = None
+        self._listening = set()
+
+        #: The last unexpected error in the listening thread, or ``None``.
+        self.error = None
+
+    def add_handler(self, channel, func):
+        """Call ``func(event)`` for every :class:`Event` on the given channel."""
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(func)
+        self._wake()
+
+    def remove_handler(self, channel, func):
+        """Stop calling ``func`` for the given channel."""
+        with self._lock:
+            handlers = self._handlers.get(channel, [])
+            handlers.remove(func)
+            if not handlers:
+                self._handlers.pop(channel, None)
+        self._wake()
+
+    def on(self, channel):
+        """Decorator to :meth:`add_handler`."""
+        def decorator(func):
+            self.add_handler(channel, func)
+            return func
+        return decorator
+
+    def notify(self, channel, payload=None):
+        """Send an event from a pooled connection, encoding it with the serializer."""
+        if payload is not None and self.serializer is not None:
+            payload = self.serializer.dumps(payload)
+        with self.engine.connect(autocommit=True) as con:
+            con.execute('SELECT pg_notify({}, {})', [channel, payload])
+
+    def start(self):
+        """Start listening in a background thread."""
+
+        # Deferred, as it is Unix only.
+        import fcntl
+
+        # Deferred, as it is slow to import (and needs the "futures" backport on Python 2).
+        import concurrent.futures
+
+        if self._thread is not None:
+            raise RuntimeError("EventListener is already started (or still stopping).")
+
+        self._stopping = False
+        self.error = None
+        self._wake_r, self._wake_w = os.pipe()
+        for fd in (self._wake_r, self._wake_w):
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+        self._thread = threading.Thread(target=self._run, name='dbapix-EventListener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop listening, and wait for handlers to finish.
+
+        :param float timeout: Most seconds to wait for the listening thread.
+        :return: ``False`` if the thread is still running after ``timeout``;
+            call this again to keep waiting.
+
+        """
+
+        if self._thread is None:
+            return True
+
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # It still selects on the pipe, so it can't be closed yet.
+            return False
+
+        self._executor.shutdown()
+
+        with self._lock:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
+        self._thread = self._executor = None
+        return True
+
+    def _wake(self):
+        with self._lock:
+            if self._wake_w is not None:
+                try:
+                    os.write(self._wake_w, b'x')
+                except OSError as e:
+                    # It is already full of wake-ups.
+                    if e.errno != errno.EAGAIN:
+                        raise
+
+    def _run(self):
+        try:
+            while not self._stopping:
+                if self._con is None and not self._connect():
+                    self._sleep(self.reconnect_delay)
+                    continue
+                try:
+                    self._sync_channels()
+                    self._wait()
+                except (pg.OperationalError, pg.InterfaceError) as e:
+                    log.warning("Lost connection for events; reconnecting: {}".format(e))
+                    self._disconnect()
+                except Exception as e:
+                    # Likely to happen again, so don't spin on it.
+                    log.exception("Error while listening for events; reconnecting.")
+                    self.error = e
+                    self._disconnect()
+                    self._sleep(self.reconnect_delay)
+        finally:
+            self._disconnect()
+
+    def _connect(self):
+        try:
+            self.engine._prep_tunnel()
+            con = pg.connect(**self.engine.connect_kwargs)
+        except pg.OperationalError as e:
+            log.warning("Could not connect for events: {}".format(e))
+            return False
+        con.set_isolation_level(pgx.ISOLATION_LEVEL_AUTOCOMMIT)
+        self._con = con
+        self._listening = set()
+        return True
+
+    def _disconnect(self):
+        if self._con is not None:
+            try:
+                self._con.close()
+            except pg.Error:
+                pass
+            self._con = None
+
+    def _sleep(self, delay):
+        # Sleep, but wake up early if stopped.
+        ready, _, _ = select.select([self._wake_r], [], [], delay)
+        if ready:
+            os.read(self._wake_r, 4096)
+
+    def _sync_channels(self):
+
+        with self._lock:
+            wanted = set(self._handlers)
+
+        cur = self._con.cursor()
+        for channel in wanted - self._listening:
+            cur.execute('LISTEN {}'.format(_quote_channel(channel)))
+        for channel in self._listening - wanted:
+            cur.execute('UNLISTEN {}'.format(_quote_channel(channel)))
+        self._listening = wanted
+
+    def _wait(self):
+
+        ready, _, _ = select.select([self._con, self._wake_r], [], [])
+
+        if self._wake_r in ready:
+            # Handlers changed, or we're stopping; the caller deals with both.
+            os.read(self._wake_r, 4096)
+
+        if self._con in ready:
+            self._con.poll()
+            notifies = self._con.notifies
+            while notifies:
+                batch = notifies[:self.batch_size]
+                del notifies[:self.batch_size]
+                self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, notifies):
+
+        with self._lock:
+            handlers = dict((k, list(v)) for k, v in self._handlers.items())
+
+        for notify in notifies:
+
+            payload = notify.payload
+            if self.serializer is not None and payload:
+                try:
+                    payload = self.serializer.loads(payload)
+                except Exception:
+                    log.exception("Could not decode event on {!r}: {!r}".format(notify.channel, payload))
+                    continue
+
+            event = Event(notify.channel, payload, notify.pid)
+            for func in handlers.get(notify.channel, ()):
+                try:
+                    func(event)
+                except Exception:
+                    log.exception("Error in event handler {!r}.".format(func))
+
+
+def _quote_channel(channel):
+    return '"{}"'.format(channel.replace('"', '""'))
@@ -0,0 +1,196 @@
+"""Streaming results out of Postgres with ``COPY ... TO STDOUT``.
+
+"""
+
+from __future__ import absolute_import
+
+import re
+import threading
+
+import psycopg2.extensions as pgx
+from six.moves import queue
+
+
+#: Formats which ``COPY`` can write.
+formats = ('csv', 'text', 'binary')
+
+# How many chunks may be waiting for the consumer before COPY is paused.
+_queue_size = 4
+
+_done = object()
+
+
+def build_copy(query, format='csv', header=False):
+    """Build a ``COPY (query) TO STDOUT`` statement.
+
+    :param str query: A fully rendered ``SELECT`` (i.e. no placeholders).
+
+    """
+
+    format = format.lower()
+    if format not in formats:
+        raise ValueError("Unknown COPY format {!r}.".format(format))
+
+    options = ['FORMAT {}'.format(format)]
+    if header:
+        options.append('HEADER')
+
+    return 'COPY ({}) TO STDOUT WITH ({})'.format(query, ', '.join(options))
+
+
+class _ChunkWriter(object):
+
+    # A file-like object for copy_expert, which hands fixed-size chunks to
+    # a queue (blocking while it is full).
+
+    def __init__(self, queue, chunk_size):
+        self.queue = queue
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.cancelled = False
+
+    def write(self, data):
+        if self.cancelled:
+            return
+        buffer = self.buffer
+        buffer.extend(data)
+        size = self.chunk_size
+        if len(buffer) >= size:
+            end = len(buffer) - len(buffer) % size
+            for i in range(0, end, size):
+                self.queue.put(bytes(buffer[i:i + size]))
+            del buffer[:end]
+
+    def flush(self):
+        if self.buffer and not self.cancelled:
+            self.queue.put(bytes(self.buffer))
+        self.buffer = bytearray()
+
+
+def iter_copy(cur, sql, chunk_size):
+    """Run a ``COPY ... TO STDOUT`` on a raw psycopg2 cursor, yielding its output in chunks.
+
+    The ``COPY`` runs in a thread, which is paused while the consumer falls
+    behind. If the generator is closed early, the query is cancelled.
+
+    """
+
+    chunks = queue.Queue(_queue_size)
+    writer = _ChunkWriter(chunks, chunk_size)
+    error = []
+
+    def target():
+        try:
+            cur.copy_expert(sql, writer, size=chunk_size)
+            writer.flush()
+        except BaseException as e:
+            error.append(e)
+        finally:
+            chunks.put(_done)
+
+    thread = threading.Thread(target=target, name='dbapix-copy')
+    thread.daemon = True
+    thread.start()
+
+    finished = False
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _done:
+                finished = True
+                break
+            yield chunk
+    finally:
+        if not finished:
+            # Stopped early; throw away the rest and stop the server.
+            writer.cancelled = True
+            cur.connection.cancel()
+            while chunks.get() is not _done:
+                pass
+        thread.join()
+
+    if error:
+        raise error[0]
+
+
+_text_escapes = {
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v',
+}
+
+_text_escape_re = re.compile(r'\\(x[0-9a-fA-F]{1,2}|[0-7]{1,3}|.)')
+
+
+def _unescape_text_match(m):
+    x = m.group(1)
+    if x[0] == 'x' and len(x) > 1:
+        return chr(int(x[1:], 16))
+    if x[0] in '01234567':
+        return chr(int(x, 8))
+    return _text_escapes.get(x, x)
+
+
+def parse_text_line(line):
+    """Parse one line of ``COPY``'s text format into a list of strings (or ``None``).
+
+    >>> parse_text_line('1\\tone\\\\ttwo\\t\\\\N')
+    ['1', 'one\\ttwo', None]
+
+    """
+
+    # Most lines have nothing escaped.
+    if '\\' not in line:
+        return line.split('\t')
+
+    values = []
+    for field in line.split('\t'):
+        if field == '\\N':
+            values.append(None)
+        elif '\\' in field:
+            values.append(_text_escape_re.sub(_unescape_text_match, field))
+        else:
+            values.append(field)
+    return values
+
+
+def iter_text_rows(chunks, encoding):
+    """Parse a stream of ``COPY`` text format chunks into lists of strings."""
+
+    rest = b''
+    for chunk in chunks:
+        data = rest + chunk
+        end = data.rfind(b'\n')
+        if end < 0:
+            rest = data
+            continue
+        rest = data[end + 1:]
+        # Literal newlines are always escaped, so they can only end rows.
+        for line in data[:end].decode(encoding).split('\n'):
+            yield parse_text_line(line)
+
+    if rest:
+        yield parse_text_line(rest.decode(encoding))
+
+
+def get_casters(description):
+    """Get the psycopg2 typecaster for each column (or ``None`` for text), as a fetch would use."""
+
+    casters = []
+    for field in description:
+        caster = pgx.string_types.get(field[1])
+        # Text is already text.
+        if caster is not None and caster.name in ('STRING', 'UNICODE'):
+            caster = None
+        casters.append(caster)
+    return casters
+
+
+def cast_rows(cur, rows, casters):
+    """Convert the values in lists of strings with their column's typecaster, yielding tuples."""
+
+    casts = [(i, caster) for i, caster in enumerate(casters) if caster is not None]
+    for row in rows:
+        for i, caster in casts:
+            value = row[i]
+            if value is not None:
+                row[i] = caster(value, cur)
+        yield tuple(row)
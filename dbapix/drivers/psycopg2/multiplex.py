@@ -0,0 +1,132 @@
+"""Running many queries at once from one thread, via psycopg2's asynchronous connections.
+
+Each query runs on its own connection, and one thread waits (via ``select``)
+on all of their sockets, so ``N`` queries in flight do not need ``N`` threads.
+
+"""
+
+from __future__ import absolute_import
+
+import collections
+import select
+
+import psycopg2 as pg
+import psycopg2.extensions as pgx
+import six
+
+from dbapix.query import bind
+
+
+def gather(engine, queries, max_connections=4, row_factory=None, return_exceptions=False, _stack_depth=0):
+    """Run many queries concurrently, and return all of their results.
+
+    :param engine: The :class:`~dbapix.drivers.psycopg2.Engine` to connect with.
+    :param queries: A sequence of queries, each a ``str`` or a ``(query, params)`` tuple.
+    :param int max_connections: How many queries may run at once.
+    :param row_factory: How to wrap the rows; see :ref:`row_factories`.
+    :param bool return_exceptions: Return errors in place of the results of
+        the queries which raised them, instead of raising the first. If every
+        connection is lost, the queries which never ran get the first error.
+    :return: A list with, for each query in order, a :class:`.RowList` of
+        its rows, or ``None`` if it did not return rows.
+
+    Queries are bound as :meth:`.Cursor.execute` would, including pulling
+    parameters from the calling scope.
+
+    """
+
+    if max_connections < 1:
+        raise ValueError("max_connections must be at least 1.")
+
+    # Bind everything up front, so that binding errors don't leave queries
+    # running in the background.
+    jobs = []
+    for item in queries:
+        if isinstance(item, six.string_types):
+            query, params = item, None
+        else:
+            query, params = item
+        sql, params = bind(query, params, _stack_depth + 1)(engine)
+        jobs.append((sql, engine.types.encode_params(params)))
+
+    results = [None] * len(jobs)
+    todo = collections.deque(range(len(jobs)))
+    first_error = []
+
+    # Maps each connection to the (index, cursor) it is running, or None
+    # while it connects.
+    running = {}
+
+    def start_next(con):
+        if first_error and not return_exceptions:
+            todo.clear()
+        if not todo:
+            del running[con]
+            engine._put_async_connection(con)
+            return
+        index = todo.popleft()
+        cur = engine.cursor_class(engine, con.cursor(), row_factory)
+        cur.wrapped.execute(*jobs[index])
+        running[con] = (index, cur)
+
+    try:
+
+        # In here so that those already opened are closed if one fails.
+        for _ in range(min(max_connections, len(jobs))):
+            running[engine._get_async_connection()] = None
+
+        while running:
+
+            readers = []
+            writers = []
+
+            for con, job in list(running.items()):
+
+                try:
+                    state = con.poll()
+                except pg.Error as e:
+                    if job is None or con.closed:
+                        # Couldn't connect, or lost the connection.
+                        del running[con]
+                        con.close()
+                        if job is not None:
+                            results[job[0]] = e
+                        first_error.append(e)
+                        continue
+                    results[job[0]] = e
+                    first_error.append(e)
+                    start_next(con)
+                    continue
+
+                if state == pgx.POLL_OK:
+                    if job is not None:
+                        index, cur = job
+                        cur._prepare_results(row_factory)
+                        results[index] = cur.fetchall() if cur.description else None
+                    start_next(con)
+                elif state == pgx.POLL_READ:
+                    readers.append(con)
+                elif state == pgx.POLL_WRITE:
+                    writers.append(con)
+                else:
+                    raise pg.OperationalError("Bad result from poll: {!r}".format(state))
+
+            if readers or writers:
+                select.select(readers, writers, [])
+
+    finally:
+        # Only reached with connections still running if something unexpected
+        # was raised; they can't be trusted.
+        for con in running:
+            con.close()
+
+    if todo:
+        # We ran out of connections; those left never ran.
+        if not return_exceptions:
+            raise first_error[0]
+        for index in todo:
+            results[index] = first_error[0]
+    if first_error and not return_exceptions:
+        raise first_error[0]
+
+    return results
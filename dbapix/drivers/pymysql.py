@@ -1,13 +1,16 @@
 from __future__ import absolute_import
 
 import pymysql
+import six
 
 from dbapix.connection import Connection as _Connection
 from dbapix.cursor import Cursor as _Cursor
 from dbapix.engine import SocketEngine as _Engine
 
+from ._mysql import BatchMixin, EngineMixin
 
-class Connection(_Connection):
+
+class Connection(BatchMixin, _Connection):
 
     def fileno(self):
         return None
@@ -32,9 +35,13 @@ class Connection(_Connection):
     def autocommit(self, value):
         # It is a method in the superclass.
         self.wrapped.autocommit(value)
+
+    def _mogrify(self, cur, query, params):
+        sql = cur.mogrify(query, params)
+        return sql.encode(self.wrapped.encoding) if isinstance(sql, six.text_type) else sql
     
 
-class Engine(_Engine):
+class Engine(EngineMixin, _Engine):
 
     paramstyle = 'format'
     placeholder = '%s'
@@ -43,6 +50,8 @@ class Engine(_Engine):
 
     default_port = 3306
 
+    _error_class = pymysql.Error
+
     def _connect(self, timeout):
         return pymysql.Connect(
             **self.connect_kwargs
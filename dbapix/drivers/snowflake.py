@@ -1,11 +1,21 @@
 from __future__ import absolute_import
 
+import math
+import time
+
 import snowflake.connector
 
 from six import string_types
 
 from dbapix.connection import Connection as _Connection
+from dbapix.cursor import Cursor as _Cursor
 from dbapix.engine import Engine as _Engine
+from dbapix.query import bind
+from dbapix.row import ColumnarRowList
+
+
+# "SQL execution canceled", which the connector's timeout also raises.
+_QUERY_CANCELLED = 604
 
 
 class Connection(_Connection):
@@ -16,10 +26,200 @@ class Connection(_Connection):
     def fileno(self):
         return None
 
+    def execute_async(self, query, params=None):
+        """Submit a query to run in the background.
+
+        :return: The Snowflake query ID, to pass to :meth:`get_results`.
+
+        .. seealso:: :meth:`Cursor.execute_async` for parameters.
+
+        """
+        with self.cursor() as cur:
+            return cur.execute_async(query, params, 1)
+
+    def is_still_running(self, query_id):
+        """Is the given query still running?
+
+        :raises snowflake.connector.ProgrammingError: If the query failed.
+
+        """
+        status = self.wrapped.get_query_status_throw_if_error(query_id)
+        return self.wrapped.is_still_running(status)
+
+    def wait(self, query_ids, timeout=None, poll_interval=0.5):
+        """Wait for background queries to finish.
+
+        :param query_ids: IDs returned by :meth:`execute_async`.
+        :param float timeout: Seconds to wait before giving up; ``None`` waits forever.
+        :param float poll_interval: Seconds between checks of the queries' statuses.
+        :return: A list of the IDs still running; empty if all finished.
+        :raises snowflake.connector.ProgrammingError: If any query failed.
+
+        """
+
+        deadline = None if timeout is None else time.time() + timeout
+        pending = list(query_ids)
+
+        while True:
+            pending = [qid for qid in pending if self.is_still_running(qid)]
+            if not pending:
+                return pending
+            if deadline is not None and time.time() + poll_interval > deadline:
+                return pending
+            time.sleep(poll_interval)
+
+    def get_results(self, query_id, row_factory=None):
+        """Get a cursor over the results of a query run via :meth:`execute_async`.
+
+        Waits for the query to finish if it has not yet.
+
+        :return: The created :class:`Cursor`.
+
+        """
+        cur = self.cursor()
+        cur.get_results(query_id, row_factory)
+        return cur
+
+
+class Cursor(_Cursor):
+
+    """A Snowflake cursor, which can submit queries asynchronously.
+
+    Many long queries can run at once from one connection::
+
+        ids = [con.execute_async(query) for query in queries]
+        con.wait(ids)
+        frames = [con.get_results(qid).as_dataframe() for qid in ids]
+
+    Results delivered by the server as Arrow (the default for ``SELECT``) are
+    converted to ``pandas`` and ``pyarrow`` by the connector, in its batches,
+    without building any rows.
+
+    Query timeouts are left to the connector, which cancels the query on the
+    server; they are rounded up to whole seconds.
+
+    """
+
+    def _execute_with_timeout(self, query, params, timeout):
+        try:
+            self.wrapped.execute(query, params, timeout=int(math.ceil(timeout)))
+        except snowflake.connector.ProgrammingError as e:
+            if getattr(e, 'errno', None) != _QUERY_CANCELLED:
+                raise
+            self._raise_timeout(timeout, e)
+
+    def execute_async(self, query, params=None, _stack_depth=0):
+        """Submit a query to run in the background.
+
+        :param str query: The SQL to execute.
+        :param params: A ``tuple``, ``dict``, or ``None``.
+        :return: The Snowflake query ID, to pass to :meth:`get_results`.
+
+        .. seealso:: :meth:`.Cursor.execute` for binding parameters.
+
+        """
+        bound = bind(query, params, _stack_depth + 1)
+        query, params = bound(self._engine)
+        params = self._engine.types.encode_params(params)
+        self._source = self.wrapped
+        self.wrapped.execute_async(query, params)
+        return self.wrapped.sfqid
+
+    def get_results(self, query_id, row_factory=None):
+        """Fetch from the results of a query run via :meth:`execute_async`.
+
+        Waits for the query to finish if it has not yet.
+
+        :param str query_id: The ID returned by :meth:`execute_async`.
+        :param row_factory: See :meth:`.Cursor.execute`.
+        :return: This cursor.
+
+        """
+        self._source = self.wrapped
+        self.wrapped.get_results_from_sfqid(query_id)
+        self._prepare_results(row_factory)
+        return self
+
+    def _iter_native_dataframes(self):
+        # Decoders only apply to our own rows.
+        if self._decoders:
+            return None
+        try:
+            return self._source.fetch_pandas_batches()
+        except (AttributeError, snowflake.connector.NotSupportedError):
+            return None
+
+    def iter_dataframes(self, batch_size=10000):
+        """Fetch all (remaining) rows as a stream of ``pandas.DataFrame``.
+
+        :param int batch_size: Upper limit of rows in each frame, when they
+            can't come from the connector's own batches.
+        :return: A generator of ``pandas.DataFrame``.
+
+        """
+
+        frames = self._iter_native_dataframes()
+        if frames is not None:
+            for frame in frames:
+                yield frame
+            return
+
+        while True:
+            raw = self._source.fetchmany(batch_size)
+            if not raw:
+                return
+            yield ColumnarRowList._from_cursor(self, raw).as_dataframe()
+
+    def as_dataframe(self, rows=None, **kwargs):
+
+        # The connector's frames can only take these in hand afterwards.
+        frames = None
+        if rows is None and not set(kwargs).difference(('index', 'exclude')):
+            frames = self._iter_native_dataframes()
+        if frames is None:
+            return super(Cursor, self).as_dataframe(rows, **kwargs)
+
+        import pandas
+
+        frames = list(frames)
+        if frames:
+            df = pandas.concat(frames, ignore_index=True)
+        else:
+            df = pandas.DataFrame(columns=[f[0] for f in self.description])
+
+        if kwargs.get('exclude'):
+            df = df.drop(columns=list(kwargs['exclude']))
+        if kwargs.get('index') is not None:
+            df = df.set_index(kwargs['index'])
+
+        return df
+
+    as_dataframe.__doc__ = _Cursor.as_dataframe.__doc__
+
+    def iter_arrow_batches(self, batch_size=10000, schema=None):
+
+        # Results that were not delivered as Arrow by the server can't be
+        # fetched this way, so fall back to our own conversion.
+        try:
+            tables = self._source.fetch_arrow_batches()
+        except (AttributeError, snowflake.connector.NotSupportedError):
+            tables = None
+        if tables is None:
+            for batch in super(Cursor, self).iter_arrow_batches(batch_size, schema):
+                yield batch
+            return
+
+        for table in tables:
+            if schema is not None:
+                table = table.cast(schema)
+            for batch in table.to_batches(max_chunksize=batch_size):
+                yield batch
+
 
 class Engine(_Engine):
 
     connection_class = Connection
+    cursor_class = Cursor
     
     paramstyle = 'qmark'
     placeholder = '?'
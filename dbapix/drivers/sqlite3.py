@@ -1,11 +1,52 @@
 from __future__ import absolute_import
 
+import itertools
+import os
+import re
 import sqlite3
+import threading
+import time
 
 from six import string_types
 
+from dbapix.batch import execute_serially
 from dbapix.connection import Connection as _Connection
+from dbapix.cursor import Cursor as _Cursor
 from dbapix.engine import Engine as _Engine
+from dbapix.retry import TRANSACTION
+from dbapix.routing import is_read_query
+
+
+# A type in a column name, as in sqlite3's PARSE_COLNAMES: 'created [date]'.
+_colname_type_re = re.compile(r'^(.*?)\s*\[(\w+)[^\]]*\]\s*$')
+
+
+class Cursor(_Cursor):
+
+    # SQLite reports no type codes, so with the engine's type registry in
+    # charge the types given in column names are reported as type codes.
+
+    def __init__(self, *args, **kwargs):
+        super(Cursor, self).__init__(*args, **kwargs)
+        self._raw_description = None
+        self._typed_description = None
+
+    @property
+    def description(self):
+        raw = self._source.description
+        if not raw or not self._engine.types.decoders:
+            return raw
+        if raw is not self._raw_description:
+            self._raw_description = raw
+            self._typed_description = tuple(_type_field(field) for field in raw)
+        return self._typed_description
+
+
+def _type_field(field):
+    m = _colname_type_re.match(field[0])
+    if not m:
+        return field
+    return (m.group(1), m.group(2).upper()) + tuple(field[2:])
 
 
 class Connection(_Connection):
@@ -14,9 +55,18 @@ class Connection(_Connection):
         super(Connection, self).__init__(*args, **kwargs)
         self._isolation_level = None
         self._closed = False
+        # As set by the engine's pragmas on connect; tracked here so that
+        # checkouts don't need to ask SQLite.
+        self._query_only = _normalize_pragma('query_only', self._engine.pragmas.get('query_only', False))
+        # Fixed for the life of the connection.
+        self._detect_types = self._engine._get_detect_types()
 
     def fileno(self):
         return None
+
+    def _should_put_close(self):
+        # Decoders were registered (or removed) since it connected.
+        return self._detect_types != self._engine._get_detect_types()
     
     @property
     def closed(self):
@@ -25,11 +75,64 @@ class Connection(_Connection):
     def close(self):
         self.wrapped.close()
         self._closed = True
+        self._engine._release_writer(self)
+
+    def reset_session(self, autocommit=False, readonly=None):
+        """Reset the connection to an initial clean state.
+
+        :param bool autocommit:
+        :param bool readonly: Set ``PRAGMA query_only``; ``None`` for the
+            engine's default. Only sent if it differs from what this
+            connection last set, so don't change it with a manual ``PRAGMA``.
+
+        .. seealso:: :meth:`dbapix.connection.Connection.reset_session`
+
+        """
+
+        if readonly is None:
+            readonly = self._engine.pragmas.get('query_only', False)
+        readonly = _normalize_pragma('query_only', readonly)
+
+        if self._query_only != readonly:
+            self.wrapped.execute('PRAGMA query_only = {}'.format(readonly))
+            self._query_only = readonly
+        else:
+            self._engine.avoided_session_changes += 1
+
+        self._set_autocommit(autocommit)
+
+    def _has_uncommitted_work(self):
+        return self.wrapped.in_transaction
 
     def _can_disable_autocommit(self):
         # There really isn't a way we can tell, so... yeah.
         return True
 
+    def _execute_batch(self, statements):
+
+        # There are no round trips to save, but a single transaction saves
+        # a sync per statement, and lets the batch be undone as a whole.
+        # The savepoint would commit on release if it were the outermost
+        # transaction, so we begin our own when not in autocommit.
+        con = self.wrapped
+        if not self.autocommit and not con.in_transaction:
+            con.execute('BEGIN')
+
+        cur = con.cursor()
+        cur.execute('SAVEPOINT _dbapix_batch')
+        try:
+            rowcounts = execute_serially(cur, statements)
+        except:
+            cur.execute('ROLLBACK TO _dbapix_batch')
+            cur.execute('RELEASE _dbapix_batch')
+            raise
+        else:
+            cur.execute('RELEASE _dbapix_batch')
+        finally:
+            cur.close()
+
+        return rowcounts
+
     @property
     def autocommit(self):
         # In Python's sqlite3 autocommit is tied to the isolation level.
@@ -47,27 +150,363 @@ class Connection(_Connection):
             self._isolation_level = None
 
 
+#: Named sets of pragmas to apply to new connections; see :class:`Engine`.
+profiles = {
+    'default': {},
+    'wal-fast': dict(
+        journal_mode='WAL',
+        synchronous='NORMAL',
+        cache_size=-64000, # 64MB
+        mmap_size=256 * 1024 * 1024,
+        temp_store='MEMORY',
+        busy_timeout=5000,
+    ),
+    'bulk-load': dict(
+        journal_mode='MEMORY',
+        synchronous='OFF',
+        cache_size=-256000, # 256MB
+        temp_store='MEMORY',
+        locking_mode='EXCLUSIVE',
+    ),
+    'read-only': dict(
+        query_only=True,
+        cache_size=-64000, # 64MB
+        mmap_size=256 * 1024 * 1024,
+        temp_store='MEMORY',
+        busy_timeout=5000,
+    ),
+}
+
+
+# How pragmas report the values they are set to.
+_pragma_values = {
+    'synchronous': {'off': '0', 'normal': '1', 'full': '2', 'extra': '3'},
+    'temp_store': {'default': '0', 'file': '1', 'memory': '2'},
+    'query_only': {'true': '1', 'false': '0', 'on': '1', 'off': '0', 'yes': '1', 'no': '0'},
+}
+
+
+def _normalize_pragma(name, value):
+    value = str(value).lower()
+    return _pragma_values.get(name, {}).get(value, value)
+
+
 class Engine(_Engine):
 
+    """Database connection manager for SQLite.
+
+    :param str path: The path to the database.
+    :param str profile: The name of a set of pragmas in :data:`profiles` to
+        apply to every new connection, e.g. ``"wal-fast"``.
+    :param dict pragmas: Extra pragmas (applied after the profile's), e.g.
+        ``dict(cache_size=-100000)``.
+    :param bool split_rw: Keep a separate pool of read-only connections for
+        reads, and a single writer connection; see below.
+    :param bool shared: Share one in-memory database between all connections;
+        only for ``":memory:"``.
+    :param bool in_memory: Serve from a copy of the database in memory.
+    :param float refresh: How many seconds an ``in_memory`` copy is used for
+        before it is copied again.
+
+    Values are converted by ``sqlite3``'s converters for declared types (and
+    ``[type]`` column names), unless the engine's :attr:`~.Engine.types` has
+    decoders registered. The registry then decides alone. This is fixed per
+    connection, so when the first decoder is registered, idle connections are
+    closed on the next checkout, and checked out ones when they are returned.
+    Since SQLite doesn't report the declared types of results, columns are typed by
+    name, e.g. ``SELECT created AS "created [date]"`` has the type code
+    ``"DATE"``::
+
+        engine.types.register_decoder('DATE', parse_date)
+
+    Pragmas are read back after they are set, and a warning is logged for
+    any that did not take (e.g. ``journal_mode=WAL`` on an in-memory database).
+
+    The relative throughput of the profiles can be measured with
+    ``python -m benchmarks.sqlite_profiles``.
+
+    With ``split_rw``, SQLite's "many readers, one writer" model is mirrored
+    in the pool. Connections requested with ``readonly=True`` come from
+    :attr:`readers`, an engine of ``mode=ro`` and ``query_only`` connections,
+    and can be used in parallel, as are queries through :meth:`execute` which
+    :func:`.is_read_query` thinks only read. All others share one writer
+    connection, and callers queue (in-process) until it is returned, rather
+    than spinning on ``SQLITE_BUSY``::
+
+        engine = create_engine('sqlite', 'app.db', profile='wal-fast', split_rw=True)
+
+        with engine.connect(readonly=True) as con:
+            rows = con.execute('SELECT * FROM foo').fetchall()
+
+        with engine.connect() as con: # Waits for any other writers.
+            con.insert('foo', dict(value=123))
+
+    A thread which asks for the writer while it already holds it would wait
+    forever, so gets a :exc:`sqlite3.OperationalError` instead; use the
+    connection it has (or ``readonly=True`` for reads). The ``WAL`` journal
+    mode is needed for readers to not block the writer.
+
+    Normally every connection to ``":memory:"`` gets its own empty database.
+    With ``shared``, all pooled connections instead see one in-memory database
+    (via a ``file:...?mode=memory&cache=shared`` URI), which lives until the
+    engine is closed::
+
+        engine = create_engine('sqlite', ':memory:', shared=True)
+
+    With ``in_memory``, the database file is copied into a shared in-memory
+    database via the backup API, and connections are made to that copy. It is
+    copied again on checkout once it is ``refresh`` seconds old, or by calling
+    :meth:`refresh`. Writes only go to the copy, and are lost when it is
+    refreshed::
+
+        engine = create_engine('sqlite', 'lookups.db', in_memory=True, refresh=300)
+
+    Connections to a shared in-memory database lock whole tables, and fail
+    with "database table is locked" rather than waiting, so these are best
+    suited to reads.
+
+    """
+
     connection_class = Connection
+    cursor_class = Cursor
     
     paramstyle = 'qmark'
     placeholder = '?'
 
     _types = {'serial primary key': 'INTEGER PRIMARY KEY'}
 
-    def __init__(self, path):
+    _memory_names = itertools.count(1)
+
+    def __init__(self, path, profile=None, pragmas=None, split_rw=False,
+        shared=False, in_memory=False, refresh=None, _uri=False):
+
         super(Engine, self).__init__()
+
         self.path = path
+        self._database = path
+        self._uri = _uri
+
+        # Holds the shared in-memory database open while the pool is empty.
+        self._keepalive = None
+
+        self.in_memory = in_memory
+        self.refresh_interval = refresh
+        self._refresh_lock = threading.Lock()
+
+        #: When the in-memory copy of the database was last loaded.
+        self.loaded_at = None
+
+        self.split_rw = split_rw
+        self._writer_cond = threading.Condition()
+        self._writer_owner = None
+        self._writer_thread = None
+
+        #: The engine of read-only connections when ``split_rw`` is set.
+        self.readers = None
+
+        try:
+            self.pragmas = dict(profiles[profile or 'default'])
+        except KeyError:
+            raise ValueError("Unknown SQLite profile {!r}.".format(profile))
+        self.pragmas.update(pragmas or ())
+
+        if split_rw:
+            # Deferred, as urllib.request is slow to import.
+            from six.moves.urllib.request import pathname2url
+            if path == ':memory:' or path.startswith('file:'):
+                raise ValueError("split_rw needs a path to a database file.")
+            reader_pragmas = dict(self.pragmas, query_only=True)
+            reader_pragmas.pop('journal_mode', None) # Only the writer can set it.
+            self.readers = Engine(
+                'file:{}?mode=ro'.format(pathname2url(os.path.abspath(path))),
+                pragmas=reader_pragmas,
+                _uri=True,
+            )
+            self.readers.types = self.types
+
+        if shared or in_memory:
+            if split_rw:
+                raise ValueError("split_rw can't be used with in-memory databases.")
+            if shared and path != ':memory:':
+                raise ValueError("shared is only for :memory: databases; did you want in_memory?")
+            if in_memory and (path == ':memory:' or path.startswith('file:')):
+                raise ValueError("in_memory needs a path to a database file.")
+            self._database = 'file:dbapix-{}-{}?mode=memory&cache=shared'.format(
+                os.getpid(), next(self._memory_names))
+            self._uri = True
+            self._keepalive = sqlite3.connect(self._database, uri=True, check_same_thread=False)
+
+        if in_memory:
+            self._load()
+
+    def refresh(self):
+        """Copy the database file into memory again; only for ``in_memory`` engines.
+
+        :raises sqlite3.OperationalError: If the in-memory copy is in use.
+
+        """
+
+        if not self.in_memory:
+            raise ValueError("Engine is not in_memory.")
+        with self._refresh_lock:
+            self._load()
+
+    def _load(self):
+        source = sqlite3.connect(self.path)
+        try:
+            source.backup(self._keepalive)
+        finally:
+            source.close()
+        self.loaded_at = time.time()
+
+    def _is_stale(self):
+        return bool(self.refresh_interval) and time.time() - self.loaded_at >= self.refresh_interval
+
+    def _maybe_refresh(self):
+
+        # Don't make everyone wait on one refresh.
+        if not self._is_stale() or not self._refresh_lock.acquire(False):
+            return
+
+        try:
+            if self._is_stale():
+                self._load()
+        except sqlite3.OperationalError as e:
+            # Connections are reading from it; try again on the next checkout.
+            self._log.warning("Could not refresh in-memory SQLite database: {}".format(e))
+        finally:
+            self._refresh_lock.release()
+
+    def close(self):
+        super(Engine, self).close()
+        if self.readers is not None:
+            self.readers.close()
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
+
+    def get_connection(self, timeout=None, **kwargs):
+
+        # Account for this frame when finding where connections came from.
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+
+        if self.in_memory:
+            self._maybe_refresh()
+
+        self._close_stale()
+
+        if not self.split_rw:
+            return super(Engine, self).get_connection(timeout, **kwargs)
+
+        if kwargs.pop('readonly', False):
+            return self.readers.get_connection(timeout, **kwargs)
+
+        self._acquire_writer(timeout)
+        try:
+            con = super(Engine, self).get_connection(timeout, **kwargs)
+        except:
+            self._release_writer(None)
+            raise
+        self._writer_owner = con
+        return con
+
+    get_connection.__doc__ = _Engine.get_connection.__doc__
+
+    def _close_stale(self):
+        detect_types = self._get_detect_types()
+        for con in list(self.pool):
+            if con._detect_types != detect_types:
+                try:
+                    self.pool.remove(con)
+                except ValueError:
+                    # Another thread took it (and so will close it when it is returned).
+                    continue
+                con.close()
+
+    def _acquire_writer(self, timeout):
+        deadline = None if timeout is None else time.time() + timeout
+        thread = threading.current_thread()
+        with self._writer_cond:
+            if self._writer_owner is not None and self._writer_thread is thread:
+                raise sqlite3.OperationalError("This thread already holds the writer connection.")
+            while self._writer_owner is not None:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise sqlite3.OperationalError("Timed out waiting for the writer connection.")
+                self._writer_cond.wait(remaining)
+            # Hold the spot until we have the actual connection.
+            self._writer_owner = True
+            self._writer_thread = thread
+
+    def _release_writer(self, con):
+        with self._writer_cond:
+            if self._writer_owner is con or con is None:
+                self._writer_owner = None
+                self._writer_thread = None
+                self._writer_cond.notify()
+
+    def put_connection(self, con, *args, **kwargs):
+        if self.readers is not None and con._engine is self.readers:
+            return self.readers.put_connection(con, *args, **kwargs)
+        try:
+            super(Engine, self).put_connection(con, *args, **kwargs)
+        finally:
+            self._release_writer(con)
+
+    put_connection.__doc__ = _Engine.put_connection.__doc__
+
+    def execute(self, query, params=None, row_factory=None, cache=None, timeout=None, readonly=None):
+        """Execute a context-managed query; see :meth:`.Engine.execute`.
+
+        :param bool readonly: Use one of the :attr:`readers`? ``None`` guesses
+            with :func:`.is_read_query` when ``split_rw`` is set.
+
+        """
+        if readonly is None:
+            readonly = self.split_rw and is_read_query(query)
+        con = self.get_connection(readonly=readonly, _stack_depth=1)
+        cur = con.cursor()
+        cur.execute(query, params, 1, row_factory, cache, timeout)
+        return self._build_context(con, cur)
+
+    def _get_detect_types(self):
+        # The engine's type registry replaces sqlite3's per-value converters.
+        return 0 if self.types.decoders else sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
 
     def _connect(self, timeout):
-        return sqlite3.connect(self.path,
+        con = sqlite3.connect(self._database,
             timeout=timeout or 0,
             check_same_thread=False,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            detect_types=self._get_detect_types(),
+            uri=self._uri,
         )
+        if self.pragmas:
+            self._apply_pragmas(con)
+        return con
+
+    def _apply_pragmas(self, con):
+        for name, value in self.pragmas.items():
+            if isinstance(value, bool):
+                value = int(value)
+            # Pragmas can't take bound parameters.
+            con.execute('PRAGMA {} = {}'.format(name, value))
+            row = con.execute('PRAGMA {}'.format(name)).fetchone()
+            actual = row[0] if row else None
+            if _normalize_pragma(name, actual) != _normalize_pragma(name, value):
+                self._log.warning("SQLite pragma {} is {!r} instead of {!r}.".format(name, actual, value))
 
     def _connect_exc_is_timeout(self, e):
         return False
 
+    def _get_canceller(self, raw_cur):
+        return raw_cur.connection.interrupt
+
+    def _classify_error(self, e):
+        # SQLITE_BUSY and SQLITE_LOCKED, which only have their own class in newer Pythons.
+        if isinstance(e, sqlite3.OperationalError) and (
+            getattr(e, 'sqlite_errorcode', None) in (5, 6) or
+            str(e).startswith(('database is locked', 'database table is locked'))
+        ):
+            return TRANSACTION
+
 
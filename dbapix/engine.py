@@ -1,5 +1,4 @@
 import abc
-import atexit
 import itertools
 import logging
 import re
@@ -12,8 +11,12 @@ import six
 
 from .query import bind as bind_query
 from .connection import Connection
+from .hooks import call_hooks
+from . import partition
+from .retry import RetryPolicy
 from .cursor import Cursor
-from .row import Row
+from .row import Row, RowList
+from .types import TypeRegistry
 
 
 _engine_counter = itertools.count(0)
@@ -45,6 +48,13 @@ class Engine(object):
     cursor_class = Cursor
     row_class = Row
 
+    #: The class holding the results of :meth:`.Cursor.fetchmany` and
+    #: :meth:`.Cursor.fetchall`; either :class:`.RowList` or :class:`.ColumnarRowList`.
+    row_list_class = RowList
+
+    #: The default row factory for cursors; see :ref:`row_factories`.
+    row_factory = 'row'
+
     paramstyle = abc.abstractproperty(None)
     placeholder = abc.abstractproperty(None)
 
@@ -56,6 +66,46 @@ class Engine(object):
         self._engine_counter = next(_engine_counter)
         self._log = logging.getLogger('{}[{}]'.format(__name__, self._engine_counter))
 
+        #: The :class:`.TypeRegistry` for this engine.
+        self.types = TypeRegistry()
+
+        #: An optional :class:`.ResultCache`; reads only go through it when
+        #: this is set.
+        self.result_cache = None
+
+        #: How many session changes (e.g. of autocommit) were skipped because
+        #: the connection was already in the requested state.
+        self.avoided_session_changes = 0
+
+        # Replaced (never mutated) so it can be read without a lock; the
+        # common case of no hooks costs a truthiness check.
+        self._hooks = ()
+
+        #: The default :class:`.RetryPolicy` for :meth:`run_transaction`.
+        self.retry_policy = None
+
+        #: The default ``timeout`` in seconds for :meth:`.Cursor.execute`;
+        #: ``None`` for no timeout. Drivers which can't cancel queries raise
+        #: :exc:`ValueError` when it is used.
+        self.statement_timeout = None
+
+    def add_hook(self, func):
+        """Call ``func(event)`` with a :class:`.HookEvent` after everything this engine does.
+
+        Hooks are called synchronously on the thread doing the work, so
+        should be quick; exceptions from them are logged and ignored.
+
+        .. seealso:: :ref:`hooks`
+
+        """
+        self._hooks = self._hooks + (func, )
+
+    def remove_hook(self, func):
+        """Stop calling a hook added by :meth:`add_hook`."""
+        hooks = list(self._hooks)
+        hooks.remove(func)
+        self._hooks = tuple(hooks)
+
     def close(self):
         for collection in (self.pool, self._checked_out):
             while collection:
@@ -76,6 +126,10 @@ class Engine(object):
 
         """
 
+        hooks = self._hooks
+        if hooks:
+            start = time.time()
+
         try:
             while True:
                 con = self.pool.pop(0)
@@ -94,14 +148,85 @@ class Engine(object):
         stack_depth = 1 + kwargs.pop('_stack_depth', 0)
 
         self._checked_out.append(con)
+        con._in_transaction = False
         con.reset_session(**kwargs)
 
         # Store where it came from so we can warn later.
         frame = sys._getframe(stack_depth)
         con._origin = (frame.f_code.co_filename, frame.f_lineno)
 
+        if hooks:
+            call_hooks(hooks, 'checkout', self, start, connection=con)
+
         return con
 
+    def run_transaction(self, func, retry=None, **kwargs):
+        """Call ``func(con)`` within a transaction, retrying it on transient errors.
+
+        :param func: Called with a :class:`.Connection`; its return value is returned.
+        :param retry: A :class:`.RetryPolicy`; defaults to :attr:`retry_policy`,
+            or a default policy.
+        :param ``**kwargs``: Passed to :meth:`get_connection`.
+
+        The transaction is committed if ``func`` returns, and rolled back if
+        it raises. If the error is transient for this driver (e.g. a
+        serialization failure or deadlock on Postgres or MySQL, or a locked
+        database on SQLite) it is run again after a backoff. If the
+        connection broke, it is replaced with a new one. Anything else is
+        raised immediately.
+
+        ``func`` may run several times, so should not have side effects
+        outside of the database::
+
+            def transfer(con):
+                con.execute('UPDATE accounts SET balance = balance - 10 WHERE id = 1')
+                con.execute('UPDATE accounts SET balance = balance + 10 WHERE id = 2')
+
+            engine.run_transaction(transfer, isolation_level='SERIALIZABLE')
+
+        """
+        kwargs['_stack_depth'] = 2 + kwargs.get('_stack_depth', 0)
+        policy = retry or self.retry_policy or RetryPolicy()
+        return policy.run(self, func, **kwargs)
+
+    def iter_partitions(self, query, partitions, max_workers=4, row_factory=None, ordered=False, **kwargs):
+        """Run a query once per partition in parallel, yielding ``(partition, rows)`` as each finishes.
+
+        Each partition is a ``dict`` of params for the query (e.g. from
+        :func:`.key_ranges`), and runs on its own connection from the pool.
+
+        .. seealso:: :func:`.partition.iter_partitions` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        return partition.iter_partitions(self, query, partitions, max_workers, row_factory, ordered, **kwargs)
+
+    def fetch_partitioned(self, query, partitions, max_workers=4, row_factory=None, as_dataframe=False, **kwargs):
+        """Run a query once per partition in parallel, returning all rows together.
+
+        ::
+
+            rows = engine.fetch_partitioned(
+                'SELECT * FROM foo WHERE id >= {lo} AND id < {hi}',
+                key_ranges(0, 1000, 4),
+            )
+
+        .. seealso:: :func:`.partition.fetch_partitioned` for parameters.
+
+        """
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        return partition.fetch_partitioned(self, query, partitions, max_workers, row_factory, as_dataframe, **kwargs)
+
+    def _get_canceller(self, raw_cur):
+        # A function to cancel whatever is running on the raw cursor's
+        # connection, from another thread; None if the driver can't.
+        return None
+
+    def _classify_error(self, e):
+        # Is an error from executing worth retrying the transaction for? One of
+        # the constants from dbapix.retry, or None.
+        return None
+
     def _new_connection(self, timeout):
         start = time.time()
         delay = 0.1
@@ -137,6 +262,12 @@ class Engine(object):
 
         """
 
+        # Closed connections are forgotten as well.
+        try:
+            self._checked_out.remove(con)
+        except ValueError:
+            pass
+
         if con.closed:
             return
 
@@ -161,7 +292,6 @@ class Engine(object):
             return
 
         if con not in self.pool:
-            self._checked_out.remove(con)
             self.pool.append(con)
 
     def _build_context(self, con, obj):
@@ -201,12 +331,13 @@ class Engine(object):
 
         """
 
+        row_factory = kwargs.pop('row_factory', None)
         kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
         con = self.get_connection(**kwargs)
-        cur = con.cursor()
+        cur = con.cursor(row_factory)
         return self._build_context(con, cur)
 
-    def execute(self, query, params=None):
+    def execute(self, query, params=None, row_factory=None, cache=None, timeout=None):
         """Execute a context-managed query (if you don't need the connection).
 
         .. testcode::
@@ -220,7 +351,7 @@ class Engine(object):
         """
         con = self.get_connection(_stack_depth=1)
         cur = con.cursor()
-        cur.execute(query, params, 1)
+        cur.execute(query, params, 1, row_factory, cache, timeout)
         return self._build_context(con, cur)
 
     @classmethod
@@ -254,15 +385,19 @@ class Engine(object):
         """
         return cls._types.get(name.lower(), name)
 
+    # Maps `type_code` from `cursor.description` to a pyarrow type factory name
+    # and args, e.g. `('timestamp', 'us')`. Anything missing is inferred.
+    _arrow_types = {}
 
-# We need to hold onto open tunnels so we can force them
-# to close at shutdown.
-_close_at_exit = weakref.WeakSet()
-
-@atexit.register
-def _do_close_at_exit():
-    for obj in _close_at_exit:
-        obj.close()
+    @classmethod
+    def _get_arrow_type(cls, type_code):
+        try:
+            spec = cls._arrow_types.get(type_code)
+        except TypeError: # Unhashable.
+            return
+        if spec:
+            import pyarrow
+            return getattr(pyarrow, spec[0])(*spec[1:])
 
 
 class SocketEngine(Engine):
@@ -295,6 +430,12 @@ class SocketEngine(Engine):
     - The driver's ``host`` and ``port`` will be automatically forced to
       ``127.0.0.1`` and the (random) port that the tunnel is listening on.
 
+    Tunnels built from a dict are shared (via :data:`dbapix.tunnel.tunnels`)
+    by every engine with the same tunnel kwargs, so many engines behind one
+    bastion use a single SSH connection. If the SSH transport drops, it is
+    re-established before the next new connection. Pass ``shared=False`` in
+    the dict for a tunnel of the engine's own.
+
     We do **not** specify where your private SSH key is, and paramiko does not
     automatically pick it up. You may have to do something like::
 
@@ -312,6 +453,7 @@ class SocketEngine(Engine):
 
         if isinstance(tunnel, dict):
             self.tunnel_kwargs = tunnel.copy()
+            self._tunnel_shared = self.tunnel_kwargs.pop('shared', True)
             for key in ('username', 'password'):
                 try:
                     self.tunnel_kwargs['ssh_' + key] = self.tunnel_kwargs.pop(key)
@@ -325,51 +467,47 @@ class SocketEngine(Engine):
     def close(self):
         super(SocketEngine, self).close()
         if self.tunnel:
+            # Shared tunnels are only released; they stop with their last engine.
             self.tunnel.close()
             self.tunnel = None
 
     def _new_connection(self, *args):
+        self._prep_tunnel()
+        return super(SocketEngine, self)._new_connection(*args)
+
+    def _prep_tunnel(self):
 
-        # We're overriding _new_connection instead of making an explicit
-        # `_prep_tunnel` or something. Maybe do that later?
+        # Start the tunnel (if needed) and point the connect_kwargs at it;
+        # this must be called before any connection is made.
 
         if self.tunnel_kwargs and not self.tunnel:
 
             if 'ssh_address_or_host' not in self.tunnel_kwargs:
                 address = self.tunnel_kwargs.pop('ssh_address', None)
                 host = self.tunnel_kwargs.pop('host', None)
-                port = self.tunnel_kwargs.pop('port', 22)
+                port = self.tunnel_kwargs.pop('port', None)
                 if (host and address) or not (host or address):
                     raise ValueError("Provide one of ssh_address_or_host, ssh_address, or host.")
                 if address and port:
                     raise ValueError("Provide one of ssh_address_or_host/ssh_address or host/port.")
-                self.tunnel_kwargs['ssh_address_or_host'] = address or (host, port)
+                self.tunnel_kwargs['ssh_address_or_host'] = address or (host, port or 22)
 
             if 'remote_bind_address' not in self.tunnel_kwargs:
                 host = self.tunnel_kwargs.pop('remote_bind_host', '127.0.0.1')
                 port = self.connect_kwargs.pop('port', self.default_port)
                 self.tunnel_kwargs['remote_bind_address'] = (host, port)
 
-            from sshtunnel import SSHTunnelForwarder
-            self.tunnel = SSHTunnelForwarder(**self.tunnel_kwargs)
+            from .tunnel import tunnels
+            self.tunnel = tunnels.acquire(_shared=self._tunnel_shared, **self.tunnel_kwargs)
 
-            # Force them to die at exit. Not sure all of this is nessesary.
-            # On only some hosts these threads remain open and blocking.
-            # In theory setting the daemon_* attributes should be enough,
-            # but there is at least one host where we need to explicitly
-            # close everything down, hence the atexit stuff.
-            self.tunnel.daemon_forward_servers = True
-            self.tunnel.daemon_transport = True
-            _close_at_exit.add(self.tunnel)
-
-            self.tunnel.start()
+        elif self.tunnel_kwargs:
+            # The port may change if it had to be restarted.
+            self.tunnel.ensure_up()
 
         if self.tunnel:
             self.connect_kwargs['host'] = '127.0.0.1'
             self.connect_kwargs['port'] = self.tunnel.local_bind_port
 
-        return super(SocketEngine, self)._new_connection(*args)
-
 
 class ConnectionContext(object):
 
@@ -0,0 +1,214 @@
+import logging
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+#: The names of events passed to hooks.
+events = ('execute', 'fetch', 'checkout', 'commit', 'rollback')
+
+
+class HookEvent(object):
+
+    """Something an engine did, as passed to hooks added with :meth:`.Engine.add_hook`.
+
+    Attributes which don't apply to an event are ``None``.
+
+    .. attribute:: name
+
+        One of ``"execute"``, ``"fetch"``, ``"checkout"``, ``"commit"``, or ``"rollback"``.
+
+    .. attribute:: engine
+
+        The :class:`.Engine` it happened on.
+
+    .. attribute:: start
+    .. attribute:: duration
+
+        When it started (from ``time.time()``), and how many seconds it took.
+        For iterating over a cursor, this is only the time spent fetching.
+
+    .. attribute:: error
+
+        The exception raised, if it failed.
+
+    .. attribute:: connection
+    .. attribute:: cursor
+
+        The :class:`.Connection` for checkout/commit/rollback; the :class:`.Cursor`
+        for execute/fetch.
+
+    .. attribute:: template
+
+        The query as given to ``execute``, before binding; the same for every
+        call from one place in the code. Fetches have the template of the
+        query they are fetching from.
+
+    .. attribute:: sql
+    .. attribute:: param_count
+
+        The query as sent to the driver, and how many parameters it had.
+
+    .. attribute:: executions
+
+        How many times the query was run; only more than 1 for ``executemany``.
+
+    .. attribute:: cached
+
+        If the results came from the :class:`.ResultCache`.
+
+    .. attribute:: rowcount
+
+        The driver's ``rowcount`` after executing.
+
+    .. attribute:: rows
+
+        How many rows were fetched.
+
+    """
+
+    __slots__ = (
+        'name', 'engine', 'start', 'duration', 'error',
+        'connection', 'cursor',
+        'template', 'sql', 'param_count', 'executions', 'cached',
+        'rowcount', 'rows',
+    )
+
+    def __init__(self, name, engine, start, duration, **kwargs):
+        self.name = name
+        self.engine = engine
+        self.start = start
+        self.duration = duration
+        for key in self.__slots__[4:]:
+            setattr(self, key, kwargs.pop(key, None))
+        if kwargs:
+            raise TypeError("Unknown HookEvent attributes {}.".format(', '.join(sorted(kwargs))))
+
+    def __repr__(self):
+        return '<HookEvent {} {:.6f}s{}>'.format(self.name, self.duration,
+            ' ' + repr(self.sql) if self.sql is not None else '')
+
+
+def call_hooks(hooks, name, engine, start, duration=None, **kwargs):
+    """Build a :class:`HookEvent` and pass it to every hook.
+
+    The duration defaults to the time since ``start``. Exceptions from hooks
+    are logged, not raised.
+
+    """
+    if duration is None:
+        duration = time.time() - start
+    event = HookEvent(name, engine, start, duration, **kwargs)
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            log.exception("Error in hook {!r}.".format(hook))
+    return event
+
+
+def _driver_name(engine):
+    return type(engine).__module__.rsplit('.', 1)[-1]
+
+
+class SlowQueryLogger(object):
+
+    """A hook which logs queries slower than a threshold::
+
+        engine.add_hook(SlowQueryLogger(0.5))
+
+    :param float threshold: Seconds; queries taking at least this long are logged.
+    :param logger: The ``logging.Logger`` to use; defaults to this module's.
+    :param int level: The level to log at.
+    :param events: Which events to consider; e.g. add ``"fetch"`` to include
+        slow fetches of large results.
+
+    """
+
+    def __init__(self, threshold=1.0, logger=None, level=logging.WARNING, events=('execute', )):
+        self.threshold = threshold
+        self.logger = logger or log
+        self.level = level
+        self.events = frozenset(events)
+
+    def __call__(self, event):
+        if event.duration < self.threshold or event.name not in self.events:
+            return
+        if event.name == 'execute':
+            self.logger.log(self.level, "Slow query ({:.3f}s{}): {}".format(
+                event.duration,
+                ', failed' if event.error is not None else '',
+                event.sql,
+            ))
+        else:
+            self.logger.log(self.level, "Slow {} ({:.3f}s{}).".format(
+                event.name,
+                event.duration,
+                ', {} rows'.format(event.rows) if event.rows is not None else '',
+            ))
+
+
+class OpenTelemetryHook(object):
+
+    """A hook which records a span for every event via an OpenTelemetry-style tracer::
+
+        from opentelemetry import trace
+        engine.add_hook(OpenTelemetryHook(trace.get_tracer('dbapix')))
+
+    :param tracer: Anything with ``start_span(name, start_time=..., attributes=...)``
+        returning spans with ``end(end_time=...)``; times are in nanoseconds.
+    :param events: Which events to record spans for.
+    :param bool include_sql: Record the SQL as ``db.statement``. Parameters are
+        never recorded.
+
+    Spans are created once the event has finished (with its real start time),
+    within whatever span is current, and so are children of it.
+
+    """
+
+    def __init__(self, tracer, events=events, include_sql=True):
+        self.tracer = tracer
+        self.events = frozenset(events)
+        self.include_sql = include_sql
+
+    def attributes(self, event):
+        """The span attributes for an event."""
+
+        attrs = {
+            'db.system': _driver_name(event.engine),
+            'dbapix.engine': event.engine._engine_counter,
+        }
+
+        if self.include_sql and event.sql is not None:
+            attrs['db.statement'] = event.sql
+        for key in ('param_count', 'executions', 'rowcount', 'rows', 'cached'):
+            value = getattr(event, key)
+            if value is not None:
+                attrs['dbapix.' + key] = value
+
+        return attrs
+
+    def __call__(self, event):
+
+        if event.name not in self.events:
+            return
+
+        start = int(event.start * 1e9)
+        span = self.tracer.start_span('dbapix.' + event.name,
+            start_time=start,
+            attributes=self.attributes(event),
+        )
+
+        if event.error is not None:
+            record = getattr(span, 'record_exception', None)
+            if record is not None:
+                record(event.error)
+            try:
+                from opentelemetry.trace import Status, StatusCode
+            except ImportError:
+                pass
+            else:
+                span.set_status(Status(StatusCode.ERROR, str(event.error)))
+
+        span.end(end_time=start + int(event.duration * 1e9))
@@ -0,0 +1,194 @@
+"""Running one query over many partitions of a table at once.
+
+A partitioned query is a template whose parameters come from each partition
+(a ``dict``), e.g.::
+
+    rows = engine.fetch_partitioned(
+        'SELECT * FROM events WHERE id >= {lo} AND id < {hi}',
+        key_ranges(0, 10000000, 16),
+        max_workers=4,
+    )
+
+Other parameters are pulled from the calling scope as usual.
+
+"""
+
+import collections
+import datetime
+import itertools
+
+from .params import Params
+from .row import ColumnarRowList
+
+
+def key_ranges(start, stop, count):
+    """Split ``[start, stop)`` into ``count`` ranges of (nearly) equal size.
+
+    :return: A list of ``dict(lo=..., hi=...)``, for ``key >= {lo} AND key < {hi}``.
+
+    >>> key_ranges(0, 10, 3)
+    [{'lo': 0, 'hi': 4}, {'lo': 4, 'hi': 7}, {'lo': 7, 'hi': 10}]
+
+    """
+    if count < 1:
+        raise ValueError("Need at least one range.")
+    size, extra = divmod(stop - start, count)
+    ranges = []
+    lo = start
+    for i in range(count):
+        hi = lo + size + (1 if i < extra else 0)
+        if hi > lo:
+            ranges.append(dict(lo=lo, hi=hi))
+        lo = hi
+    return ranges
+
+
+def hash_buckets(count):
+    """Partitions which each take one of ``count`` buckets.
+
+    :return: A list of ``dict(bucket=..., buckets=...)``, e.g. for
+        ``id % {buckets} = {bucket}``, or ``abs(hashtext(key)) % {buckets} = {bucket}``
+        on Postgres for non-integer keys.
+
+    """
+    return [dict(bucket=i, buckets=count) for i in range(count)]
+
+
+def date_slices(start, stop, step=datetime.timedelta(days=1)):
+    """Split ``[start, stop)`` into slices of ``step`` (the last may be shorter).
+
+    Works with dates or datetimes.
+
+    :return: A list of ``dict(lo=..., hi=...)``, for ``created >= {lo} AND created < {hi}``.
+
+    """
+    if step <= datetime.timedelta(0):
+        raise ValueError("step must be positive.")
+    slices = []
+    lo = start
+    while lo < stop:
+        hi = min(lo + step, stop)
+        slices.append(dict(lo=lo, hi=hi))
+        lo = hi
+    return slices
+
+
+def _fetch(engine, query, params, row_factory, kwargs):
+    with engine.connect(**kwargs) as con:
+        return con.execute(query, params, row_factory=row_factory).fetchall()
+
+
+def iter_partitions(engine, query, partitions, max_workers=4, row_factory=None, ordered=False,
+    _stack_depth=0, **kwargs):
+
+    """Run a query for every partition on a pool of threads, yielding ``(partition, rows)``.
+
+    :param engine: What to get connections from.
+    :param str query: The query template.
+    :param partitions: ``dict`` of params for each partition.
+    :param int max_workers: Most partitions to run at once (and so connections to use).
+    :param row_factory: For the fetched rows; see :ref:`row_factories`.
+    :param bool ordered: Yield in the order of ``partitions``, instead of as they finish.
+    :param ``**kwargs``: Passed to the engine's ``connect``, e.g. ``readonly=True``.
+
+    Only ``max_workers`` results are held at once, so a slow consumer
+    doesn't gather the whole result set in memory. If the iterator is closed
+    early, partitions which haven't started are skipped.
+
+    """
+
+    # Deferred, as it is slow to import (and needs the "futures" backport on Python 2).
+    import concurrent.futures
+
+    # Done now, before we are a generator, so the caller's scope is still there.
+    base = Params.from_stack(_stack_depth + 1)
+
+    def params_for(partition):
+        params = Params(base)
+        params.update(partition)
+        return params
+
+    partitions = list(partitions)
+
+    def generate():
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        pending = iter(partitions)
+        running = collections.OrderedDict()
+
+        def submit():
+            for partition in itertools.islice(pending, 1):
+                future = executor.submit(_fetch, engine, query, params_for(partition), row_factory, kwargs)
+                running[future] = partition
+                return True
+            return False
+
+        try:
+
+            for _ in range(max_workers):
+                submit()
+
+            while running:
+                if ordered:
+                    future = next(iter(running))
+                    future.result()
+                else:
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = next(f for f in running if f in done)
+                partition = running.pop(future)
+                submit()
+                yield partition, future.result()
+
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    return generate()
+
+
+class _NoResults(object):
+    # Stands in for a cursor to build an empty row list.
+    _field_names = []
+    _wrap_row = None
+
+
+def merge_rows(row_lists):
+    """Concatenate the row lists of several queries (with the same columns) into one."""
+
+    row_lists = list(row_lists)
+    if not row_lists:
+        raise ValueError("Nothing to merge.")
+
+    first = row_lists[0]
+
+    if isinstance(first, ColumnarRowList):
+        columns = [
+            tuple(itertools.chain.from_iterable(rows._columns[i] for rows in row_lists))
+            for i in range(len(first._field_names))
+        ]
+        return ColumnarRowList(first, columns, first._wrap_row)
+
+    for rows in row_lists[1:]:
+        first.extend(rows)
+    return first
+
+
+def fetch_partitioned(engine, query, partitions, max_workers=4, row_factory=None, as_dataframe=False,
+    _stack_depth=0, **kwargs):
+
+    """Run a query for every partition on a pool of threads, merging the results.
+
+    :param bool as_dataframe: Return a ``pandas.DataFrame`` instead of a row list.
+    :return: All the rows, in the order of ``partitions``; with no partitions,
+        an empty row list (without any columns).
+
+    .. seealso:: :func:`iter_partitions` for the other parameters.
+
+    """
+
+    results = iter_partitions(engine, query, partitions, max_workers, row_factory, True,
+        _stack_depth + 1, **kwargs)
+    row_lists = [rows for _, rows in results]
+    rows = merge_rows(row_lists) if row_lists else engine.row_list_class(_NoResults())
+    return rows.as_dataframe() if as_dataframe else rows
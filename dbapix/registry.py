@@ -1,3 +1,4 @@
+import threading
 
 from . import create_engine as _create_engine
 
@@ -18,10 +19,21 @@ class Registry(object):
 
         engine = dbs.create_engine('production')
 
+    To share one engine (and so one pool and tunnel) per name across a
+    process, use :meth:`get_engine` instead::
+
+        engine = dbs.get_engine('production')
+
+    Engines which route between others are built from names registered
+    this way; see :meth:`register_routing`.
+
     """
 
     def __init__(self):
         self.specs = {}
+        self.routing_specs = {}
+        self._engines = {}
+        self._lock = threading.RLock()
 
     def register(self, name, *args, **kwargs):
         """Register engine parameters under a name for later use.
@@ -33,17 +45,74 @@ class Registry(object):
         """
         self.specs[name] = (args, kwargs)
 
+    def register_routing(self, name, primary, replicas, **kwargs):
+        """Register a :class:`.RoutingEngine` under a name for later use.
+
+        :param str name: The name to store the params under.
+        :param str primary: The name of the primary's params.
+        :param list replicas: The names of the replicas' params.
+        :param kwargs: Passed to :class:`.RoutingEngine`.
+
+        E.g.::
+
+            dbs.register('primary', 'postgres', host='db1.example.com')
+            dbs.register('replica', 'postgres', host='db2.example.com')
+            dbs.register_routing('production', 'primary', ['replica'])
+
+        """
+        self.routing_specs[name] = (primary, list(replicas), kwargs)
+
     def create_engine(self, name):
         """Create the named engine.
 
         :param str name: A name previous registered with :meth:`register`.
-        :return: A freshly constructed :class:`.Engine`.
+        :return: A freshly constructed :class:`.Engine` (or :class:`.RoutingEngine`).
 
         """
+        return self._create_engine(name, self.create_engine)
+
+    def _create_engine(self, name, get_other):
+        if name in self.routing_specs:
+            from .routing import RoutingEngine
+            primary, replicas, kwargs = self.routing_specs[name]
+            return RoutingEngine(
+                get_other(primary),
+                [get_other(n) for n in replicas],
+                **kwargs
+            )
         try:
             args, kwargs = self.specs[name]
         except KeyError:
             raise ValueError("No engine specs for {!r} in registry.".format(name))
         return _create_engine(*args, **kwargs)
 
+    def get_engine(self, name):
+        """Get the shared engine for a name, creating it on first use.
+
+        :param str name: A name previous registered with :meth:`register`
+            or :meth:`register_routing`.
+        :return: The same :class:`.Engine` for every call with this name
+            (until :meth:`close_all`).
+
+        This is thread-safe. Registering the name again does not affect an
+        engine which was already created. Routing engines share the engines
+        of the names they route to.
 
+        """
+        try:
+            return self._engines[name]
+        except KeyError:
+            pass
+        with self._lock:
+            engine = self._engines.get(name)
+            if engine is None:
+                engine = self._engines[name] = self._create_engine(name, self.get_engine)
+            return engine
+
+    def close_all(self):
+        """Close every engine created by :meth:`get_engine`, and forget them."""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.close()
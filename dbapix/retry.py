@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+
+
+#: An error which should succeed if the transaction is run again, e.g. a
+#: serialization failure or deadlock.
+TRANSACTION = 'transaction'
+
+#: An error which broke the connection; run again on a new one.
+CONNECTION = 'connection'
+
+
+class RetryBudget(object):
+
+    """Limits retries to a fraction of calls, so that an outage doesn't multiply the load.
+
+    Every call deposits ``ratio`` of a token, and every retry takes a whole
+    one; ``min_retries`` tokens are always allowed per second so that
+    low-traffic processes can still retry.
+
+    Share one budget between policies (or engines) to limit them together.
+
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._tokens = 0.0
+        self._window = None
+        self._window_retries = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            # Don't let a long quiet period bank an unlimited burst.
+            self._tokens = min(self._tokens + self.ratio, 1000 * self.ratio)
+
+    def withdraw(self):
+        """Take a token for a retry, returning if one was available."""
+        with self._lock:
+            second = int(time.time())
+            if second != self._window:
+                self._window = second
+                self._window_retries = 0
+            if self._window_retries < self.min_retries:
+                self._window_retries += 1
+                return True
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class RetryPolicy(object):
+
+    """How to retry transactions which fail with transient errors.
+
+    :param int max_attempts: Most times to run the transaction (including the first).
+    :param float base_delay: Seconds to wait before the first retry; this
+        doubles for every retry after.
+    :param float max_delay: Most seconds to wait between attempts.
+    :param float deadline: Give up once this many seconds have passed since
+        the first attempt, instead of sleeping past it.
+    :param budget: A :class:`RetryBudget`, or ``None`` for no limit beyond the above.
+
+    Delays use "full jitter" (a random time between zero and the backoff), so
+    that transactions which conflicted with each other don't retry in lockstep.
+
+    .. seealso:: :meth:`.Engine.run_transaction`
+
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.05, max_delay=2.0, deadline=None, budget=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget = budget
+
+    def delay(self, attempt):
+        """Seconds to wait before the given attempt (counting the first as 1)."""
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 2))
+        return random.uniform(0, backoff)
+
+    def run(self, engine, func, con=None, **kwargs):
+        """Run ``func(con)`` in a transaction, retrying as needed.
+
+        .. seealso:: :meth:`.Engine.run_transaction`, which calls this.
+
+        With a ``con`` a broken connection can't be replaced, so isn't retried;
+        otherwise connections come from (and go back to) the engine, and
+        ``kwargs`` are passed to :meth:`.Engine.get_connection`.
+
+        """
+
+        if con is not None and (con._in_transaction or con._has_uncommitted_work()):
+            # Rolling back to retry would silently lose it.
+            raise RuntimeError("Connection has an open transaction; commit or roll it back first.")
+
+        if self.budget is not None:
+            self.budget.deposit()
+
+        start = time.time()
+        attempt = 1
+        own = con is None
+
+        while True:
+
+            if own:
+                con = engine.get_connection(**kwargs)
+
+            kind = None
+            try:
+                con.begin()
+                try:
+                    res = func(con)
+                except:
+                    try:
+                        con.rollback()
+                    except Exception:
+                        # Likely broken; we will find out below.
+                        pass
+                    raise
+                con.commit()
+                return res
+
+            except Exception as e:
+
+                kind = engine._classify_error(e)
+                if con.closed:
+                    kind = CONNECTION
+
+                if kind is None or (kind == CONNECTION and not own):
+                    raise
+                if attempt >= self.max_attempts:
+                    raise
+
+                delay = self.delay(attempt + 1)
+                if self.deadline is not None and time.time() + delay - start > self.deadline:
+                    raise
+                if self.budget is not None and not self.budget.withdraw():
+                    raise
+
+                engine._log.info("Retrying transaction after {} error (attempt {}) in {:.3f}s: {}".format(
+                    kind, attempt, delay, e))
+
+            finally:
+                if own:
+                    # Broken connections are replaced with a new one.
+                    engine.put_connection(con, close=kind == CONNECTION)
+
+            time.sleep(delay)
+            attempt += 1
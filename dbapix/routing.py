@@ -0,0 +1,295 @@
+import contextlib
+import logging
+import random
+import re
+import threading
+import time
+
+from . import partition
+
+
+log = logging.getLogger(__name__)
+
+
+_read_start_re = re.compile(r'^\s*(?:(?:--[^\n]*\n|/\*.*?\*/)\s*)*SELECT\b', re.I | re.S)
+_write_words_re = re.compile(r'\b(?:INSERT|UPDATE|DELETE|MERGE|INTO|SHARE|LOCK|NEXTVAL|SETVAL)\b', re.I)
+
+
+def is_read_query(query):
+    """Guess if a query only reads, and so can be sent to a replica.
+
+    This is conservative: only a ``SELECT`` which doesn't mention anything
+    which might write or lock counts.
+
+    >>> is_read_query('SELECT * FROM foo')
+    True
+    >>> is_read_query('SELECT * FROM foo FOR UPDATE')
+    False
+    >>> is_read_query('INSERT INTO foo DEFAULT VALUES')
+    False
+
+    """
+    return bool(_read_start_re.match(query)) and not _write_words_re.search(query)
+
+
+class _Scope(object):
+
+    def __init__(self):
+        self.wrote = False
+
+
+class RoutingEngine(object):
+
+    """Sends reads to replica engines, and everything else to the primary.
+
+    :param primary: The :class:`.Engine` for writes.
+    :param replicas: A list of :class:`.Engine` for reads.
+    :param str balance: How to pick a replica; ``"least-busy"`` (fewest
+        connections checked out) or ``"weighted"`` (randomly by ``weights``).
+    :param weights: A number per replica for ``"weighted"``.
+    :param float eject_for: Seconds to stop using a replica for after it fails.
+    :param float health_check_interval: If set, check every replica this
+        often from a background thread; see :meth:`check_health`.
+
+    Connections requested with ``readonly=True`` come from a replica, and
+    all others from the primary. :meth:`execute` guesses from the query::
+
+        engine = RoutingEngine(primary, [replica1, replica2])
+
+        with engine.connect(readonly=True) as con:
+            con.select('foo', ['*'])
+
+        with engine.connect() as con: # The primary.
+            con.insert('foo', dict(bar=1))
+
+    Replicas lag behind the primary, so reads may not see recent writes.
+    Within a :meth:`sticky` scope, once a connection has been taken from
+    the primary (i.e. something may have been written) all reads go to the
+    primary as well.
+
+    A replica which fails to give a connection, or fails a health check, is
+    ejected for ``eject_for`` seconds, and then tried again. If no replicas
+    are available, reads go to the primary.
+
+    Anything else (e.g. :attr:`~.Engine.types`) is passed through to the primary.
+
+    """
+
+    def __init__(self, primary, replicas=(), balance='least-busy', weights=None,
+        eject_for=30, health_check_interval=None):
+
+        self.primary = primary
+        self.replicas = list(replicas)
+
+        if balance not in ('least-busy', 'weighted'):
+            raise ValueError("Unknown balance {!r}.".format(balance))
+        self.balance = balance
+        self.weights = list(weights) if weights is not None else [1] * len(self.replicas)
+        if len(self.weights) != len(self.replicas):
+            raise ValueError("Need one weight per replica.")
+
+        self.eject_for = eject_for
+        self._ejected = {} # Replica index to when it may be used again.
+        self._lock = threading.Lock() # Guards _ejected.
+
+        self._local = threading.local()
+
+        self.health_check_interval = health_check_interval
+        self._health_stop = threading.Event()
+        self._health_thread = None
+        if health_check_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, name='dbapix-RoutingEngine')
+            self._health_thread.daemon = True
+            self._health_thread.start()
+
+    def __getattr__(self, key):
+        if key == 'primary':
+            raise AttributeError(key)
+        return getattr(self.primary, key)
+
+    def close(self):
+        self._health_stop.set()
+        thread = self._health_thread
+        if thread is not None and thread is not threading.current_thread():
+            # So a check in progress doesn't use the closed engines.
+            thread.join()
+        self.primary.close()
+        for replica in self.replicas:
+            replica.close()
+
+    def _candidates(self):
+
+        now = time.time()
+        with self._lock:
+            indexes = [i for i in range(len(self.replicas)) if self._ejected.get(i, 0) <= now]
+
+        if self.balance == 'least-busy':
+            # Shuffle so that ties are spread out.
+            random.shuffle(indexes)
+            indexes.sort(key=lambda i: len(self.replicas[i]._checked_out))
+            return indexes
+
+        # Weighted random order, without replacement.
+        ordered = []
+        while indexes:
+            total = sum(self.weights[i] for i in indexes)
+            x = random.uniform(0, total)
+            for i in indexes:
+                x -= self.weights[i]
+                if x <= 0:
+                    break
+            indexes.remove(i)
+            ordered.append(i)
+        return ordered
+
+    def add_hook(self, func):
+        """Add a hook to the primary and every replica; see :meth:`.Engine.add_hook`."""
+        for engine in [self.primary] + self.replicas:
+            engine.add_hook(func)
+
+    def remove_hook(self, func):
+        """Remove a hook from the primary and every replica."""
+        for engine in [self.primary] + self.replicas:
+            engine.remove_hook(func)
+
+    def eject(self, replica, error=None):
+        """Stop using a replica for :attr:`eject_for` seconds."""
+        i = self.replicas.index(replica)
+        log.warning("Ejecting replica {} for {}s: {}".format(i, self.eject_for, error))
+        with self._lock:
+            self._ejected[i] = time.time() + self.eject_for
+        # Idle connections are likely broken as well.
+        while replica.pool:
+            replica.pool.pop().close()
+
+    def ejected(self):
+        """The replicas which are currently ejected."""
+        now = time.time()
+        with self._lock:
+            return [self.replicas[i] for i, until in self._ejected.items() if until > now]
+
+    def check_health(self):
+        """Run ``SELECT 1`` on every replica, ejecting those which fail and
+        restoring those which pass."""
+        for i, replica in enumerate(self.replicas):
+            try:
+                con = replica.get_connection()
+                try:
+                    con.execute('SELECT 1').fetchall()
+                finally:
+                    replica.put_connection(con)
+            except Exception as e:
+                self.eject(replica, e)
+            else:
+                self._restore(i)
+
+    def _restore(self, i):
+        with self._lock:
+            self._ejected.pop(i, None)
+
+    def _health_loop(self):
+        while not self._health_stop.wait(self.health_check_interval):
+            try:
+                self.check_health()
+            except Exception:
+                log.exception("Error while checking replica health.")
+
+    @contextlib.contextmanager
+    def sticky(self):
+        """A scope (for this thread) in which reads go to the primary after it is used for anything.
+
+        Nested scopes are part of the outermost one.
+
+        """
+        if getattr(self._local, 'scope', None) is not None:
+            yield
+            return
+        self._local.scope = _Scope()
+        try:
+            yield
+        finally:
+            self._local.scope = None
+
+    def get_connection(self, timeout=None, readonly=False, **kwargs):
+        """Get a connection from a replica if ``readonly``, else from the primary.
+
+        .. seealso:: :meth:`.Engine.get_connection` for parameters.
+
+        """
+
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        if readonly:
+            kwargs['readonly'] = True
+
+        scope = getattr(self._local, 'scope', None)
+
+        if readonly and not (scope and scope.wrote):
+            for i in self._candidates():
+                replica = self.replicas[i]
+                try:
+                    con = replica.get_connection(timeout, **kwargs)
+                except Exception as e:
+                    self.eject(replica, e)
+                    continue
+                self._restore(i)
+                return con
+
+        if scope is not None and not readonly:
+            scope.wrote = True
+
+        return self.primary.get_connection(timeout, **kwargs)
+
+    def put_connection(self, con, *args, **kwargs):
+        """Return a connection to the engine it came from.
+
+        .. seealso:: :meth:`.Engine.put_connection` for parameters.
+
+        """
+        con._engine.put_connection(con, *args, **kwargs)
+
+    def connect(self, **kwargs):
+        """Get a context-managed :class:`.Connection`; see :meth:`.Engine.connect`."""
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        con = self.get_connection(**kwargs)
+        return con._engine._build_context(con, con)
+
+    def cursor(self, **kwargs):
+        """Get a context-managed :class:`.Cursor`; see :meth:`.Engine.cursor`."""
+        row_factory = kwargs.pop('row_factory', None)
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        con = self.get_connection(**kwargs)
+        cur = con.cursor(row_factory)
+        return con._engine._build_context(con, cur)
+
+    def iter_partitions(self, query, partitions, max_workers=4, row_factory=None, ordered=False, **kwargs):
+        """Run a partitioned query; see :meth:`.Engine.iter_partitions`.
+
+        Partitions are sent to replicas, unless ``readonly=False``.
+
+        """
+        kwargs.setdefault('readonly', True)
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        return partition.iter_partitions(self, query, partitions, max_workers, row_factory, ordered, **kwargs)
+
+    def fetch_partitioned(self, query, partitions, max_workers=4, row_factory=None, as_dataframe=False, **kwargs):
+        """Run a partitioned query; see :meth:`.Engine.fetch_partitioned`.
+
+        Partitions are sent to replicas, unless ``readonly=False``.
+
+        """
+        kwargs.setdefault('readonly', True)
+        kwargs['_stack_depth'] = 1 + kwargs.get('_stack_depth', 0)
+        return partition.fetch_partitioned(self, query, partitions, max_workers, row_factory, as_dataframe, **kwargs)
+
+    def execute(self, query, params=None, row_factory=None, cache=None, readonly=None, timeout=None):
+        """Execute a context-managed query; see :meth:`.Engine.execute`.
+
+        :param bool readonly: Send to a replica? ``None`` guesses with :func:`is_read_query`.
+
+        """
+        if readonly is None:
+            readonly = is_read_query(query)
+        con = self.get_connection(readonly=readonly, _stack_depth=1)
+        cur = con.cursor()
+        cur.execute(query, params, 1, row_factory, cache, timeout)
+        return con._engine._build_context(con, cur)
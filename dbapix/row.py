@@ -4,31 +4,79 @@ import collections
 
 from six import PY2, string_types
 
+from .types import decode_rows
 
-class RowList(list):
 
-    """An extension of ``list`` for holding rows."""
+def _tuple_factory(cur):
+    # No wrapping at all; the driver's own rows are returned.
+    return None
+
+class _Fields(object):
+
+    # Stands in for the cursor with its fields as of one result set, so that
+    # rows built later (e.g. lazily by a ColumnarRowList) don't see its next
+    # query. Anything else is read from the cursor itself.
 
     def __init__(self, cur):
+        self._cur = cur
         self._field_names = cur._field_names
+        self._field_indexes = cur._field_indexes
+        self.description = cur.description
 
-    def as_dataframe(self, **kwargs):
-        """Convert these rows into a ``pandas.DataFrame``.
+    def __getattr__(self, key):
+        return getattr(self._cur, key)
 
-        .. seealso:: :meth:`.Cursor.as_dataframe`.
+def _row_factory(cur):
+    row_class = cur._engine.row_class
+    fields = _Fields(cur)
+    return lambda raw: row_class(raw, fields)
 
-        """
+def _dict_factory(cur):
+    names = cur._field_names
+    return lambda raw: dict(zip(names, raw))
 
-        # This is essentially copy-pasta from the Cursor.as_dataframe.
-        kwargs.setdefault('columns', self._field_names)
-        import pandas
-        return pandas.DataFrame.from_records(iter(self), **kwargs)
+def _namedtuple_factory(cur):
+    return collections.namedtuple('Row', cur._field_names, rename=True)._make
+
+
+row_factories = dict(
+    tuple=_tuple_factory,
+    row=_row_factory,
+    dict=_dict_factory,
+    namedtuple=_namedtuple_factory,
+)
+
+
+def build_row_maker(factory, cur):
+    """Resolve a row factory into a function that wraps raw rows.
+
+    :param factory: One of the names in :data:`row_factories` (``"tuple"``,
+        ``"row"``, ``"dict"``, or ``"namedtuple"``), or a callable which takes
+        the cursor and returns a function to wrap each raw row.
+    :param cur: The :class:`.Cursor` that has just executed a query.
+    :return: A function to call on each raw row, or ``None`` if the raw rows
+        should be used as-is.
+
+    This is called once per result set, so factories can do their setup
+    (e.g. inspecting ``cur.description``) outside of the per-row path.
+
+    """
+    if isinstance(factory, string_types):
+        try:
+            factory = row_factories[factory]
+        except KeyError:
+            raise ValueError("Unknown row factory {!r}.".format(factory))
+    return factory(cur)
+
+
+class _RowListMixin(object):
 
     def print_table(self):
+        """Print these rows as a simple text table."""
 
-        str_rows = [map(str, row) for row in self]
+        str_rows = [[str(x) for x in row] for row in self]
 
-        max_lens = map(len, self._field_names)
+        max_lens = [len(x) for x in self._field_names]
         for row in str_rows:
             for i, x in enumerate(row):
                 max_lens[i] = max(max_lens[i], len(x))
@@ -41,6 +89,164 @@ class RowList(list):
         for row in str_rows:
             print(pattern.format(*row))
 
+
+class RowList(_RowListMixin, list):
+
+    """An extension of ``list`` for holding rows."""
+
+    def __init__(self, cur):
+        self._field_names = cur._field_names
+
+    @classmethod
+    def _from_cursor(cls, cur, raw_rows):
+        rows = cls(cur)
+        if cur._make_row is not None:
+            rows.extend(map(cur._make_row, raw_rows))
+        else:
+            rows.extend(raw_rows)
+        return rows
+
+    def as_dataframe(self, **kwargs):
+        """Convert these rows into a ``pandas.DataFrame``.
+
+        .. seealso:: :meth:`.Cursor.as_dataframe`.
+
+        """
+
+        # This is essentially copy-pasta from the Cursor.as_dataframe.
+        kwargs.setdefault('columns', self._field_names)
+        import pandas
+        return pandas.DataFrame.from_records(iter(self), **kwargs)
+
+
+class ColumnarRowList(_RowListMixin, collections.Sequence):
+
+    """A memory-light alternative to :class:`RowList`.
+
+    Values are stored as one tuple per column, and rows (as picked by the
+    cursor's row factory) are only built when they are accessed. This avoids
+    holding a Python object per row, and :meth:`as_dataframe` can hand the
+    columns to Pandas directly.
+
+    It is a sequence rather than a ``list``. Rows can be added via
+    :meth:`append` and :meth:`extend`, but each call copies the columns, so
+    add many at once.
+
+    Use it by setting :attr:`.Engine.row_list_class` or
+    :attr:`.Cursor.row_list_class`::
+
+        cur.row_list_class = ColumnarRowList
+        rows = cur.execute('SELECT * FROM foo').fetchall()
+
+    """
+
+    def __init__(self, cur, columns=None, wrap_row=None):
+        self._field_names = cur._field_names
+        self._wrap_row = cur._wrap_row if wrap_row is None else wrap_row
+        self._columns = columns if columns is not None else [() for _ in self._field_names]
+
+    @classmethod
+    def _from_cursor(cls, cur, raw_rows):
+        if cur._decoders:
+            raw_rows = decode_rows(raw_rows, cur._decoders)
+        columns = list(zip(*raw_rows)) or None
+        return cls(cur, columns)
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.__class__(self, [col[i] for col in self._columns], self._wrap_row)
+        raw = tuple(col[i] for col in self._columns)
+        return raw if self._wrap_row is None else self._wrap_row(raw)
+
+    def __iter__(self):
+        wrap_row = self._wrap_row
+        for raw in zip(*self._columns):
+            yield raw if wrap_row is None else wrap_row(raw)
+
+    def __repr__(self):
+        return '<ColumnarRowList {} rows of {}>'.format(len(self), ', '.join(self._field_names))
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarRowList):
+            return self._columns == other._columns
+        if not isinstance(other, collections.Sequence) or isinstance(other, string_types):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def _raw_row(self, row):
+        if isinstance(row, dict):
+            return tuple(row[name] for name in self._field_names)
+        return tuple(row)
+
+    def append(self, row):
+        """Add a row (a tuple, :class:`Row`, or ``dict`` by column name)."""
+        self.extend((row, ))
+
+    def extend(self, rows):
+        """Add many rows; see :meth:`append`."""
+        if isinstance(rows, ColumnarRowList):
+            columns = rows._columns
+        else:
+            columns = list(zip(*[self._raw_row(row) for row in rows]))
+        if not columns:
+            return
+        if len(columns) != len(self._field_names):
+            raise ValueError("Rows have {} columns; expected {}.".format(len(columns), len(self._field_names)))
+        self._columns = [a + tuple(b) for a, b in zip(self._columns, columns)]
+
+    def column(self, key):
+        """Get all values of one column as a tuple.
+
+        :param key: The column's name or index.
+
+        """
+        if isinstance(key, string_types):
+            key = self._field_names.index(key)
+        return self._columns[key]
+
+    def as_dataframe(self, **kwargs):
+        """Convert these rows into a ``pandas.DataFrame``, directly from the columns.
+
+        Supports the ``columns``, ``index``, and ``exclude`` kwargs of
+        ``pandas.DataFrame.from_records``; anything else falls back to it.
+
+        .. seealso:: :meth:`.Cursor.as_dataframe`.
+
+        """
+
+        import pandas
+
+        names = list(kwargs.pop('columns', None) or self._field_names)
+        index = kwargs.pop('index', None)
+        exclude = kwargs.pop('exclude', None)
+
+        if kwargs:
+            return pandas.DataFrame.from_records(
+                list(zip(*self._columns)) if self._columns else [],
+                columns=names, index=index, exclude=exclude, **kwargs
+            )
+
+        # Build by position so that duplicate names survive.
+        df = pandas.DataFrame(dict(enumerate(self._columns)), columns=range(len(names)))
+        df.columns = names
+
+        if exclude:
+            df = df.drop(columns=list(exclude))
+        if index is not None:
+            df = df.set_index(index)
+
+        return df
+
+
 class Row(tuple):
 
     """A row in a query result.
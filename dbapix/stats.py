@@ -0,0 +1,206 @@
+from __future__ import print_function
+
+import random
+import sys
+import threading
+
+
+class StatementStat(object):
+
+    """Totals for one query template, as returned by :meth:`StatementStats.snapshot`.
+
+    .. attribute:: engine
+
+        The engine's number (as in its logger's name).
+
+    .. attribute:: template
+
+        The query as given to ``execute``, before binding.
+
+    .. attribute:: calls
+    .. attribute:: errors
+
+        How many times it was executed, and how many of those failed.
+
+    .. attribute:: total_time
+    .. attribute:: min_time
+    .. attribute:: max_time
+    .. attribute:: p95_time
+
+        Seconds spent executing. The 95th percentile is estimated from a
+        random sample of calls.
+
+    .. attribute:: fetch_time
+    .. attribute:: rows
+
+        Seconds spent fetching, and how many rows were fetched.
+
+    .. attribute:: rowcount
+
+        The total of the driver's ``rowcount`` (where known), e.g. rows written.
+
+    """
+
+    __slots__ = (
+        'engine', 'template', 'calls', 'errors',
+        'total_time', 'min_time', 'max_time', 'p95_time',
+        'fetch_time', 'rows', 'rowcount',
+        '_samples', '_seen',
+    )
+
+    def __init__(self, engine, template):
+        self.engine = engine
+        self.template = template
+        self.calls = self.errors = 0
+        self.total_time = self.fetch_time = 0.0
+        self.min_time = self.max_time = self.p95_time = None
+        self.rows = self.rowcount = 0
+        self._samples = []
+        self._seen = 0
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls else None
+
+    def __repr__(self):
+        return '<StatementStat {!r} calls={} total={:.6f}s>'.format(self.template, self.calls, self.total_time)
+
+    def _copy(self):
+        copy = StatementStat(self.engine, self.template)
+        for key in self.__slots__[2:-2]:
+            setattr(copy, key, getattr(self, key))
+        copy._samples = list(self._samples)
+        return copy
+
+    def _finish(self):
+        if self._samples:
+            samples = sorted(self._samples)
+            # Nearest rank.
+            self.p95_time = samples[max(0, -(-len(samples) * 95 // 100) - 1)]
+        self._samples = []
+
+
+class StatementStats(object):
+
+    """Client-side statistics per query, similar to Postgres' ``pg_stat_statements``.
+
+    This is a hook; add it to any number of engines::
+
+        stats = StatementStats()
+        engine.add_hook(stats)
+
+        # ... later ...
+        stats.dump()
+
+    Statistics are kept per engine and query template (the query string as
+    written in the code, before parameters are bound), so every call from one
+    place in the code is counted together.
+
+    :param int sample_size: How many latencies to keep per template for
+        estimating percentiles.
+
+    Updates take a single lock for a few additions, and the (slow) work of
+    sorting samples is deferred to :meth:`snapshot`.
+
+    """
+
+    def __init__(self, sample_size=1000):
+        self.sample_size = sample_size
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def __call__(self, event):
+
+        name = event.name
+        if name != 'execute' and name != 'fetch':
+            return
+
+        template = event.template
+        if template is None:
+            return
+
+        key = (event.engine._engine_counter, template)
+        duration = event.duration
+
+        with self._lock:
+
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = StatementStat(key[0], template)
+
+            if name == 'fetch':
+                stat.fetch_time += duration
+                if event.rows:
+                    stat.rows += event.rows
+                return
+
+            stat.calls += 1
+            if event.error is not None:
+                stat.errors += 1
+            if event.rowcount is not None and event.rowcount > 0:
+                stat.rowcount += event.rowcount
+
+            stat.total_time += duration
+            if stat.min_time is None or duration < stat.min_time:
+                stat.min_time = duration
+            if stat.max_time is None or duration > stat.max_time:
+                stat.max_time = duration
+
+            # Reservoir sampling, so every call is equally likely to be kept.
+            stat._seen += 1
+            samples = stat._samples
+            if len(samples) < self.sample_size:
+                samples.append(duration)
+            else:
+                i = self._random.randrange(stat._seen)
+                if i < self.sample_size:
+                    samples[i] = duration
+
+    def snapshot(self):
+        """Copies of the current statistics.
+
+        :return: A list of :class:`StatementStat`, most total time first.
+
+        """
+        with self._lock:
+            res = [stat._copy() for stat in self._stats.values()]
+        # Samples are sorted outside of the lock.
+        for stat in res:
+            stat._finish()
+        res.sort(key=lambda s: -s.total_time)
+        return res
+
+    def reset(self):
+        """Forget everything so far."""
+        with self._lock:
+            self._stats = {}
+
+    def dump(self, file=None, limit=20):
+        """Print the statements with the most total time as a table.
+
+        :param file: Where to write; defaults to ``sys.stdout``.
+        :param int limit: How many statements to print; ``None`` for all.
+
+        """
+
+        file = file or sys.stdout
+        stats = self.snapshot()
+        if limit is not None:
+            stats = stats[:limit]
+
+        print('{:>8s} {:>6s} {:>10s} {:>10s} {:>10s} {:>10s} {:>8s}  {}'.format(
+            'calls', 'errors', 'total ms', 'mean ms', 'p95 ms', 'max ms', 'rows', 'query',
+        ), file=file)
+        for stat in stats:
+            print('{:8d} {:6d} {:10.3f} {:10.3f} {:10.3f} {:10.3f} {:8d}  {}'.format(
+                stat.calls,
+                stat.errors,
+                stat.total_time * 1000,
+                (stat.mean_time or 0) * 1000,
+                (stat.p95_time or 0) * 1000,
+                (stat.max_time or 0) * 1000,
+                stat.rows,
+                ' '.join(stat.template.split()),
+            ), file=file)
+
@@ -0,0 +1,176 @@
+import atexit
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+def _freeze(value):
+    # Something hashable to key tunnels by.
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return ('id', id(value))
+    return value
+
+
+class SharedTunnel(object):
+
+    """An ``sshtunnel.SSHTunnelForwarder`` shared by every engine with the same parameters.
+
+    Created by :meth:`TunnelManager.acquire`; anything not defined here is
+    passed through to the forwarder.
+
+    """
+
+    def __init__(self, manager, key, kwargs):
+        self._manager = manager
+        self.key = key
+        self.kwargs = kwargs
+        self.refs = 0
+        self.forwarder = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, key):
+        if key == 'forwarder':
+            raise AttributeError(key)
+        return getattr(self.forwarder, key)
+
+    def _start(self):
+
+        forwarder = self._manager.forwarder_class(**self.kwargs)
+
+        # Force them to die at exit. Not sure all of this is nessesary.
+        # On only some hosts these threads remain open and blocking.
+        # In theory setting the daemon_* attributes should be enough,
+        # but there is at least one host where we need to explicitly
+        # close everything down, hence the atexit in the manager.
+        forwarder.daemon_forward_servers = True
+        forwarder.daemon_transport = True
+
+        forwarder.start()
+        self.forwarder = forwarder
+
+    def ensure_up(self):
+        """Start the tunnel again if its SSH transport has dropped.
+
+        Called before every new connection through the tunnel. The local port
+        may change when restarted, so read :attr:`local_bind_port` afterwards.
+
+        """
+        with self._lock:
+            if self.forwarder is None:
+                self._start()
+            elif not self.forwarder.is_active:
+                log.warning("SSH tunnel to {} is down; restarting.".format(self.kwargs.get('ssh_address_or_host')))
+                self.forwarder.restart()
+
+    @property
+    def local_bind_port(self):
+        return self.forwarder.local_bind_port
+
+    def close(self):
+        """Give up this reference to the tunnel; see :meth:`TunnelManager.release`."""
+        self._manager.release(self)
+
+    def _stop(self):
+        with self._lock:
+            if self.forwarder is not None:
+                self.forwarder.stop()
+                self.forwarder = None
+
+
+class TunnelManager(object):
+
+    """Shares SSH tunnels between engines.
+
+    Tunnels are keyed by all of their ``sshtunnel.SSHTunnelForwarder``
+    parameters (i.e. SSH endpoint, credentials, and remote bind address), so
+    engines for databases behind the same bastion share one SSH connection.
+    Each tunnel is reference counted, and stopped when the last engine using
+    it is closed.
+
+    Socket engines created with a ``tunnel`` dict use the process-wide
+    :data:`tunnels`.
+
+    :param forwarder_class: What to build tunnels with; defaults to
+        ``sshtunnel.SSHTunnelForwarder``.
+
+    """
+
+    def __init__(self, forwarder_class=None):
+        self._forwarder_class = forwarder_class
+        self._tunnels = {}
+        self._lock = threading.Lock()
+
+    @property
+    def forwarder_class(self):
+        if self._forwarder_class is None:
+            from sshtunnel import SSHTunnelForwarder
+            self._forwarder_class = SSHTunnelForwarder
+        return self._forwarder_class
+
+    def acquire(self, _shared=True, **kwargs):
+        """Get a started tunnel for the given ``SSHTunnelForwarder`` kwargs.
+
+        :return: A :class:`SharedTunnel`, which should be given back via
+            :meth:`release` (or its ``close``).
+
+        """
+
+        # Unshared tunnels are still tracked, so they are stopped at exit.
+        key = _freeze(kwargs) if _shared else object()
+        with self._lock:
+            tunnel = self._tunnels.get(key)
+            if tunnel is None:
+                tunnel = self._tunnels[key] = SharedTunnel(self, key, kwargs)
+            tunnel.refs += 1
+
+        try:
+            tunnel.ensure_up()
+        except:
+            self.release(tunnel)
+            raise
+
+        return tunnel
+
+    def release(self, tunnel):
+        """Give up a reference to a tunnel, stopping it if it was the last."""
+        with self._lock:
+            tunnel.refs -= 1
+            if tunnel.refs > 0:
+                return
+            self._tunnels.pop(tunnel.key, None)
+        tunnel._stop()
+
+    def check_health(self):
+        """Restart any tunnels whose SSH transport has dropped."""
+        with self._lock:
+            tunnels = list(self._tunnels.values())
+        for tunnel in tunnels:
+            try:
+                tunnel.ensure_up()
+            except Exception:
+                log.exception("Could not restart SSH tunnel.")
+
+    def close_all(self):
+        """Stop every tunnel, regardless of who is using it."""
+        with self._lock:
+            tunnels = list(self._tunnels.values())
+            self._tunnels.clear()
+        for tunnel in tunnels:
+            tunnel._stop()
+
+    def __len__(self):
+        return len(self._tunnels)
+
+
+#: The process-wide :class:`TunnelManager`.
+tunnels = TunnelManager()
+
+atexit.register(tunnels.close_all)
@@ -0,0 +1,78 @@
+class TypeRegistry(object):
+
+    """Conversions between database and Python values, applied by dbapix.
+
+    Every :class:`.Engine` has one as :attr:`.Engine.types`. Decoders are keyed
+    by the ``type_code`` that the driver reports in ``cursor.description``
+    (e.g. the type OID for Postgres, or the field type for MySQL), and encoders
+    by the exact Python type of a parameter::
+
+        engine.types.register_decoder(1700, float) # Postgres NUMERIC
+        engine.types.register_encoder(MyEnum, lambda x: x.value)
+
+    Decoders are resolved once per result set, and columns without one are
+    skipped entirely while rows are fetched.
+
+    .. note:: SQLite does not report a ``type_code``, so a SQLite engine uses
+        the type in column names instead (``SELECT x AS "x [json]"`` is
+        ``"JSON"``), once it has decoders; see :class:`dbapix.drivers.sqlite3.Engine`.
+
+    """
+
+    def __init__(self):
+        self.decoders = {}
+        self.encoders = {}
+
+    def register_decoder(self, type_code, func):
+        """Decode non-``NULL`` values of columns with the given ``type_code`` via ``func``."""
+        self.decoders[type_code] = func
+
+    def register_encoder(self, type_, func):
+        """Encode parameters which are exactly of type ``type_`` via ``func``."""
+        self.encoders[type_] = func
+
+    def compile_decoders(self, description):
+        """Resolve the decoders for a result set.
+
+        :param description: A DB-API 2.0 ``cursor.description``.
+        :return: A tuple of ``(index, func)`` pairs for the columns which have
+            a decoder; empty if there are none.
+
+        """
+        if not self.decoders or not description:
+            return ()
+        out = []
+        for i, field in enumerate(description):
+            try:
+                func = self.decoders.get(field[1])
+            except TypeError: # Unhashable.
+                continue
+            if func is not None:
+                out.append((i, func))
+        return tuple(out)
+
+    def encode_params(self, params):
+        """Encode a sequence of parameters, returning a list."""
+        if not self.encoders:
+            return params
+        encoders = self.encoders
+        out = []
+        for value in params:
+            func = encoders.get(type(value))
+            out.append(value if func is None else func(value))
+        return out
+
+
+def decode_row(raw, decoders):
+    """Apply compiled decoders (from :meth:`TypeRegistry.compile_decoders`) to one raw row."""
+    row = list(raw)
+    for i, func in decoders:
+        value = row[i]
+        if value is not None:
+            row[i] = func(value)
+    return tuple(row)
+
+
+def decode_rows(raw_rows, decoders):
+    """Apply compiled decoders to a sequence of raw rows, returning a list."""
+    return [decode_row(raw, decoders) for raw in raw_rows]
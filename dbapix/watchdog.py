@@ -0,0 +1,136 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+class QueryTimeout(Exception):
+
+    """A query was cancelled for running longer than its ``timeout``.
+
+    The connection has been rolled back, and is safe to use (or return to
+    the pool).
+
+    .. attribute:: timeout
+
+        The timeout which was exceeded, in seconds.
+
+    .. attribute:: error
+
+        The exception raised by the driver when the query was cancelled.
+
+    """
+
+    def __init__(self, timeout, error=None):
+        super(QueryTimeout, self).__init__('Query cancelled after {}s.'.format(timeout))
+        self.timeout = timeout
+        self.error = error
+
+
+class Alarm(object):
+
+    """A call scheduled by :meth:`Watchdog.schedule`."""
+
+    def __init__(self, watchdog, func):
+        self._watchdog = watchdog
+        self._func = func
+        self._lock = threading.Lock()
+        self.cancelled = False
+        #: Has the function been called?
+        self.fired = False
+
+    def cancel(self):
+        """Stop the call from happening.
+
+        Once this returns, the function has either already finished, or will
+        never be called.
+
+        """
+        with self._lock:
+            if self.cancelled or self.fired:
+                return
+            self.cancelled = True
+        with self._watchdog._cond:
+            self._watchdog._cancelled += 1
+
+    def _fire(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.fired = True
+            try:
+                self._func()
+            except Exception:
+                log.exception("Error in watchdog callback {!r}.".format(self._func))
+
+
+class Watchdog(object):
+
+    """A single thread which calls functions after a delay.
+
+    Unlike a ``threading.Timer`` per call, this costs one heap push per
+    call, and one thread for the whole process. It is started the first time
+    it is used.
+
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._thread = None
+        self._cancelled = 0
+
+    def schedule(self, delay, func):
+        """Call ``func()`` (on the watchdog thread) in ``delay`` seconds.
+
+        :return: An :class:`Alarm`, to :meth:`~Alarm.cancel` it.
+
+        """
+
+        alarm = Alarm(self, func)
+        deadline = time.time() + delay
+
+        with self._cond:
+
+            # Cancelled alarms are left where they are; clean up when they
+            # are most of the heap.
+            if self._cancelled > 100 and self._cancelled > len(self._heap) // 2:
+                self._heap = [x for x in self._heap if not x[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+            heapq.heappush(self._heap, (deadline, next(self._counter), alarm))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='dbapix-watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+            elif self._heap[0][2] is alarm:
+                # It is sooner than what the thread is waiting for.
+                self._cond.notify()
+
+        return alarm
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, alarm = self._heap[0]
+                delay = deadline - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                if alarm.cancelled:
+                    self._cancelled -= 1
+                    continue
+            alarm._fire()
+
+
+#: The process-wide :class:`Watchdog`, used for query timeouts.
+watchdog = Watchdog()
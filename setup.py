@@ -8,7 +8,7 @@ setup(
 
     url='http://github.com/mikeboers/dbapix',
     
-    packages=find_packages(exclude=['build*', 'tests*']),
+    packages=find_packages(exclude=['benchmarks*', 'build*', 'tests*']),
     include_package_data=True,
     
     author='Mike Boers',
@@ -0,0 +1,74 @@
+import io
+
+from . import *
+
+
+class TestArrow(TestCase):
+
+    def create_connection(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        con = db.get_connection()
+
+        con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, x INTEGER NOT NULL, name TEXT)''')
+        for x in range(10):
+            con.insert('foo', dict(x=x, name='n{}'.format(x)))
+
+        return con
+
+    @needs_imports('pyarrow')
+    def test_batches(self):
+
+        con = self.create_connection()
+
+        cur = con.execute('''SELECT * FROM foo''')
+        batches = list(cur.iter_arrow_batches(batch_size=4))
+
+        self.assertEqual([b.num_rows for b in batches], [4, 4, 2])
+        self.assertEqual(batches[0].schema.names, ['id', 'x', 'name'])
+        self.assertEqual(batches[-1].column(1).to_pylist(), [8, 9])
+
+        # All batches share the schema of the first.
+        self.assertTrue(all(b.schema == batches[0].schema for b in batches))
+
+    @needs_imports('pyarrow')
+    def test_table(self):
+
+        con = self.create_connection()
+
+        table = con.execute('''SELECT x, name FROM foo''').to_arrow(batch_size=3)
+        self.assertEqual(table.num_rows, 10)
+        self.assertEqual(table.column('name').to_pylist()[:2], ['n0', 'n1'])
+
+        # Empty results still have the right columns.
+        table = con.execute('''SELECT x, name FROM foo WHERE x < 0''').to_arrow()
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema.names, ['x', 'name'])
+
+    @needs_imports('pyarrow')
+    def test_explicit_schema(self):
+
+        import pyarrow
+
+        con = self.create_connection()
+
+        schema = pyarrow.schema([('x', pyarrow.float64()), ('name', pyarrow.string())])
+        table = con.execute('''SELECT x, name FROM foo''').to_arrow(schema=schema)
+        self.assertEqual(table.schema, schema)
+
+    @needs_imports('pyarrow')
+    def test_parquet(self):
+
+        import pyarrow.parquet
+
+        con = self.create_connection()
+
+        buf = io.BytesIO()
+        count = con.execute('''SELECT * FROM foo''').write_parquet(buf, row_group_size=4, batch_size=3)
+        self.assertEqual(count, 10)
+
+        buf.seek(0)
+        pfile = pyarrow.parquet.ParquetFile(buf)
+        self.assertEqual(pfile.metadata.num_rows, 10)
+        self.assertEqual([pfile.metadata.row_group(i).num_rows for i in range(pfile.num_row_groups)], [4, 4, 2])
+        self.assertEqual(pfile.read().column('x').to_pylist(), list(range(10)))
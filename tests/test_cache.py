@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import time
+
+from . import *
+
+from dbapix.cache import ResultCache, find_tables, find_written_tables
+from dbapix.row import RowList
+
+
+class TestResultCache(TestCase):
+
+    def create_engine(self, **kwargs):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+
+        db = create_engine('sqlite3', os.path.join(tmp, 'cache.db'))
+        self.addCleanup(db.close)
+        db.result_cache = ResultCache(**kwargs)
+
+        with db.connect(autocommit=True) as con:
+            con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)''')
+            con.insert('foo', dict(value=1))
+
+        return db
+
+    def test_find_tables(self):
+        self.assertEqual(find_tables('SELECT * FROM foo'), set(['foo']))
+        self.assertEqual(find_tables('SELECT * FROM `a` LEFT JOIN b ON 1'), set(['a', 'b']))
+        self.assertEqual(find_tables('SELECT 1'), set())
+
+    def test_find_written_tables(self):
+        self.assertEqual(find_written_tables('INSERT OR REPLACE INTO "Foo" VALUES (1)'), set(['foo']))
+        self.assertEqual(find_written_tables('UPDATE a SET x = (SELECT y FROM b)'), set(['a']))
+        self.assertEqual(find_written_tables('DELETE FROM a'), set(['a']))
+        self.assertEqual(find_written_tables('SELECT * FROM a'), set())
+
+    def test_select(self):
+
+        db = self.create_engine()
+        con = db.get_connection(autocommit=True)
+
+        rows = con.select('foo', ['value']).fetchall()
+        self.assertIsInstance(rows, RowList)
+        self.assertEqual(rows[0]['value'], 1)
+        self.assertEqual(db.result_cache.stats()['misses'], 1)
+
+        # Change it behind the cache's back.
+        con.wrapped.execute('''UPDATE foo SET value = 2''')
+
+        cur = con.select('foo', ['value'])
+        self.assertEqual(cur.description[0][0], 'value')
+        self.assertEqual(next(cur)['value'], 1)
+        self.assertEqual(db.result_cache.stats()['hits'], 1)
+
+        # Explicitly bypassing it.
+        self.assertEqual(next(con.select('foo', ['value'], cache=False))['value'], 2)
+
+        # Writes via the helpers invalidate.
+        con.update('foo', dict(value=3), 'id = 1')
+        self.assertEqual(next(con.select('foo', ['value']))['value'], 3)
+        self.assertEqual(db.result_cache.stats()['invalidations'], 1)
+
+        # As do recognized writes via execute.
+        con.execute('''UPDATE foo SET value = 4''')
+        self.assertEqual(next(con.select('foo', ['value']))['value'], 4)
+
+        # Parameters are part of the key.
+        self.assertEqual(len(con.select('foo', ['id'], 'value = {}', [4]).fetchall()), 1)
+        self.assertEqual(len(con.select('foo', ['id'], 'value = {}', [5]).fetchall()), 0)
+
+    def test_execute(self):
+
+        db = self.create_engine()
+        con = db.get_connection(autocommit=True)
+
+        # Plain execute doesn't cache by default.
+        con.execute('''SELECT value FROM foo''').fetchall()
+        self.assertEqual(db.result_cache.stats()['misses'], 0)
+
+        self.assertEqual(con.execute('''SELECT value FROM foo''', cache=True).fetchall()[0][0], 1)
+        rows = con.execute('''SELECT value FROM foo''', cache=True, row_factory='dict').fetchall()
+        self.assertEqual(rows, [dict(value=1)])
+
+        stats = db.result_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        db.result_cache.invalidate('FOO')
+        self.assertEqual(db.result_cache.stats()['entries'], 0)
+
+    def test_transactions(self):
+
+        db = self.create_engine()
+        a = db.get_connection(autocommit=True)
+        b = db.get_connection() # Not autocommit, and never in begin().
+
+        self.assertEqual(next(a.select('foo', ['value']))['value'], 1)
+
+        # Uncommitted reads are never cached...
+        b.update('foo', dict(value=3), 'id = 1')
+        self.assertEqual(next(b.select('foo', ['value']))['value'], 3)
+        b.rollback()
+        self.assertEqual(next(a.select('foo', ['value']))['value'], 1)
+
+        # ... and writes only invalidate once they are committed.
+        b.execute('''UPDATE foo SET value = 5''')
+        self.assertEqual(next(a.select('foo', ['value']))['value'], 1)
+        b.commit()
+        self.assertEqual(next(a.select('foo', ['value']))['value'], 5)
+
+        # Same for explicit transactions.
+        with b.begin():
+            b.execute('''UPDATE foo SET value = 6''')
+        self.assertEqual(next(a.select('foo', ['value']))['value'], 6)
+
+    def test_ttl(self):
+
+        db = self.create_engine()
+        con = db.get_connection(autocommit=True)
+
+        con.execute('''SELECT value FROM foo''', cache=0.01).fetchall()
+        time.sleep(0.02)
+        con.execute('''SELECT value FROM foo''', cache=True).fetchall()
+
+        stats = db.result_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (0, 2, 1))
+
+    def test_size_bound(self):
+
+        cache = ResultCache(max_bytes=1500)
+        cache.put('a', [('x', )], [(i, ) for i in range(10)])
+        cache.put('b', [('x', )], [(i, ) for i in range(10)])
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        # Too big to cache at all.
+        cache.put('c', [('x', )], [(i, ) for i in range(1000)])
+        self.assertIsNone(cache.get('c'))
@@ -0,0 +1,141 @@
+import sys
+
+import six
+
+from . import *
+
+from dbapix.row import ColumnarRowList, Row
+
+
+class TestColumnarRowList(TestCase):
+
+    def create_connection(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        db.row_list_class = ColumnarRowList
+        con = db.get_connection()
+
+        con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, x INTEGER NOT NULL, y TEXT)''')
+        for x in range(10):
+            con.insert('foo', dict(x=x, y=str(x ** 2)))
+
+        return con
+
+    def test_basics(self):
+
+        con = self.create_connection()
+
+        rows = con.execute('''SELECT * FROM foo''').fetchall()
+        self.assertIsInstance(rows, ColumnarRowList)
+        self.assertEqual(len(rows), 10)
+
+        row = rows[3]
+        self.assertIsInstance(row, Row)
+        self.assertEqual(row['x'], 3)
+        self.assertEqual(rows[-1]['y'], '81')
+        self.assertRaises(IndexError, lambda: rows[10])
+
+        self.assertEqual([r['x'] for r in rows], list(range(10)))
+        self.assertEqual(rows.column('y')[:3], ('0', '1', '4'))
+        self.assertEqual(rows.column(1), tuple(range(10)))
+
+        part = rows[2:4]
+        self.assertIsInstance(part, ColumnarRowList)
+        self.assertEqual([tuple(r) for r in part], [(3, 2, '4'), (4, 3, '9')])
+
+    def test_cursor_reuse(self):
+
+        con = self.create_connection()
+        cur = con.cursor()
+
+        rows = cur.execute('''SELECT 1 AS a, 2 AS b''').fetchall()
+        cur.execute('''SELECT 5 AS x''')
+
+        self.assertEqual(list(rows[0].keys()), ['a', 'b'])
+        self.assertEqual(rows[0]['b'], 2)
+        self.assertEqual(repr(rows[0]), '<Row a=1, b=2>')
+
+    def test_list_api(self):
+
+        con = self.create_connection()
+        rows = con.execute('''SELECT x, y FROM foo WHERE x < 2''').fetchall()
+
+        self.assertEqual(rows, [(0, '0'), (1, '1')])
+        self.assertEqual(rows, con.execute('''SELECT x, y FROM foo WHERE x < 2''').fetchall())
+        self.assertNotEqual(rows, [(0, '0')])
+        self.assertNotEqual(rows, 'nope')
+
+        rows.append((2, '4'))
+        rows.append(dict(y='9', x=3))
+        rows.extend(con.execute('''SELECT x, y FROM foo WHERE x = 4''').fetchall())
+        rows.extend([])
+        self.assertEqual(rows.column('x'), (0, 1, 2, 3, 4))
+        self.assertEqual(rows[-1]['y'], '16')
+        self.assertRaises(ValueError, rows.append, (5, ))
+
+    def test_custom_row_class(self):
+
+        con = self.create_connection()
+
+        class MyRow(Row):
+            def __init__(self, raw, cur):
+                super(MyRow, self).__init__(raw, cur)
+                self.types = [f[1] for f in cur.description]
+                self.connection = cur._connection
+
+        con._engine.row_class = MyRow
+        cur = con.cursor()
+        rows = cur.execute('''SELECT x AS a FROM foo WHERE x < 2''').fetchall()
+        cur.execute('''SELECT 1 AS b, 2 AS c''')
+
+        # Built lazily, but with the query they came from.
+        self.assertEqual(list(rows[0].keys()), ['a'])
+        self.assertEqual(len(rows[1].types), 1)
+        self.assertIs(rows[1].connection, con)
+
+    def test_row_factory(self):
+        con = self.create_connection()
+        rows = con.execute('''SELECT x FROM foo''', row_factory='tuple').fetchmany(2)
+        self.assertEqual(list(rows), [(0, ), (1, )])
+
+    def test_empty(self):
+        con = self.create_connection()
+        rows = con.execute('''SELECT * FROM foo WHERE x < 0''').fetchall()
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(list(rows), [])
+
+    def test_print_table(self):
+
+        con = self.create_connection()
+        rows = con.execute('''SELECT x, y FROM foo WHERE x > 7''').fetchall()
+
+        out = six.StringIO()
+        stdout, sys.stdout = sys.stdout, out
+        try:
+            rows.print_table()
+        finally:
+            sys.stdout = stdout
+
+        self.assertEqual(out.getvalue().splitlines(), [
+            'x | y ',
+            '--|---',
+            '8 | 64',
+            '9 | 81',
+        ])
+
+    @needs_imports('pandas')
+    def test_dataframe(self):
+
+        con = self.create_connection()
+
+        df = con.execute('''SELECT * FROM foo''').fetchall().as_dataframe()
+        self.assertEqual(list(df.columns), ['id', 'x', 'y'])
+        self.assertEqual(list(df['x']), list(range(10)))
+
+        df = con.execute('''SELECT * FROM foo''').fetchall().as_dataframe(index='id', exclude=['y'])
+        self.assertEqual(list(df.columns), ['x'])
+        self.assertEqual(df.loc[3, 'x'], 2)
+
+        # Anything else falls back to from_records.
+        df = con.execute('''SELECT * FROM foo''').fetchall().as_dataframe(coerce_float=True)
+        self.assertEqual(df.shape, (10, 3))
@@ -164,4 +164,73 @@ class GenericTestMixin(object):
             con1.rollback()
         assert_count(6)
 
+    def test_bulk(self):
 
+        db = self.create_engine()
+        with db.connect() as con:
+
+            con.execute('''DROP TABLE IF EXISTS test_generic_bulk''')
+            con.execute('''CREATE TABLE test_generic_bulk (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)''')
+
+            con.executemany('''INSERT INTO test_generic_bulk (id, value) VALUES ({}, {})''', [(1, 10), (2, 20)])
+            con.insert_many('test_generic_bulk', [dict(id=i, value=i * 10) for i in range(3, 8)], page_size=2)
+            self.assertEqual(next(con.execute('''SELECT count(1) FROM test_generic_bulk'''))[0], 7)
+
+            con.update_many('test_generic_bulk', [dict(id=1, value=11), dict(id=7, value=77)], key='id')
+            rows = con.execute('''SELECT value FROM test_generic_bulk WHERE id IN (1, 2, 7) ORDER BY id''').fetchall()
+            self.assertEqual([r[0] for r in rows], [11, 20, 77])
+
+            # Params must all render the same query.
+            self.assertRaises(ValueError, con.executemany, '''SELECT {:values}''', [[(1, )], [(1, 2)]])
+
+    def test_batch(self):
+
+        from dbapix.batch import BatchError
+
+        db = self.create_engine()
+        for autocommit in (True, False):
+
+            con = db.get_connection(autocommit=autocommit)
+
+            con.execute('''DROP TABLE IF EXISTS test_generic_batch''')
+            con.execute('''CREATE TABLE test_generic_batch (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)''')
+            if not autocommit:
+                con.commit()
+
+            def values():
+                rows = con.execute('''SELECT id, value FROM test_generic_batch ORDER BY id''').fetchall()
+                return [tuple(r) for r in rows]
+
+            new_value = 99
+            with con.batch() as batch:
+                for i in range(1, 4):
+                    batch.insert('test_generic_batch', dict(id=i, value=i * 10))
+                batch.update('test_generic_batch', dict(value=new_value), 'id = {}', [2])
+                batch.execute('''UPDATE test_generic_batch SET value = {new_value} WHERE id > 0''')
+                self.assertEqual(len(batch), 5)
+                self.assertEqual(values(), []) # Nothing is sent until the end.
+
+            self.assertEqual(values(), [(1, 99), (2, 99), (3, 99)])
+            self.assertEqual(len(batch.rowcounts), 5)
+            self.assertEqual(batch.rowcounts[-1], 3)
+            if not autocommit:
+                con.commit()
+
+            # Errors report which statement failed.
+            batch = con.batch()
+            batch.insert('test_generic_batch', dict(id=4, value=40))
+            batch.insert('test_generic_batch', dict(id=1, value=10))
+            batch.insert('test_generic_batch', dict(id=5, value=50))
+            with self.assertRaises(BatchError) as cm:
+                batch.send()
+            self.assertEqual(cm.exception.index, 1)
+            self.assertEqual(cm.exception.params[0], 1)
+
+            if not autocommit:
+                con.rollback()
+            self.assertIn(values(), (
+                [(1, 99), (2, 99), (3, 99)],
+                [(1, 99), (2, 99), (3, 99), (4, 40)], # For drivers which can't undo.
+            ))
+
+            db.put_connection(con)
@@ -1,6 +1,15 @@
+import datetime
+import io
 import os
+import queue
+import threading
+import time
+
+import psycopg2 as pg
 
 from dbapix.drivers.psycopg2 import Engine
+from dbapix.retry import RetryPolicy
+from dbapix.watchdog import QueryTimeout
 
 from . import *
 from .test_driver_generic import GenericTestMixin
@@ -25,3 +34,322 @@ class TestPsycopg2(TestCase):
     def test_generic_names(self):
         self.assertIs(get_engine_class('postgres'), Engine)
         self.assertIs(get_engine_class('postgresql'), Engine)
+
+    def test_bulk_returning(self):
+
+        db = create_pg_engine()
+        with db.connect() as con:
+
+            con.execute('''DROP TABLE IF EXISTS test_bulk_returning''')
+            con.execute('''CREATE TABLE test_bulk_returning (id SERIAL PRIMARY KEY, value INTEGER NOT NULL)''')
+
+            ids = con.insert_many('test_bulk_returning', [dict(value=i) for i in range(5)], returning='id', page_size=2)
+            self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_reset_session(self):
+
+        db = create_pg_engine()
+
+        con = db.get_connection(readonly=True, isolation_level='serializable')
+        self.assertTrue(con.wrapped.readonly)
+        self.assertEqual(next(con.execute('''SHOW transaction_isolation'''))[0], 'serializable')
+        con.rollback()
+        db.put_connection(con)
+
+        # The same connection comes back to its defaults.
+        avoided = db.avoided_session_changes
+        con2 = db.get_connection()
+        self.assertIs(con2, con)
+        self.assertIs(con2.wrapped.readonly, None)
+        self.assertEqual(db.avoided_session_changes, avoided + 1) # Just autocommit.
+        db.put_connection(con2)
+
+        # And now nothing has to change.
+        db.put_connection(db.get_connection())
+        self.assertEqual(db.avoided_session_changes, avoided + 3)
+
+    def test_gather(self):
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        value = 123
+        start = time.time()
+        res = db.gather([
+            'SELECT pg_sleep(0.2), 1 AS x',
+            ('SELECT pg_sleep(0.2), {} AS x', [2]),
+            'SELECT pg_sleep(0.2), {value} AS x',
+            'SELECT pg_sleep(0.2), 4 AS x',
+            'SET search_path TO public',
+        ], max_connections=4)
+        elapsed = time.time() - start
+
+        self.assertEqual([r[0]['x'] for r in res[:4]], [1, 2, 123, 4])
+        self.assertIs(res[4], None)
+        # 4 sleeps at once, and then the 5th query.
+        self.assertTrue(elapsed < 0.6, elapsed)
+
+        # Connections are reused.
+        self.assertEqual(len(db._async_pool), 4)
+        res = db.gather(['SELECT {} AS x'.format(i) for i in range(10)], max_connections=2, row_factory='tuple')
+        self.assertEqual(res, [[(i, )] for i in range(10)])
+        self.assertEqual(len(db._async_pool), 4)
+
+        # Errors.
+        queries = ['SELECT 1', 'SELECT * FROM does_not_exist', 'SELECT 3']
+        self.assertRaises(pg.ProgrammingError, db.gather, queries)
+        res = db.gather(queries, return_exceptions=True)
+        self.assertEqual(res[0][0][0], 1)
+        self.assertIsInstance(res[1], pg.ProgrammingError)
+        self.assertEqual(res[2][0][0], 3)
+
+        # A connection dies mid-query.
+        queries = ['SELECT 1', 'SELECT pg_terminate_backend(pg_backend_pid())', 'SELECT 3']
+        res = db.gather(queries, max_connections=3, return_exceptions=True)
+        self.assertEqual(res[0][0][0], 1)
+        self.assertIsInstance(res[1], pg.OperationalError)
+        self.assertEqual(res[2][0][0], 3)
+
+        # ... and it was the only one, so the rest can't run.
+        res = db.gather(queries, max_connections=1, return_exceptions=True)
+        self.assertEqual(res[0][0][0], 1)
+        self.assertIsInstance(res[1], pg.OperationalError)
+        self.assertIs(res[2], res[1])
+        self.assertRaises(pg.OperationalError, db.gather, queries, max_connections=1)
+
+        self.assertRaises(ValueError, db.gather, queries, max_connections=0)
+
+    def test_events(self):
+
+        from dbapix.drivers.psycopg2.events import EventListener
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        listener = EventListener(db, serializer='json', reconnect_delay=0.05)
+        self.addCleanup(listener.stop)
+
+        received = queue.Queue()
+        listener.add_handler('dbapix_test', received.put)
+        listener.start()
+
+        # Wait until it is listening.
+        def wait_for(payload):
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                listener.notify('dbapix_test', payload)
+                try:
+                    event = received.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if event.payload == payload:
+                    return event
+            self.fail("Never received {!r}.".format(payload))
+
+        event = wait_for({'value': 1})
+        self.assertEqual(event.channel, 'dbapix_test')
+
+        # Many at once.
+        with db.connect(autocommit=True) as con:
+            for i in range(250):
+                con.execute('SELECT pg_notify({}, {})', ['dbapix_test', str(i)])
+        values = set()
+        while len(values) < 250:
+            values.add(received.get(timeout=5).payload)
+        self.assertEqual(values, set(range(250)))
+
+        # Reconnects after the connection is lost.
+        with db.connect(autocommit=True) as con:
+            con.execute('SELECT pg_terminate_backend({})', [listener._con.get_backend_pid()])
+        wait_for({'value': 2})
+
+        # Handlers can be removed.
+        listener.remove_handler('dbapix_test', received.put)
+        other = queue.Queue()
+        listener.add_handler('dbapix_other', other.put)
+        listener.notify('dbapix_test', 'ignored')
+        deadline = time.time() + 5
+        while other.empty() and time.time() < deadline:
+            listener.notify('dbapix_other', 3)
+            time.sleep(0.05)
+        self.assertEqual(other.get_nowait().payload, 3)
+
+    def test_events_error(self):
+
+        from dbapix.drivers.psycopg2.events import EventListener
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        listener = EventListener(db, reconnect_delay=0.05)
+        self.addCleanup(listener.stop)
+
+        # The first LISTEN fails with something other than a lost connection.
+        sync = listener._sync_channels
+        calls = []
+        def flaky_sync():
+            calls.append(1)
+            if len(calls) == 1:
+                listener._con.cursor().execute('LISTEN nope nope')
+            sync()
+        listener._sync_channels = flaky_sync
+
+        received = queue.Queue()
+        listener.add_handler('dbapix_test', received.put)
+        listener.start()
+
+        deadline = time.time() + 5
+        while received.empty() and time.time() < deadline:
+            listener.notify('dbapix_test', 'hello')
+            time.sleep(0.05)
+        self.assertEqual(received.get_nowait().payload, 'hello')
+        self.assertIsInstance(listener.error, pg.ProgrammingError)
+        self.assertTrue(listener.stop(5))
+
+    def test_events_stop_timeout(self):
+
+        from dbapix.drivers.psycopg2.events import EventListener
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        listener = EventListener(db)
+        self.addCleanup(listener.stop)
+
+        # The thread is busy, and won't see the wake-up for a moment.
+        busy = threading.Event()
+        def wait():
+            busy.set()
+            time.sleep(0.3)
+        listener._wait = wait
+
+        listener.start()
+        busy.wait(5)
+        wake_r = listener._wake_r
+
+        self.assertFalse(listener.stop(0.01))
+        os.fstat(wake_r) # Still open.
+        self.assertRaises(RuntimeError, listener.start)
+
+        self.assertTrue(listener.stop())
+        self.assertIs(listener._wake_r, None)
+
+    def test_copy(self):
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        con = db.get_connection()
+        self.addCleanup(db.put_connection, con)
+
+        con.execute('''DROP TABLE IF EXISTS test_copy''')
+        con.execute('''CREATE TABLE test_copy (id SERIAL PRIMARY KEY, name TEXT, value FLOAT, created DATE)''')
+        con.insert_many('test_copy', [
+            dict(name='one', value=1.5, created=datetime.date(2020, 1, 1)),
+            dict(name='tab\there\nand "quotes", \\N', value=None, created=None),
+            dict(name=None, value=3, created=datetime.date(2020, 1, 3)),
+        ])
+
+        # To a file.
+        fh = io.BytesIO()
+        minimum = 2
+        self.assertEqual(con.copy_to(fh, 'SELECT id, value FROM test_copy WHERE id >= {minimum} ORDER BY id', header=True), 2)
+        self.assertEqual(fh.getvalue(), b'id,value\n2,\n3,3\n')
+
+        # In fixed chunks.
+        expected = io.BytesIO()
+        con.copy_to(expected, 'SELECT * FROM test_copy ORDER BY id', format='binary')
+        chunks = list(con.iter_copy('SELECT * FROM test_copy ORDER BY id', format='binary', chunk_size=16))
+        self.assertTrue(all(len(c) == 16 for c in chunks[:-1]))
+        self.assertEqual(b''.join(chunks), expected.getvalue())
+
+        # Back into rows, which match a normal fetch.
+        query = 'SELECT * FROM test_copy WHERE name IS NULL OR name != {} ORDER BY id'
+        expected = con.execute(query, ['nope']).fetchall()
+        rows = list(con.iter_copy_rows(query, ['nope'], chunk_size=7))
+        self.assertEqual(len(rows), 3)
+        for a, b in zip(rows, expected):
+            self.assertEqual(a, b)
+        self.assertEqual(rows[1]['name'], 'tab\there\nand "quotes", \\N')
+
+        rows = con.copy_rows(query, ['nope'], row_factory='tuple')
+        self.assertEqual(rows[0], (1, 'one', 1.5, datetime.date(2020, 1, 1)))
+
+        # Stopping early cancels the rest.
+        con.execute('''INSERT INTO test_copy (name) SELECT 'x' FROM generate_series(1, 100000)''')
+        con.commit()
+        chunks = con.iter_copy('SELECT * FROM test_copy', chunk_size=100)
+        next(chunks)
+        chunks.close()
+        con.rollback()
+        self.assertEqual(next(con.execute('SELECT 1'))[0], 1)
+
+    def test_run_transaction(self):
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        with db.connect(autocommit=True) as con:
+            con.execute('''DROP TABLE IF EXISTS test_retry''')
+            con.execute('''CREATE TABLE test_retry (value INTEGER)''')
+
+        attempts = []
+
+        def func(con):
+            attempts.append(con)
+            con.insert('test_retry', dict(value=len(attempts)))
+            if len(attempts) < 3:
+                con.execute('''DO $$ BEGIN RAISE EXCEPTION 'conflict' USING ERRCODE = 'serialization_failure'; END $$''')
+            return 'done'
+
+        self.assertEqual(db.run_transaction(func, RetryPolicy(base_delay=0.001)), 'done')
+        self.assertEqual(len(attempts), 3)
+
+        # Only the last attempt was committed.
+        with db.connect() as con:
+            self.assertEqual([r[0] for r in con.execute('SELECT value FROM test_retry')], [3])
+
+        # Other errors are not retried.
+        del attempts[:]
+        def bad(con):
+            attempts.append(con)
+            con.execute('SELECT 1 / 0')
+        self.assertRaises(pg.DataError, db.run_transaction, bad)
+        self.assertEqual(len(attempts), 1)
+
+        # Broken connections are replaced.
+        del attempts[:]
+        def broken(con):
+            attempts.append(con)
+            if len(attempts) == 1:
+                with db.connect(autocommit=True) as other:
+                    other.execute('SELECT pg_terminate_backend({})', [con.wrapped.get_backend_pid()])
+                con.execute('SELECT 1')
+            return con.execute('SELECT 1').fetchone()[0]
+
+        self.assertEqual(db.run_transaction(broken, RetryPolicy(base_delay=0.001)), 1)
+        self.assertEqual(len(attempts), 2)
+        self.assertTrue(attempts[0].closed)
+        self.assertIsNot(attempts[0], attempts[1])
+        self.assertNotIn(attempts[0], db._checked_out)
+
+    def test_timeout(self):
+
+        db = create_pg_engine()
+        self.addCleanup(db.close)
+
+        con = db.get_connection()
+        self.addCleanup(db.put_connection, con)
+
+        start = time.time()
+        self.assertRaises(QueryTimeout, con.execute, 'SELECT pg_sleep(10)', timeout=0.1)
+        self.assertLess(time.time() - start, 5)
+
+        # It is left idle, and can be used again.
+        self.assertIsNone(con._get_nonidle_status())
+        self.assertEqual(con.execute('SELECT 1', timeout=1).fetchone()[0], 1)
+
+        with db.connect() as con2:
+            con2.begin()
+            self.assertRaises(QueryTimeout, con2.execute, 'SELECT pg_sleep(10)', timeout=0.1)
+            self.assertIsNone(con2._get_nonidle_status())
@@ -0,0 +1,199 @@
+import itertools
+import sys
+import types
+
+from dbapix.watchdog import QueryTimeout
+
+from . import *
+
+
+class NotSupportedError(Exception):
+    pass
+
+
+class ProgrammingError(Exception):
+    def __init__(self, msg=None, errno=None):
+        super(ProgrammingError, self).__init__(msg)
+        self.errno = errno
+
+
+class FakeConnection(object):
+
+    """Just enough of ``snowflake.connector.SnowflakeConnection`` to test against."""
+
+    def __init__(self, results):
+        self.closed = False
+        self.autocommit = True
+        self.results = results
+        self.statuses = {}
+        self.submitted = {}
+        self.timeouts = []
+        self._ids = itertools.count(1)
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        pass
+
+    def get_query_status_throw_if_error(self, qid):
+        status = self.statuses[qid]
+        if status == 'FAILED_WITH_ERROR':
+            raise ProgrammingError(qid)
+        return status
+
+    def is_still_running(self, status):
+        return status == 'RUNNING'
+
+
+class FakeCursor(object):
+
+    def __init__(self, con):
+        self.con = con
+        self.arraysize = 1
+        self.description = None
+        self.rowcount = -1
+        self.sfqid = None
+        self.arrow = True
+        self._rows = []
+
+    def close(self):
+        pass
+
+    def _load(self, query):
+        names, rows = self.con.results[query]
+        self.description = [(n, 0, None, None, None, None, True) for n in names]
+        self._rows = list(rows)
+        self.rowcount = len(rows)
+
+    def execute(self, query, params=None, timeout=None):
+        self.con.timeouts.append(timeout)
+        if query == 'SELECT SYSTEM$WAIT(10)':
+            raise ProgrammingError('SQL execution canceled', 604)
+        self._load(query)
+
+    def execute_async(self, query, params=None):
+        self.sfqid = 'q{}'.format(next(self.con._ids))
+        self.con.submitted[self.sfqid] = (query, params)
+        self.con.statuses[self.sfqid] = 'RUNNING'
+
+    def get_results_from_sfqid(self, qid):
+        self._load(self.con.submitted[qid][0])
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def fetch_pandas_batches(self):
+        if not self.arrow:
+            raise NotSupportedError()
+        import pandas
+        names = [f[0] for f in self.description]
+        rows = self.fetchall()
+        return iter([
+            pandas.DataFrame.from_records(rows[i:i + 2], columns=names)
+            for i in range(0, len(rows), 2)
+        ])
+
+
+class TestSnowflake(TestCase):
+
+    def setUp(self):
+
+        # Stand in for the real connector for the life of this test.
+        connector = types.ModuleType('snowflake.connector')
+        connector.NotSupportedError = NotSupportedError
+        connector.ProgrammingError = ProgrammingError
+        connector.connect = lambda **kwargs: FakeConnection(self.results)
+        package = types.ModuleType('snowflake')
+        package.connector = connector
+
+        saved = {}
+        for name, mod in (('snowflake', package), ('snowflake.connector', connector), ('dbapix.drivers.snowflake', None)):
+            saved[name] = sys.modules.pop(name, None)
+            if mod is not None:
+                sys.modules[name] = mod
+
+        def restore():
+            for name, mod in saved.items():
+                sys.modules.pop(name, None)
+                if mod is not None:
+                    sys.modules[name] = mod
+        self.addCleanup(restore)
+
+        self.results = {
+            'SELECT * FROM foo WHERE x > ?': (['id', 'x'], [(1, 10), (2, 20), (3, 30)]),
+            'SELECT * FROM bar': (['id'], [(4, )]),
+        }
+        self.db = create_engine('snowflake', account='test')
+
+    def test_async(self):
+
+        con = self.db.get_connection()
+
+        x = 5
+        q1 = con.execute_async('SELECT * FROM foo WHERE x > {x}')
+        q2 = con.execute_async('SELECT * FROM bar')
+        self.assertEqual(con.wrapped.submitted[q1], ('SELECT * FROM foo WHERE x > ?', [5]))
+
+        self.assertTrue(con.is_still_running(q1))
+        self.assertEqual(con.wait([q1, q2], timeout=0), [q1, q2])
+
+        con.wrapped.statuses[q1] = 'SUCCESS'
+        self.assertEqual(con.wait([q1, q2], timeout=0), [q2])
+        con.wrapped.statuses[q2] = 'SUCCESS'
+        self.assertEqual(con.wait([q1, q2], timeout=0), [])
+
+        rows = con.get_results(q1).fetchall()
+        self.assertEqual([r['x'] for r in rows], [10, 20, 30])
+        self.assertEqual(con.get_results(q2, row_factory='tuple').fetchall(), [(4, )])
+
+        q3 = con.execute_async('SELECT * FROM bar')
+        con.wrapped.statuses[q3] = 'FAILED_WITH_ERROR'
+        self.assertRaises(ProgrammingError, con.wait, [q3])
+
+    @needs_imports('pandas')
+    def test_dataframes(self):
+
+        con = self.db.get_connection()
+
+        cur = con.execute('SELECT * FROM foo WHERE x > {}', [0])
+        frames = list(cur.iter_dataframes())
+        self.assertEqual([len(f) for f in frames], [2, 1])
+
+        df = con.execute('SELECT * FROM foo WHERE x > {}', [0]).as_dataframe(index='id')
+        self.assertEqual(list(df.columns), ['x'])
+        self.assertEqual(list(df.index), [1, 2, 3])
+
+        # Falls back to our own conversion when the result isn't Arrow.
+        cur = con.execute('SELECT * FROM foo WHERE x > {}', [0])
+        cur.wrapped.arrow = False
+        self.assertEqual([len(f) for f in cur.iter_dataframes(batch_size=1)], [1, 1, 1])
+
+        cur = con.execute('SELECT * FROM foo WHERE x > {}', [0])
+        cur.wrapped.arrow = False
+        df = cur.as_dataframe()
+        self.assertEqual(list(df['x']), [10, 20, 30])
+
+    def test_timeout(self):
+
+        con = self.db.get_connection()
+
+        # Passed to the connector, in whole seconds.
+        self.assertEqual(len(con.execute('SELECT * FROM bar', timeout=0.5).fetchall()), 1)
+        self.db.statement_timeout = 2
+        con.execute('SELECT * FROM bar')
+        self.assertEqual(con.wrapped.timeouts, [1, 2])
+
+        with self.assertRaises(QueryTimeout) as cm:
+            con.execute('SELECT SYSTEM$WAIT(10)')
+        self.assertEqual(cm.exception.timeout, 2)
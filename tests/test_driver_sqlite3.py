@@ -1,4 +1,9 @@
 import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 
 from dbapix.drivers.sqlite3 import Engine
 
@@ -20,3 +25,182 @@ class TestSQLite3(TestCase):
 
     def test_generic_names(self):
         self.assertIs(get_engine_class('sqlite'), Engine)
+
+    def test_profiles(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'profiles.db')
+
+        db = create_engine('sqlite', path, profile='wal-fast', pragmas=dict(cache_size=-1234))
+        con = db.get_connection()
+        self.assertEqual(next(con.execute('PRAGMA journal_mode'))[0], 'wal')
+        self.assertEqual(next(con.execute('PRAGMA synchronous'))[0], 1)
+        self.assertEqual(next(con.execute('PRAGMA cache_size'))[0], -1234)
+        con.execute('CREATE TABLE foo (id INTEGER PRIMARY KEY)')
+        db.close()
+
+        db = create_engine('sqlite', path, profile='read-only')
+        con = db.get_connection()
+        self.assertEqual(next(con.execute('PRAGMA query_only'))[0], 1)
+        self.assertRaises(Exception, con.execute, 'INSERT INTO foo DEFAULT VALUES')
+        db.close()
+
+        self.assertRaises(ValueError, create_engine, 'sqlite', path, profile='notaprofile')
+
+    def test_readonly_session(self):
+
+        db = create_engine('sqlite', ':memory:')
+
+        con = db.get_connection(readonly=True)
+        self.assertEqual(next(con.execute('PRAGMA query_only'))[0], 1)
+        db.put_connection(con)
+
+        con = db.get_connection()
+        self.assertEqual(next(con.execute('PRAGMA query_only'))[0], 0)
+
+        # Unchanged settings don't cost a query on checkout.
+        statements = []
+        con.wrapped.set_trace_callback(statements.append)
+        db.put_connection(con)
+        self.assertIs(db.get_connection(), con)
+        self.assertEqual([s for s in statements if 'PRAGMA' in s], [])
+
+    def test_split_rw(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'split.db')
+
+        db = create_engine('sqlite', path, profile='wal-fast', split_rw=True)
+        self.addCleanup(db.close)
+
+        with db.connect() as con:
+            con.execute('CREATE TABLE foo (id INTEGER PRIMARY KEY, value INTEGER)')
+            con.insert('foo', dict(value=1))
+            con.commit()
+
+        # Many readers at once, from a separate pool.
+        r1 = db.get_connection(readonly=True)
+        r2 = db.get_connection(readonly=True)
+        self.assertIsNot(r1, r2)
+        self.assertIs(r1._engine, db.readers)
+        self.assertEqual(next(r1.execute('SELECT count(1) FROM foo'))[0], 1)
+        self.assertRaises(sqlite3.OperationalError, r2.execute, 'INSERT INTO foo (value) VALUES (2)')
+        db.put_connection(r1)
+        db.put_connection(r2)
+        self.assertEqual(len(db.readers.pool), 2)
+
+        # Only one writer; others queue for it.
+        w1 = db.get_connection()
+
+        errors = []
+        def timed_out_writer():
+            try:
+                db.get_connection(timeout=0.01)
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=timed_out_writer)
+        thread.start()
+        thread.join(1)
+        self.assertIn('Timed out', str(errors[0]))
+
+        # The holder asking again would deadlock.
+        with self.assertRaises(sqlite3.OperationalError) as cm:
+            db.get_connection()
+        self.assertIn('already holds', str(cm.exception))
+
+        # Reads via execute go to the readers, so don't need the writer.
+        with db.execute('SELECT count(1) FROM foo') as cur:
+            self.assertIs(cur._connection._engine, db.readers)
+            self.assertEqual(next(cur)[0], 1)
+        self.assertRaises(sqlite3.OperationalError, db.execute, 'INSERT INTO foo (value) VALUES (2)')
+
+        got = []
+        def other_writer():
+            con = db.get_connection()
+            got.append(con)
+            db.put_connection(con)
+
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(got, [])
+
+        db.put_connection(w1)
+        thread.join(1)
+        self.assertEqual(got, [w1])
+
+        # Closing the writer also frees it.
+        w2 = db.get_connection()
+        w2.close()
+        db.put_connection(db.get_connection(timeout=0.01))
+
+        self.assertRaises(ValueError, create_engine, 'sqlite', ':memory:', split_rw=True)
+
+    def test_shared_memory(self):
+
+        db = create_engine('sqlite', ':memory:', shared=True)
+        self.addCleanup(db.close)
+
+        c1 = db.get_connection()
+        c2 = db.get_connection()
+        c1.execute('CREATE TABLE foo (value INTEGER)')
+        c1.insert('foo', dict(value=1))
+        c1.commit()
+        self.assertEqual(next(c2.execute('SELECT count(1) FROM foo'))[0], 1)
+
+        # Survives an empty pool.
+        c1.close()
+        c2.close()
+        with db.connect() as con:
+            self.assertEqual(next(con.execute('SELECT count(1) FROM foo'))[0], 1)
+
+        # ...but not other engines.
+        other = create_engine('sqlite', ':memory:', shared=True)
+        self.addCleanup(other.close)
+        with other.connect() as con:
+            self.assertRaises(sqlite3.OperationalError, con.execute, 'SELECT count(1) FROM foo')
+
+        self.assertRaises(ValueError, create_engine, 'sqlite', 'foo.db', shared=True)
+
+    def test_in_memory(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'snapshot.db')
+
+        disk = create_engine('sqlite', path)
+        self.addCleanup(disk.close)
+        with disk.connect() as con:
+            con.execute('CREATE TABLE foo (value INTEGER)')
+            con.insert('foo', dict(value=1))
+            con.commit()
+
+        db = create_engine('sqlite', path, in_memory=True, refresh=60)
+        self.addCleanup(db.close)
+
+        def count():
+            with db.connect() as con:
+                return next(con.execute('SELECT count(1) FROM foo'))[0]
+
+        self.assertEqual(count(), 1)
+
+        with disk.connect() as con:
+            con.insert('foo', dict(value=2))
+            con.commit()
+        self.assertEqual(count(), 1)
+
+        db.refresh()
+        self.assertEqual(count(), 2)
+
+        # Refreshes lazily on checkout once it is old enough.
+        with disk.connect() as con:
+            con.insert('foo', dict(value=3))
+            con.commit()
+        db.loaded_at -= 61
+        self.assertEqual(count(), 3)
+
+        self.assertRaises(ValueError, create_engine, 'sqlite', ':memory:', in_memory=True)
+        self.assertRaises(ValueError, create_engine('sqlite', ':memory:').refresh)
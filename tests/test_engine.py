@@ -16,3 +16,20 @@ class TestEngine(TestCase):
         self.assertIs(cls, SQLiteEngine)
 
         self.assertRaises(ImportError, get_engine_class, 'notadriver')
+
+    def test_avoided_session_changes(self):
+
+        db = SQLiteEngine(':memory:')
+
+        # New connections are not in autocommit, nor read-only.
+        con = db.get_connection()
+        self.assertEqual(db.avoided_session_changes, 2)
+        db.put_connection(con)
+
+        con = db.get_connection()
+        self.assertEqual(db.avoided_session_changes, 4)
+        db.put_connection(con)
+
+        con = db.get_connection(autocommit=True)
+        self.assertTrue(con.autocommit)
+        self.assertEqual(db.avoided_session_changes, 5)
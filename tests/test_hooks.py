@@ -0,0 +1,146 @@
+import logging
+
+from dbapix.hooks import OpenTelemetryHook, SlowQueryLogger
+
+from . import *
+
+
+class FakeSpan(object):
+
+    def __init__(self, name, start_time, attributes):
+        self.name = name
+        self.start_time = start_time
+        self.attributes = attributes
+        self.end_time = None
+        self.exceptions = []
+
+    def record_exception(self, e):
+        self.exceptions.append(e)
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer(object):
+
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        span = FakeSpan(name, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+class TestHooks(TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite', ':memory:')
+        self.events = []
+        self.engine.add_hook(self.events.append)
+
+    def names(self):
+        return [e.name for e in self.events]
+
+    def test_events(self):
+
+        con = self.engine.get_connection()
+        con.execute('CREATE TABLE foo (value INTEGER)')
+
+        with con:
+            con.insert('foo', dict(value=1))
+            value = 2
+            con.execute('INSERT INTO foo (value) VALUES ({value})')
+        con.begin()
+        con.rollback()
+
+        cur = con.execute('SELECT value FROM foo ORDER BY value')
+        self.assertEqual(cur.fetchone()[0], 1)
+        self.assertEqual(len(cur.fetchall()), 1)
+        self.assertEqual([r[0] for r in con.execute('SELECT value FROM foo')], [1, 2])
+
+        self.assertEqual(self.names(), [
+            'checkout',
+            'execute', # CREATE
+            'execute', 'execute', 'commit',
+            'rollback',
+            'execute', 'fetch', 'fetch',
+            'execute', 'fetch',
+        ])
+
+        for event in self.events:
+            self.assertIs(event.engine, self.engine)
+            self.assertGreaterEqual(event.duration, 0)
+
+        insert = self.events[3]
+        self.assertEqual(insert.template, 'INSERT INTO foo (value) VALUES ({value})')
+        self.assertEqual(insert.sql, 'INSERT INTO foo (value) VALUES (?)')
+        self.assertEqual(insert.param_count, 1)
+        self.assertEqual(insert.rowcount, 1)
+        self.assertIs(self.events[4].connection, con)
+
+        self.assertEqual([e.rows for e in self.events if e.name == 'fetch'], [1, 1, 2])
+
+    def test_errors(self):
+
+        con = self.engine.get_connection()
+        self.assertRaises(Exception, con.execute, 'SELECT * FROM does_not_exist')
+
+        event = self.events[-1]
+        self.assertEqual(event.name, 'execute')
+        self.assertIsNotNone(event.error)
+
+    def test_bad_hooks_are_ignored(self):
+
+        def bad(event):
+            raise ValueError('bad hook')
+        self.engine.add_hook(bad)
+
+        logging.getLogger('dbapix.hooks').disabled = True
+        try:
+            con = self.engine.get_connection()
+            con.execute('SELECT 1')
+        finally:
+            logging.getLogger('dbapix.hooks').disabled = False
+
+        self.assertEqual(self.names(), ['checkout', 'execute'])
+
+    def test_remove(self):
+        self.engine.remove_hook(self.events.append)
+        self.engine.get_connection().execute('SELECT 1')
+        self.assertEqual(self.events, [])
+
+    def test_slow_query_logger(self):
+
+        logger = logging.getLogger('dbapix.test_hooks')
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        self.engine.add_hook(SlowQueryLogger(0, logger=logger))
+        self.engine.get_connection().execute('SELECT 1')
+
+        self.assertEqual(len(records), 1)
+        self.assertIn('SELECT 1', records[0].getMessage())
+
+    def test_opentelemetry(self):
+
+        tracer = FakeTracer()
+        self.engine.add_hook(OpenTelemetryHook(tracer, events=['execute']))
+
+        con = self.engine.get_connection()
+        con.execute('SELECT {}', [1])
+        self.assertRaises(Exception, con.execute, 'SELECT * FROM does_not_exist')
+
+        ok, bad = tracer.spans
+        self.assertEqual(ok.name, 'dbapix.execute')
+        self.assertEqual(ok.attributes['db.system'], 'sqlite3')
+        self.assertEqual(ok.attributes['db.statement'], 'SELECT ?')
+        self.assertEqual(ok.attributes['dbapix.param_count'], 1)
+        self.assertGreaterEqual(ok.end_time, ok.start_time)
+        self.assertEqual(len(bad.exceptions), 1)
@@ -0,0 +1,101 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from dbapix.partition import date_slices, hash_buckets, key_ranges
+from dbapix.row import ColumnarRowList
+
+from . import *
+
+
+class TestPartition(TestCase):
+
+    def setUp(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+
+        # A file, so that every connection sees the same database.
+        self.engine = create_engine('sqlite', os.path.join(tmp, 'partition.db'))
+        self.addCleanup(self.engine.close)
+
+        with self.engine.connect() as con:
+            con.execute('CREATE TABLE foo (id INTEGER, name TEXT)')
+            with con:
+                for i in range(100):
+                    con.insert('foo', dict(id=i, name='n{}'.format(i)))
+
+    def test_key_ranges(self):
+        self.assertEqual(key_ranges(0, 10, 3), [dict(lo=0, hi=4), dict(lo=4, hi=7), dict(lo=7, hi=10)])
+        self.assertEqual(key_ranges(0, 2, 4), [dict(lo=0, hi=1), dict(lo=1, hi=2)])
+        self.assertRaises(ValueError, key_ranges, 0, 10, 0)
+
+    def test_date_slices(self):
+        slices = date_slices(datetime.date(2020, 1, 1), datetime.date(2020, 1, 20), datetime.timedelta(days=7))
+        self.assertEqual([(s['lo'].day, s['hi'].day) for s in slices], [(1, 8), (8, 15), (15, 20)])
+
+    def test_fetch_ranges(self):
+
+        name = 'n5'
+        rows = self.engine.fetch_partitioned(
+            'SELECT id FROM foo WHERE id >= {lo} AND id < {hi} AND name != {name} ORDER BY id',
+            key_ranges(0, 100, 7),
+            max_workers=3,
+        )
+
+        self.assertEqual([r['id'] for r in rows], [i for i in range(100) if i != 5])
+
+    def test_fetch_nothing(self):
+        rows = self.engine.fetch_partitioned('SELECT id FROM foo WHERE id >= {lo} AND id < {hi}', key_ranges(0, 0, 4))
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(list(self.engine.iter_partitions('SELECT 1', [])), [])
+
+    def test_fetch_buckets(self):
+        rows = self.engine.fetch_partitioned('SELECT id FROM foo WHERE id % {buckets} = {bucket}', hash_buckets(4))
+        self.assertEqual(sorted(r[0] for r in rows), list(range(100)))
+        self.assertEqual([r[0] for r in rows[:3]], [0, 4, 8])
+
+    def test_iter(self):
+
+        seen = {}
+        for partition, rows in self.engine.iter_partitions(
+            'SELECT id FROM foo WHERE id >= {lo} AND id < {hi}',
+            key_ranges(0, 100, 10),
+            max_workers=2,
+        ):
+            seen[partition['lo']] = len(rows)
+
+        self.assertEqual(sorted(seen), list(range(0, 100, 10)))
+        self.assertEqual(set(seen.values()), {10})
+
+    def test_iter_early_exit(self):
+
+        results = self.engine.iter_partitions('SELECT id FROM foo WHERE id % {buckets} = {bucket}',
+            hash_buckets(10), max_workers=2, ordered=True)
+        partition, rows = next(results)
+        self.assertEqual(partition['bucket'], 0)
+        results.close()
+
+        # Every connection went back to the pool.
+        self.assertEqual(self.engine._checked_out, [])
+
+    def test_errors(self):
+        self.assertRaises(Exception, self.engine.fetch_partitioned,
+            'SELECT id FROM does_not_exist WHERE id >= {lo}', key_ranges(0, 10, 2))
+
+    def test_merge_columnar(self):
+
+        self.engine.row_list_class = ColumnarRowList
+        rows = self.engine.fetch_partitioned('SELECT id, name FROM foo WHERE id >= {lo} AND id < {hi}',
+            key_ranges(0, 100, 4))
+
+        self.assertIsInstance(rows, ColumnarRowList)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(rows[42]['name'], 'n42')
+
+    @needs_imports('pandas')
+    def test_dataframe(self):
+        df = self.engine.fetch_partitioned('SELECT id, name FROM foo WHERE id >= {lo} AND id < {hi}',
+            key_ranges(0, 100, 4), as_dataframe=True)
+        self.assertEqual(list(df['id']), list(range(100)))
@@ -1,4 +1,5 @@
 import os
+import threading
 
 from dbapix.registry import Registry
 
@@ -18,3 +19,37 @@ class TestRegistry(TestCase):
         con = engine.get_connection()
         cur = con.execute('select 1 as foo')
 
+
+    def test_get_engine(self):
+
+        registry = Registry()
+        registry.register('foo', 'sqlite', ':memory:')
+        registry.register('bar', 'sqlite', ':memory:')
+        registry.register_routing('routed', 'foo', ['bar'])
+
+        foo = registry.get_engine('foo')
+        self.assertIs(registry.get_engine('foo'), foo)
+        self.assertIsNot(registry.create_engine('foo'), foo)
+        self.assertIsNot(registry.get_engine('bar'), foo)
+
+        routed = registry.get_engine('routed')
+        self.assertIs(routed.primary, foo)
+        self.assertIs(routed.replicas[0], registry.get_engine('bar'))
+
+        # One engine, even when asked for from many threads at once.
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get_engine('baz'))) for _ in range(10)]
+        registry.register('baz', 'sqlite', ':memory:')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, results))), 1)
+
+        con = foo.get_connection()
+        foo.put_connection(con)
+        registry.close_all()
+        self.assertTrue(con.closed)
+        self.assertIsNot(registry.get_engine('foo'), foo)
+
+        self.assertRaises(ValueError, registry.get_engine, 'missing')
@@ -0,0 +1,87 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from dbapix.retry import RetryBudget, RetryPolicy
+
+from . import *
+
+
+class TestRetry(TestCase):
+
+    def test_delays(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+        for _ in range(100):
+            self.assertLessEqual(policy.delay(2), 0.1)
+            self.assertLessEqual(policy.delay(10), 0.3)
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=0)
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+    def test_sqlite_locked(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'retry.db')
+
+        engine = create_engine('sqlite', path)
+        with engine.connect() as con:
+            con.execute('CREATE TABLE foo (value INTEGER)')
+
+        # Another process holds the write lock for a moment.
+        other = sqlite3.connect(path, check_same_thread=False)
+        other.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(0.2, other.rollback)
+        timer.start()
+        self.addCleanup(timer.join)
+
+        attempts = []
+        def func(con):
+            attempts.append(con)
+            con.insert('foo', dict(value=1))
+
+        engine.run_transaction(func, RetryPolicy(max_attempts=100, base_delay=0.01, max_delay=0.05))
+        self.assertGreater(len(attempts), 1)
+
+        with engine.connect() as con:
+            self.assertEqual(con.execute('SELECT count(*) FROM foo').fetchone()[0], 1)
+
+    def test_gives_up(self):
+
+        engine = create_engine('sqlite', ':memory:')
+
+        attempts = []
+        def func(con):
+            attempts.append(con)
+            raise sqlite3.OperationalError('database is locked')
+
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+        self.assertRaises(sqlite3.OperationalError, engine.run_transaction, func, policy)
+        self.assertEqual(len(attempts), 3)
+
+        # Existing connections can be used too.
+        del attempts[:]
+        con = engine.get_connection()
+        self.assertRaises(sqlite3.OperationalError, con.run_transaction, func, policy)
+        self.assertEqual(len(attempts), 3)
+        self.assertTrue(all(x is con for x in attempts))
+
+        # ... but not with work which a retry would roll back.
+        del attempts[:]
+        con.execute('CREATE TABLE foo (value INTEGER)')
+        con.commit()
+        con.execute('INSERT INTO foo VALUES (1)')
+        self.assertRaises(RuntimeError, con.run_transaction, func, policy)
+        self.assertEqual(attempts, [])
+        con.commit()
+        with con.begin():
+            self.assertRaises(RuntimeError, con.run_transaction, func, policy)
+        self.assertEqual(attempts, [])
+        self.assertEqual(con.execute('SELECT value FROM foo').fetchall()[0][0], 1)
@@ -0,0 +1,165 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from dbapix.connection import Connection as _Connection
+from dbapix.drivers import sqlite3 as sqlite3_driver
+from dbapix.registry import Registry
+from dbapix.routing import RoutingEngine
+
+from . import *
+
+
+class PlainConnection(sqlite3_driver.Connection):
+
+    # Like drivers which don't support read-only sessions.
+    def reset_session(self, autocommit=False, readonly=None):
+        _Connection.reset_session(self, autocommit, readonly)
+
+class PlainEngine(sqlite3_driver.Engine):
+    connection_class = PlainConnection
+
+
+class TestRouting(TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+        self.registry = Registry()
+        for name in ('primary', 'replica1', 'replica2'):
+            path = os.path.join(self.tmp, name + '.db')
+            with create_engine('sqlite', path).connect(autocommit=True) as con:
+                con.execute('CREATE TABLE who (name TEXT)')
+                con.insert('who', dict(name=name))
+            self.registry.register(name, 'sqlite', path)
+
+        self.registry.register_routing('routed', 'primary', ['replica1', 'replica2'])
+
+    def who(self, con):
+        return next(con.execute('SELECT name FROM who'))[0]
+
+    def test_without_readonly_sessions(self):
+
+        db = RoutingEngine(
+            PlainEngine(os.path.join(self.tmp, 'primary.db')),
+            [PlainEngine(os.path.join(self.tmp, 'replica1.db'))],
+        )
+        self.addCleanup(db.close)
+
+        with db.connect(readonly=True) as con:
+            self.assertEqual(self.who(con), 'replica1')
+        self.assertEqual(db.ejected(), [])
+
+    def test_routing(self):
+
+        db = self.registry.create_engine('routed')
+        self.assertIsInstance(db, RoutingEngine)
+        self.addCleanup(db.close)
+
+        with db.connect() as con:
+            self.assertEqual(self.who(con), 'primary')
+
+        with db.connect(readonly=True) as con:
+            self.assertIn(self.who(con), ('replica1', 'replica2'))
+            self.assertRaises(sqlite3.OperationalError, con.execute, 'DELETE FROM who')
+
+        # Queries are guessed, unless told.
+        with db.execute('SELECT name FROM who') as cur:
+            self.assertIn(next(cur)[0], ('replica1', 'replica2'))
+        with db.execute('SELECT name FROM who', readonly=False) as cur:
+            self.assertEqual(next(cur)[0], 'primary')
+
+        # Least busy replicas are picked.
+        con1 = db.get_connection(readonly=True)
+        con2 = db.get_connection(readonly=True)
+        self.assertNotEqual(self.who(con1), self.who(con2))
+        db.put_connection(con1)
+        db.put_connection(con2)
+
+        # Things are passed through to the primary.
+        self.assertEqual(db.quote_identifier('x'), '"x"')
+        self.assertIs(db.types, db.primary.types)
+
+    def test_weighted(self):
+
+        db = self.registry.create_engine('primary')
+        replicas = [self.registry.create_engine('replica1'), self.registry.create_engine('replica2')]
+        db = RoutingEngine(db, replicas, balance='weighted', weights=[1, 0])
+        self.addCleanup(db.close)
+
+        for _ in range(10):
+            with db.connect(readonly=True) as con:
+                self.assertEqual(self.who(con), 'replica1')
+
+    def test_sticky(self):
+
+        db = self.registry.create_engine('routed')
+        self.addCleanup(db.close)
+
+        with db.sticky():
+            with db.connect(readonly=True) as con:
+                self.assertNotEqual(self.who(con), 'primary')
+            with db.connect() as con:
+                con.insert('who', dict(name='written'))
+            with db.sticky(): # Nested.
+                with db.connect(readonly=True) as con:
+                    self.assertEqual(self.who(con), 'primary')
+
+        with db.connect(readonly=True) as con:
+            self.assertNotEqual(self.who(con), 'primary')
+
+    def test_ejection(self):
+
+        db = self.registry.create_engine('routed')
+        self.addCleanup(db.close)
+        replica1, replica2 = db.replicas
+
+        # Break the first replica.
+        def broken(timeout):
+            raise sqlite3.OperationalError('broken')
+        replica1._connect = broken
+
+        # Ties are broken randomly, so keep going until it has been tried.
+        for _ in range(100):
+            with db.connect(readonly=True) as con:
+                self.assertEqual(self.who(con), 'replica2')
+            if db.ejected():
+                break
+        self.assertEqual(db.ejected(), [replica1])
+
+        # Nothing left, so the primary is used.
+        replica2._connect = broken
+        replica2.close()
+        with db.connect(readonly=True) as con:
+            self.assertEqual(self.who(con), 'primary')
+        self.assertEqual(len(db.ejected()), 2)
+
+        # Health checks bring them back.
+        del replica1._connect
+        del replica2._connect
+        db.check_health()
+        self.assertEqual(db.ejected(), [])
+        with db.connect(readonly=True) as con:
+            self.assertNotEqual(self.who(con), 'primary')
+
+        replica1._connect = broken
+        replica1.close()
+        db.check_health()
+        self.assertEqual(db.ejected(), [replica1])
+
+    def test_health_thread(self):
+
+        db = RoutingEngine(
+            self.registry.create_engine('primary'),
+            [self.registry.create_engine('replica1')],
+            health_check_interval=0.01,
+        )
+        thread = db._health_thread
+        self.assertTrue(thread.is_alive())
+
+        # Closing waits for it to stop.
+        db.close()
+        self.assertFalse(thread.is_alive())
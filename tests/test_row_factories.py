@@ -0,0 +1,74 @@
+from . import *
+
+from dbapix.row import Row
+
+
+class TestRowFactories(TestCase):
+
+    def create_connection(self):
+        db = create_engine('sqlite3', ':memory:')
+        con = db.get_connection()
+        con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)''')
+        con.insert('foo', dict(id=1, value=123))
+        con.insert('foo', dict(id=2, value=234))
+        return con
+
+    def test_default(self):
+        con = self.create_connection()
+        row = con.execute('''SELECT * FROM foo''').fetchone()
+        self.assertIsInstance(row, Row)
+
+    def test_builtins(self):
+
+        con = self.create_connection()
+
+        row = con.execute('''SELECT * FROM foo''', row_factory='tuple').fetchone()
+        self.assertIs(type(row), tuple)
+        self.assertEqual(row, (1, 123))
+
+        row = con.execute('''SELECT * FROM foo''', row_factory='dict').fetchone()
+        self.assertEqual(row, dict(id=1, value=123))
+
+        row = con.execute('''SELECT * FROM foo''', row_factory='namedtuple').fetchone()
+        self.assertEqual(row.value, 123)
+        self.assertEqual(row, (1, 123))
+
+        rows = con.execute('''SELECT * FROM foo''', row_factory='dict').fetchall()
+        self.assertEqual(list(rows), [dict(id=1, value=123), dict(id=2, value=234)])
+
+        self.assertRaises(ValueError, con.execute, '''SELECT 1''', row_factory='notafactory')
+
+    def test_per_cursor(self):
+
+        con = self.create_connection()
+
+        cur = con.cursor(row_factory='tuple')
+        cur.execute('''SELECT * FROM foo''')
+        self.assertEqual([type(r) for r in cur], [tuple, tuple])
+
+        # Per-execute overrides per-cursor, but only for that result set.
+        cur.execute('''SELECT * FROM foo''', row_factory='dict')
+        self.assertIsInstance(cur.fetchone(), dict)
+        cur.execute('''SELECT * FROM foo''')
+        self.assertIs(type(cur.fetchone()), tuple)
+
+    def test_callable(self):
+
+        con = self.create_connection()
+        calls = []
+
+        def factory(cur):
+            calls.append([f[0] for f in cur.description])
+            return lambda raw: raw[1] * 2
+
+        values = list(con.execute('''SELECT * FROM foo''', row_factory=factory))
+        self.assertEqual(values, [246, 468])
+        self.assertEqual(calls, [['id', 'value']])
+
+    def test_engine(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        with db.execute('''SELECT 1 AS foo''', row_factory='dict') as cur:
+            self.assertEqual(cur.fetchone(), dict(foo=1))
+        with db.cursor(row_factory='tuple') as cur:
+            self.assertIs(type(cur.execute('''SELECT 1''').fetchone()), tuple)
@@ -0,0 +1,45 @@
+from six.moves import StringIO
+
+from dbapix.stats import StatementStats
+
+from . import *
+
+
+class TestStatementStats(TestCase):
+
+    def test_stats(self):
+
+        engine = create_engine('sqlite', ':memory:')
+        stats = StatementStats(sample_size=5)
+        engine.add_hook(stats)
+
+        con = engine.get_connection()
+        con.execute('CREATE TABLE foo (value INTEGER)')
+        for value in range(10):
+            con.execute('INSERT INTO foo (value) VALUES ({value})')
+        for _ in range(3):
+            con.execute('SELECT value FROM foo').fetchall()
+        self.assertRaises(Exception, con.execute, 'SELECT nope FROM foo')
+
+        by_template = dict((s.template, s) for s in stats.snapshot())
+
+        insert = by_template['INSERT INTO foo (value) VALUES ({value})']
+        self.assertEqual(insert.calls, 10)
+        self.assertEqual(insert.rowcount, 10)
+        self.assertEqual(insert.errors, 0)
+        self.assertLessEqual(insert.min_time, insert.p95_time)
+        self.assertLessEqual(insert.p95_time, insert.max_time)
+        self.assertAlmostEqual(insert.mean_time * 10, insert.total_time)
+
+        select = by_template['SELECT value FROM foo']
+        self.assertEqual(select.calls, 3)
+        self.assertEqual(select.rows, 30)
+
+        self.assertEqual(by_template['SELECT nope FROM foo'].errors, 1)
+
+        out = StringIO()
+        stats.dump(out)
+        self.assertIn('INSERT INTO foo', out.getvalue())
+
+        stats.reset()
+        self.assertEqual(stats.snapshot(), [])
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from dbapix.watchdog import QueryTimeout, Watchdog
+
+from . import *
+
+
+FOREVER = '''
+    WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c)
+    SELECT count(*) FROM c
+'''
+
+
+class TestWatchdog(TestCase):
+
+    def test_schedule(self):
+
+        dog = Watchdog()
+        fired = threading.Event()
+        calls = []
+
+        later = dog.schedule(10, lambda: calls.append('later'))
+        dog.schedule(0.05, lambda: (calls.append('soon'), fired.set()))
+        cancelled = dog.schedule(0.01, lambda: calls.append('cancelled'))
+        cancelled.cancel()
+
+        self.assertTrue(fired.wait(1))
+        later.cancel()
+        self.assertEqual(calls, ['soon'])
+        self.assertFalse(later.fired)
+
+
+class TestQueryTimeout(TestCase):
+
+    def test_sqlite(self):
+
+        engine = create_engine('sqlite', ':memory:')
+        con = engine.get_connection()
+        con.execute('CREATE TABLE foo (value INTEGER)')
+
+        start = time.time()
+        with self.assertRaises(QueryTimeout) as cm:
+            con.execute(FOREVER, timeout=0.1)
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(cm.exception.timeout, 0.1)
+
+        # Still usable, and quick queries are not affected.
+        self.assertEqual(con.execute('SELECT 1', timeout=1).fetchone()[0], 1)
+
+        # The engine's default.
+        engine.statement_timeout = 0.1
+        self.assertRaises(QueryTimeout, con.execute, FOREVER)
+        engine.statement_timeout = None
+
+        # Within a transaction, which is rolled back.
+        con.begin()
+        con.insert('foo', dict(value=1))
+        self.assertRaises(QueryTimeout, con.execute, FOREVER, timeout=0.1)
+        con.rollback()
+        self.assertEqual(con.execute('SELECT count(*) FROM foo').fetchone()[0], 0)
+
+        # Drivers which can't cancel refuse timeouts, rather than ignoring them.
+        engine._get_canceller = lambda raw_cur: None
+        self.assertRaises(ValueError, con.execute, 'SELECT 1', timeout=1)
+        self.assertEqual(con.execute('SELECT 1').fetchone()[0], 1)
@@ -1,6 +1,7 @@
 import os
 
 from dbapix.drivers.psycopg2 import Engine
+from dbapix.tunnel import TunnelManager, tunnels
 
 from . import *
 from .test_driver_generic import GenericTestMixin
@@ -22,3 +23,101 @@ class TestTunnelGenerics(GenericTestMixin, TestCase):
     def _create_engine(self):
         return create_tunnel_engine()
 
+
+
+class FakeForwarder(object):
+
+    ports = iter(range(20000, 30000))
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.is_active = False
+        self.starts = 0
+
+    def start(self):
+        self.is_active = True
+        self.starts += 1
+        self.local_bind_port = next(self.ports)
+
+    def stop(self):
+        self.is_active = False
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+
+class TestTunnelManager(TestCase):
+
+    def test_sharing(self):
+
+        manager = TunnelManager(FakeForwarder)
+
+        a = manager.acquire(ssh_address_or_host=('bastion', 22), remote_bind_address=('db', 5432))
+        b = manager.acquire(ssh_address_or_host=('bastion', 22), remote_bind_address=('db', 5432))
+        c = manager.acquire(ssh_address_or_host=('bastion', 22), remote_bind_address=('other', 5432))
+        d = manager.acquire(_shared=False, ssh_address_or_host=('bastion', 22), remote_bind_address=('db', 5432))
+
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertIsNot(a, d)
+        self.assertEqual(len(manager), 3)
+        self.assertEqual(a.refs, 2)
+
+        forwarder = a.forwarder
+        a.close()
+        self.assertTrue(forwarder.is_active)
+        b.close()
+        self.assertFalse(forwarder.is_active)
+        self.assertEqual(len(manager), 2)
+
+        manager.close_all()
+        self.assertEqual(len(manager), 0)
+        self.assertIsNone(c.forwarder)
+
+    def test_restart(self):
+
+        manager = TunnelManager(FakeForwarder)
+        tunnel = manager.acquire(ssh_address_or_host=('bastion', 22), remote_bind_address=('db', 5432))
+        port = tunnel.local_bind_port
+
+        tunnel.ensure_up()
+        self.assertEqual(tunnel.forwarder.starts, 1)
+
+        tunnel.forwarder.is_active = False
+        manager.check_health()
+        self.assertEqual(tunnel.forwarder.starts, 2)
+        self.assertNotEqual(tunnel.local_bind_port, port)
+
+        manager.close_all()
+
+    def test_engines_share(self):
+
+        original = tunnels._forwarder_class
+        tunnels._forwarder_class = FakeForwarder
+        try:
+
+            a = Engine(database='a', port=5433, tunnel=dict(host='bastion'))
+            b = Engine(database='b', port=5433, tunnel=dict(host='bastion'))
+            a._prep_tunnel()
+            b._prep_tunnel()
+
+            self.assertIs(a.tunnel, b.tunnel)
+            self.assertEqual(a.tunnel.kwargs['ssh_address_or_host'], ('bastion', 22))
+            self.assertEqual(a.tunnel.kwargs['remote_bind_address'], ('127.0.0.1', 5433))
+            self.assertEqual(a.connect_kwargs['port'], a.tunnel.local_bind_port)
+
+            # A dropped tunnel is brought back for the next connection.
+            a.tunnel.forwarder.is_active = False
+            b._prep_tunnel()
+            self.assertEqual(b.tunnel.forwarder.starts, 2)
+            self.assertEqual(b.connect_kwargs['port'], b.tunnel.local_bind_port)
+
+            tunnel = a.tunnel
+            a.close()
+            self.assertEqual(tunnel.refs, 1)
+            b.close()
+            self.assertIsNone(tunnel.forwarder)
+
+        finally:
+            tunnels._forwarder_class = original
@@ -0,0 +1,108 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from . import *
+
+from dbapix.types import TypeRegistry, decode_rows
+
+
+class Point(object):
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class TestTypes(TestCase):
+
+    def test_compile_decoders(self):
+
+        types = TypeRegistry()
+        description = [('a', 1), ('b', 2), ('c', 3)]
+
+        # Nothing registered means nothing to do.
+        self.assertEqual(types.compile_decoders(description), ())
+
+        types.register_decoder(2, int)
+        decoders = types.compile_decoders(description)
+        self.assertEqual(decoders, ((1, int), ))
+
+        rows = decode_rows([('x', '1', 'z'), ('x', None, 'z')], decoders)
+        self.assertEqual(rows, [('x', 1, 'z'), ('x', None, 'z')])
+
+    def test_decoders_on_fetch(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        db.types.register_decoder('POINT', lambda x: Point(*map(int, x.split(','))))
+        db.types.register_decoder('DATE', lambda x: 'date:' + x)
+
+        con = db.get_connection()
+        con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, at DATE, value TEXT)''')
+        con.insert('foo', dict(at='2020-01-02', value='1,2'))
+        con.insert('foo', dict(at=None, value=None))
+
+        cur = con.execute('''SELECT id, at, value AS "value [point]" FROM foo ORDER BY id''')
+        self.assertEqual([f[:2] for f in cur.description], [('id', None), ('at', None), ('value', 'POINT')])
+        first, second = cur.fetchall()
+
+        # The declared DATE is not converted by sqlite3 behind the registry's back.
+        self.assertEqual(first['at'], '2020-01-02')
+        self.assertEqual((first['value'].x, first['value'].y), (1, 2))
+        self.assertIs(second['value'], None)
+
+        cur = con.execute('''SELECT at AS "at [date]" FROM foo ORDER BY id''', row_factory='tuple')
+        self.assertEqual(cur.fetchall(), [('date:2020-01-02', ), (None, )])
+
+    def test_sqlite_converters_without_decoders(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        con = db.get_connection()
+        con.execute('''CREATE TABLE foo (at DATE)''')
+        con.insert('foo', dict(at='2020-01-02'))
+
+        # Without decoders, sqlite3's own converters still apply.
+        row = next(con.execute('''SELECT at FROM foo'''))
+        self.assertEqual(row['at'], datetime.date(2020, 1, 2))
+
+    def test_sqlite_decoders_after_connecting(self):
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        db = create_engine('sqlite3', os.path.join(tmp, 'types.db'))
+        self.addCleanup(db.close)
+
+        with db.connect(autocommit=True) as con:
+            con.execute('''CREATE TABLE foo (at DATE)''')
+            con.insert('foo', dict(at='2020-01-02'))
+        idle = db.get_connection()
+        busy = db.get_connection()
+        db.put_connection(idle)
+
+        db.types.register_decoder('DATE', lambda x: 'date:' + x)
+
+        # Connections made before are replaced, so all decode the same way.
+        con = db.get_connection()
+        self.assertIsNot(con, idle)
+        self.assertTrue(idle.closed)
+        self.assertEqual(next(con.execute('''SELECT at AS "at [date]" FROM foo'''))[0], 'date:2020-01-02')
+        db.put_connection(busy)
+        self.assertTrue(busy.closed)
+        db.put_connection(con)
+        self.assertEqual(db.pool, [con])
+
+    def test_encoders(self):
+
+        db = create_engine('sqlite3', ':memory:')
+        con = db.get_connection()
+        db.types.register_encoder(Point, lambda p: '{},{}'.format(p.x, p.y))
+
+        con.execute('''CREATE TABLE foo (id INTEGER PRIMARY KEY, value TEXT)''')
+        con.insert('foo', dict(value=Point(1, 2)))
+
+        point = Point(3, 4)
+        con.execute('''INSERT INTO foo (value) VALUES ({point})''')
+
+        values = [r[0] for r in con.execute('''SELECT value FROM foo ORDER BY id''')]
+        self.assertEqual(values, ['1,2', '3,4'])